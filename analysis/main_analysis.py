@@ -6,84 +6,206 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from scipy.stats import entropy
 
+from utils.chart_cache import figure_to_bytes
+
 # 한글 폰트 설정
 plt.rcParams['font.family'] = ['Malgun Gothic', 'AppleGothic', 'NanumGothic', 'DejaVu Sans']
 plt.rcParams['axes.unicode_minus'] = False
 
-def calculate_diversity_index(series):
-    counts = series.value_counts()
-    probs = counts / counts.sum()
-    return entropy(probs, base=2)
-
-def generate_analysis(df):
-
-    df = df.rename(columns={
+def _prepare(df):
+    return df.rename(columns={
     'district': '자치구',
     'industry_code': '업종명',
     'store_name': '상호명',
     'full_address': '주소'
 })
 
+def _factorize(values):
+    """값을 처음 나온 순서대로 번호 매겨 (번호 배열, 값 목록)을 반환
+
+    결측값은 len(값 목록) 번으로 따로 모은다. 범주형 컬럼은 문자열로 바꾸지 않고
+    범주 번호를 그대로 다시 매긴다.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy().astype(np.intp)
+        labels = values.cat.categories.astype(str)
+    else:
+        codes, labels = pd.factorize(values.astype(str))
+        labels = pd.Index(labels)
+    missing = len(labels)
+    codes[codes < 0] = missing
+
+    # 같은 위치에 여러 번 쓰면 마지막 값이 남으므로, 거꾸로 쓰면 처음 나온 위치가 남는다
+    first_seen = np.full(missing + 1, len(codes))
+    first_seen[codes[::-1]] = np.arange(len(codes))[::-1]
+    used = np.flatnonzero(first_seen[:missing] < len(codes))
+    used = used[np.argsort(first_seen[used], kind='stable')]
+    remap = np.full(missing + 1, len(used), dtype=np.intp)
+    remap[used] = np.arange(len(used))
+    return remap[codes], labels[used]
+
+def compute_analysis_stats(df):
+    """가맹점 통계 집계 (Streamlit/그림 없이 값만 계산)
+
+    자치구×업종 개수 행렬을 한 번에 만들고, 나머지 지표는 모두 이 행렬에서 계산한다.
+    행/열 번호가 처음 나온 순서라서 정렬 결과가 value_counts와 같고, 마지막 행/열은
+    결측값 몫이다 (value_counts처럼 결과에서는 빠지고 구별 전체 개수에는 들어간다).
+    """
+    df = _prepare(df)
+    district_codes, districts = _factorize(df['자치구'])
+    industry_codes, industries = _factorize(df['업종명'])
+    n_districts, n_industries = len(districts), len(industries)
+    cube = np.bincount(
+        district_codes * (n_industries + 1) + industry_codes,
+        minlength=(n_districts + 1) * (n_industries + 1),
+    ).reshape(n_districts + 1, n_industries + 1)
+
+    district_totals = cube[:n_districts].sum(axis=1)
+    is_seoul = np.flatnonzero(districts != '기타')
+    seoul_cube = cube[is_seoul, :n_industries]
+    seoul_districts = districts[is_seoul]
+    seoul_totals = district_totals[is_seoul]
+
+    # pivot_table처럼 이름순으로 정렬하고, 업종이 (결측 말고) 하나도 없는 구와 업종은 뺀다
+    row_order = np.argsort(seoul_districts, kind='stable')
+    heat_rows = row_order[seoul_cube[row_order].sum(axis=1) > 0]
+    seoul_industry = np.flatnonzero(seoul_cube.sum(axis=0))
+    col_order = seoul_industry[np.argsort(industries[seoul_industry], kind='stable')]
+    heatmap_data = pd.DataFrame(
+        seoul_cube[np.ix_(heat_rows, col_order)],
+        index=pd.Index(seoul_districts[heat_rows], name='자치구'),
+        columns=pd.Index(industries[col_order], name='업종명'),
+    )
+
+    # 업종별 개수를 구마다 큰 순서로 놓고 엔트로피 계산 (value_counts → entropy와 같은 합산 순서)
+    sorted_counts = -np.sort(-seoul_cube[row_order], axis=1)
+    counted = sorted_counts.sum(axis=1) > 0
+    diversity = np.zeros(len(row_order))
+    diversity[counted] = entropy(sorted_counts[counted] / sorted_counts[counted].sum(axis=1, keepdims=True), base=2, axis=1)
+    diversity = pd.Series(diversity, index=pd.Index(seoul_districts[row_order], name='자치구'), name='업종명')
+
+    food = np.flatnonzero(industries == '음식점/식음료업')
+    food_counts = cube[:n_districts, food[0]] if len(food) else np.zeros(n_districts, dtype=np.int64)
+    has_food = food_counts > 0
+    food_ratio = pd.Series(
+        food_counts[has_food] / district_totals[has_food] * 100,
+        index=pd.Index(districts[has_food], name='자치구'), name='count',
+    ).sort_index()
+
+    medical = np.flatnonzero(industries == '보건/복지')
+    medical_counts = seoul_cube[:, medical[0]] if len(medical) else np.zeros(len(is_seoul), dtype=np.int64)
+    medical_ratio = pd.Series(
+        medical_counts[row_order] / seoul_totals[row_order] * 100,
+        index=pd.Index(seoul_districts[row_order], name='자치구'), name='의료여부',
+    )
+
+    top_industries = pd.Series(cube[:, :n_industries].sum(axis=0), index=pd.Index(industries, name='업종명'), name='count')
+    district_counts = pd.Series(seoul_totals, index=pd.Index(seoul_districts, name='자치구'), name='count')
+    return {
+        'total': len(df),
+        'district_count': n_districts,
+        'industry_count': n_industries,
+        'top_industries': top_industries.sort_values(ascending=False, kind='stable'),
+        'heatmap_data': heatmap_data,
+        'entropy': diversity.sort_values(ascending=False),
+        'district_counts': district_counts.sort_values(ascending=False, kind='stable'),
+        'food_ratio': food_ratio.sort_values(ascending=False),
+        'medical_ratio': medical_ratio.sort_values(ascending=False),
+    }
 
-    if df.empty:
-        st.warning("⚠️ 분석할 데이터가 없습니다.")
-        return
-
-    st.header("📊 서울시 소비쿠폰 가맹점 통계 분석")
-    st.markdown("---")
-
-    col1, col2, col3 = st.columns(3)
-    col1.metric("총 가맹점 수", f"{len(df):,}개")
-    col2.metric("자치구 수", f"{df['자치구'].nunique()}개")
-    col3.metric("업종 수", f"{df['업종명'].nunique()}개")
+def render_analysis_figures(stats):
+    """집계 결과로 차트 6개를 그려 {이름: PNG 바이트}로 반환"""
+    figures = {}
 
-    st.subheader("🏷️ 업종별 가맹점 수")
-    top_industries = df['업종명'].value_counts()
+    top_industries = stats['top_industries']
     fig1, ax1 = plt.subplots(figsize=(10, 6))
     sns.barplot(y=top_industries.index, x=top_industries.values, ax=ax1)
     ax1.set_xlabel("가맹점 수")
-    st.pyplot(fig1)
+    figures['industries'] = figure_to_bytes(fig1)
 
-    st.subheader("🗺️ 자치구별 업종 분포 히트맵")
-    heatmap_data = df[df['자치구'] != '기타'].pivot_table(index='자치구', columns='업종명', aggfunc='size', fill_value=0)
     fig2, ax2 = plt.subplots(figsize=(14, 10))
-    sns.heatmap(heatmap_data, annot=True, fmt='d', cmap='YlGnBu', ax=ax2)
-    st.pyplot(fig2)
+    sns.heatmap(stats['heatmap_data'], annot=True, fmt='d', cmap='YlGnBu', ax=ax2)
+    figures['heatmap'] = figure_to_bytes(fig2)
 
-    st.subheader("🔍 자치구별 업종 다양성 지수 (엔트로피)")
-    entropy_df = df[df['자치구'] != '기타'].groupby('자치구')['업종명'].apply(calculate_diversity_index).sort_values(ascending=False)
+    entropy_df = stats['entropy']
     fig3, ax3 = plt.subplots(figsize=(10, 6))
     sns.barplot(x=entropy_df.values, y=entropy_df.index, ax=ax3, palette="viridis")
     ax3.set_xlabel("다양성 지수")
-    st.pyplot(fig3)
+    figures['entropy'] = figure_to_bytes(fig3)
 
-    st.subheader("📊 자치구별 전체 가맹점 수")
-    district_counts = df[df['자치구'] != '기타']['자치구'].value_counts()
+    district_counts = stats['district_counts']
     fig4, ax4 = plt.subplots(figsize=(12, 6))
     sns.barplot(x=district_counts.index, y=district_counts.values, ax=ax4)
     ax4.set_ylabel("가맹점 수")
-    plt.xticks(rotation=45)
-    st.pyplot(fig4)
+    ax4.tick_params(axis='x', labelrotation=45)
+    figures['districts'] = figure_to_bytes(fig4)
 
-    st.subheader("🍽️ 음식점/식음료업 집중도")
-    df_food = df[df['업종명'] == '음식점/식음료업']
-    food_ratio = df_food['자치구'].value_counts() / df['자치구'].value_counts() * 100
-    food_ratio = food_ratio.dropna().sort_values(ascending=False)
+    food_ratio = stats['food_ratio']
     fig5, ax5 = plt.subplots(figsize=(10, 6))
     sns.barplot(x=food_ratio.index, y=food_ratio.values, ax=ax5)
     ax5.set_ylabel("음식점 비율 (%)")
-    plt.xticks(rotation=45)
-    st.pyplot(fig5)
+    ax5.tick_params(axis='x', labelrotation=45)
+    figures['food'] = figure_to_bytes(fig5)
 
-    st.subheader("🏥 의료/복지 업종 비율")
-    df['의료여부'] = df['업종명'].apply(lambda x: x == '보건/복지')
-    medical_ratio = df[df['자치구'] != '기타'].groupby('자치구')['의료여부'].mean() * 100
-    medical_ratio = medical_ratio.sort_values(ascending=False)
+    medical_ratio = stats['medical_ratio']
     fig6, ax6 = plt.subplots(figsize=(10, 6))
     sns.barplot(x=medical_ratio.index, y=medical_ratio.values, ax=ax6)
     ax6.set_ylabel("의료/복지 업종 비율 (%)")
-    plt.xticks(rotation=45)
-    st.pyplot(fig6)
+    ax6.tick_params(axis='x', labelrotation=45)
+    figures['medical'] = figure_to_bytes(fig6)
+
+    return figures
+
+@st.cache_data(show_spinner=False)
+def _cached_stats(fingerprint, _df):
+    return compute_analysis_stats(_df)
+
+@st.cache_data(show_spinner=False)
+def _cached_figures(fingerprint, _stats):
+    return render_analysis_figures(_stats)
+
+def generate_analysis(df, fingerprint=None):
+    """가맹점 통계 화면을 그린다
+
+    fingerprint(데이터셋 버전)를 주면 집계 결과와 PNG 차트를 그 값으로 캐시해,
+    같은 데이터로 다시 실행될 때는 다시 계산하거나 그리지 않는다.
+    """
+    if df.empty:
+        st.warning("⚠️ 분석할 데이터가 없습니다.")
+        return
+
+    if fingerprint is None:
+        stats = compute_analysis_stats(df)
+        figures = render_analysis_figures(stats)
+    else:
+        stats = _cached_stats(fingerprint, df)
+        figures = _cached_figures(fingerprint, stats)
+
+    st.header("📊 서울시 소비쿠폰 가맹점 통계 분석")
+    st.markdown("---")
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("총 가맹점 수", f"{stats['total']:,}개")
+    col2.metric("자치구 수", f"{stats['district_count']}개")
+    col3.metric("업종 수", f"{stats['industry_count']}개")
+
+    st.subheader("🏷️ 업종별 가맹점 수")
+    st.image(figures['industries'], use_container_width=True)
+
+    st.subheader("🗺️ 자치구별 업종 분포 히트맵")
+    st.image(figures['heatmap'], use_container_width=True)
+
+    st.subheader("🔍 자치구별 업종 다양성 지수 (엔트로피)")
+    st.image(figures['entropy'], use_container_width=True)
+
+    st.subheader("📊 자치구별 전체 가맹점 수")
+    st.image(figures['districts'], use_container_width=True)
+
+    st.subheader("🍽️ 음식점/식음료업 집중도")
+    st.image(figures['food'], use_container_width=True)
+
+    st.subheader("🏥 의료/복지 업종 비율")
+    st.image(figures['medical'], use_container_width=True)
 
     st.success("✅ 분석이 완료되었습니다.")
 
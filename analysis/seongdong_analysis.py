@@ -45,7 +45,16 @@ def run_seongdong_analysis():
                 except Exception as e:
                     st.error(f"❌ 크롤링 중 오류 발생: {e}")
         return
-    
+
+    # 기존 CSV가 있으면 바뀐 페이지만 다시 수집
+    if st.button("🔄 변경분만 업데이트"):
+        with st.spinner("변경된 페이지 확인 중..."):
+            try:
+                df = crawl_shops_seongdong(output_path=SEONGDONG_DATA_PATH, max_pages=20, incremental=True)
+                st.success(f"✅ 업데이트 완료! {len(df)}개 매장")
+            except Exception as e:
+                st.error(f"❌ 업데이트 중 오류 발생: {e}")
+
     # 데이터 로드
     shop_df, pop_df, merged_df = load_and_merge_data()
     
@@ -60,8 +69,8 @@ def run_seongdong_analysis():
     cluster_results = perform_kmeans_clustering(pop_df, shop_df, merged_df)
 
     # 탭 구성
-    tab0, tab1, tab2, tab3, tab4 = st.tabs([
-        "📁 데이터 요약", "👥 인구 통계", "🏪 가맹점 통계", "🔄 통합 분석", "📚 고급 분석"
+    tab0, tab1, tab2, tab3, tab4, tab5 = st.tabs([
+        "📁 데이터 요약", "👥 인구 통계", "🏪 가맹점 통계", "🔄 통합 분석", "📚 고급 분석", "🗺️ 지도"
     ])
     
     with tab0:
@@ -79,5 +88,12 @@ def run_seongdong_analysis():
     with tab4:
         display_advanced_analysis_tab(shop_df, pop_df, merged_df, dong_analysis, cluster_results)
 
+    with tab5:
+        st.subheader("🗺️ 가맹점 분포와 동별 매장 밀도")
+        if 'latitude' not in shop_df.columns:
+            st.info("💡 좌표 파일이 없어 동 마커만 표시합니다. `python -m services.seongdong_enrichment`로 주소 좌표를 만들 수 있습니다.")
+        # 지도 조작으로 앱이 다시 실행되지 않도록 반환값은 받지 않는다
+        st_folium(create_folium_map(merged_df, shop_df), height=500, width=None, returned_objects=[])
+
 if __name__ == "__main__":
     run_seongdong_analysis()
\ No newline at end of file
@@ -1,25 +1,98 @@
+import hashlib
+
+import numpy as np
 import pandas as pd
-from sklearn.cluster import KMeans
+import streamlit as st
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.preprocessing import StandardScaler
 
+import config
+
+def merge_dong_population(shop_df, pop_df):
+    """동별 매장수와 인구 통계를 동 이름 인덱스로 병합 (동마다 한 행, 인구가 없는 동은 NaN)"""
+    store_counts = shop_df.groupby('dong', observed=True).size().rename('매장수')
+    merged = store_counts.to_frame().join(pop_df.set_index('행정기관'), how='left')
+    merged.index.name = 'dong'
+    return merged.reset_index()
+
+def dong_centroids(shop_df):
+    """좌표가 있는 매장의 평균 위치로 동 중심을 계산 (인덱스: dong, 컬럼: latitude, longitude, 좌표매장수)"""
+    if 'latitude' not in shop_df.columns:
+        return pd.DataFrame(columns=['latitude', 'longitude', '좌표매장수']).rename_axis('dong')
+    located = shop_df.dropna(subset=['latitude', 'longitude'])
+    centroids = located.groupby('dong', observed=True)[['latitude', 'longitude']].mean()
+    centroids['좌표매장수'] = located.groupby('dong', observed=True).size()
+    return centroids
+
 def calculate_dong_analysis(merged_df):
     """인구 대비 매장 밀도 및 성비 등 동별 분석 데이터를 계산합니다."""
     dong_analysis = pd.DataFrame()
     valid_merged = merged_df[merged_df['총인구수'].notna() & (merged_df['총인구수'] > 0)]
     if len(valid_merged) > 0:
-        dong_analysis = valid_merged.groupby('dong').agg({
-            'store_name': 'count',
-            '총인구수': 'first',
-            '남자인구수': 'first',
-            '여자인구수': 'first'
-        }).reset_index()
-        dong_analysis.columns = ['dong', '매장수', '총인구수', '남자인구수', '여자인구수']
+        # merged_df는 merge_dong_population의 동 단위 결과
+        dong_analysis = valid_merged[['dong', '매장수', '총인구수', '남자인구수', '여자인구수']].reset_index(drop=True)
         dong_analysis['인구대비매장밀도'] = dong_analysis['매장수'] / dong_analysis['총인구수'] * 10000
         dong_analysis['성비'] = dong_analysis['남자인구수'] / dong_analysis['여자인구수']
     return dong_analysis
 
-def perform_kmeans_clustering(pop_df, shop_df, merged_df):
-    """KMeans 군집 분석을 수행하고 결과를 반환합니다."""
+def _feature_hash(values, params):
+    """특성 행렬 값과 군집 파라미터의 SHA-1 해시"""
+    digest = hashlib.sha1(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    digest.update(repr(values.shape).encode())
+    digest.update(repr(params).encode())
+    return digest.hexdigest()
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _fit_clusters(feature_hash, n_clusters, method, init_hash, _values, _init):
+    """표준화 후 (군집 번호, 표준화 전 단위의 군집 중심)을 계산
+
+    같은 특성 행렬/파라미터/초기 중심이면 다시 학습하지 않는다. method가 'minibatch'이고
+    _init(이전 군집 중심)이 있으면 그 중심에서 시작해 짧게 다시 학습한다.
+    """
+    scaler = StandardScaler()
+    scaled = scaler.fit_transform(_values)
+    if method == 'minibatch':
+        if _init is not None:
+            model = MiniBatchKMeans(n_clusters=n_clusters, init=scaler.transform(_init), n_init=1, random_state=42)
+        else:
+            model = MiniBatchKMeans(n_clusters=n_clusters, random_state=42, n_init=3)
+    else:
+        model = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
+    labels = model.fit_predict(scaled)
+    return labels, scaler.inverse_transform(model.cluster_centers_)
+
+def _warm_start_state():
+    """세션별 (특성 컬럼, 군집 수, 방법) → 직전 학습 정보 (특성 해시, 초기 중심, 학습된 중심)"""
+    return st.session_state.setdefault('seongdong_cluster_warm_start', {})
+
+def _fit_cluster_labels(feature_hash, features, n_clusters, method, values, warm_start):
+    """군집 번호를 계산하고 이 세션의 직전 학습 정보를 갱신
+
+    특성 행렬이 직전과 같으면 같은 초기 중심을 넘겨 캐시된 결과를 그대로 쓰고,
+    바뀌었으면(minibatch) 직전에 학습된 중심에서 시작한다.
+    """
+    key = (features, n_clusters, method)
+    previous = warm_start.get(key)
+    if previous is not None and previous['hash'] == feature_hash:
+        init = previous['init']
+    elif previous is not None and method == 'minibatch':
+        init = previous['centers']
+    else:
+        init = None
+    init_hash = None if init is None else _feature_hash(init, ())
+    labels, centers = _fit_clusters(feature_hash, n_clusters, method, init_hash, values, init)
+    warm_start[key] = {'hash': feature_hash, 'init': init, 'centers': centers}
+    return labels
+
+def perform_kmeans_clustering(pop_df, shop_df, merged_df, method=None, warm_start=None):
+    """KMeans 군집 분석을 수행하고 결과를 반환합니다.
+
+    모델 학습 결과는 특성 행렬과 파라미터의 해시로 캐시되므로, 데이터가 그대로면
+    재실행 때 다시 학습하지 않는다. method는 'kmeans' 또는 'minibatch' (기본값은 설정 파일).
+    warm_start는 직전 군집 중심을 기억하는 dict (기본값은 이 세션의 st.session_state).
+    """
+    method = method or config.SEONGDONG_CLUSTER_METHOD
+    warm_start = _warm_start_state() if warm_start is None else warm_start
     cluster_results = {'pop_df_clustered': None, 'cluster_store_counts': None, 'available_features': None, 'n_clusters': 0}
     cluster_features = ['총인구수', '남자인구수', '여자인구수', '5세이하인구수', '65세이상인구수']
     available_features = [col for col in cluster_features if col in pop_df.columns]
@@ -29,11 +102,11 @@ def perform_kmeans_clustering(pop_df, shop_df, merged_df):
         cluster_data = cluster_data.dropna()
         
         if len(cluster_data) >= 4:
-            scaler = StandardScaler()
-            cluster_data_scaled = scaler.fit_transform(cluster_data)
             n_clusters = min(4, len(cluster_data))
-            kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
-            cluster_labels = kmeans.fit_predict(cluster_data_scaled)
+            values = cluster_data.to_numpy(dtype=np.float64)
+            features = tuple(available_features)
+            feature_hash = _feature_hash(values, (features, n_clusters, method))
+            cluster_labels = _fit_cluster_labels(feature_hash, features, n_clusters, method, values, warm_start)
             
             pop_df_clustered = pop_df.iloc[cluster_data.index].copy()
             pop_df_clustered['군집'] = cluster_labels
@@ -42,7 +115,7 @@ def perform_kmeans_clustering(pop_df, shop_df, merged_df):
             if 'dong' in shop_df.columns:
                 cluster_merged = merged_df.merge(pop_df_clustered[['행정기관', '군집']], 
                                                left_on='dong', right_on='행정기관', how='left')
-                cluster_store_counts = cluster_merged.groupby('군집')['store_name'].count().reset_index()
+                cluster_store_counts = cluster_merged.groupby('군집')['매장수'].sum().reset_index()
                 cluster_store_counts.columns = ['군집', '총매장수']
             
             cluster_results = {
@@ -51,4 +124,4 @@ def perform_kmeans_clustering(pop_df, shop_df, merged_df):
                 'available_features': available_features,
                 'n_clusters': n_clusters
             }
-    return cluster_results
\ No newline at end of file
+    return cluster_results
@@ -0,0 +1,127 @@
+"""매장 조회 API (Streamlit 없이 실행하는 ASGI 서비스)
+
+    uvicorn api.app:app --host 0.0.0.0 --port 8000
+
+시작할 때 config.MAIN_DATA_PATH의 매장 데이터와 인덱스를 한 번만 만들고 모든 요청이 공유한다.
+조회와 직렬화는 CPU 작업이므로 스레드 풀에서 실행해 이벤트 루프가 다른 요청을 계속 받게 한다.
+목록 응답은 기본이 JSON이고, format=arrow 또는 Accept: application/vnd.apache.arrow.stream이면
+Arrow IPC 스트림으로 보낸다.
+"""
+import contextlib
+import json
+import math
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+import config
+from api.service import ShopQueryService, to_arrow_stream
+from services.kakao_api import GeocodeAuthError, geocode_many
+
+ARROW_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+
+
+class QueryError(ValueError):
+    """요청 파라미터가 잘못되었을 때 발생 (400 응답)"""
+
+
+def _number(params, name, default=None, minimum=None, maximum=None, cast=float):
+    value = params.get(name)
+    if value is None or value == '':
+        if default is None:
+            raise QueryError(f"'{name}' 파라미터가 필요합니다")
+        return default
+    try:
+        number = cast(value)
+    except ValueError:
+        raise QueryError(f"'{name}' 값이 숫자가 아닙니다: {value}") from None
+    if not math.isfinite(number) or (minimum is not None and number < minimum) or (maximum is not None and number > maximum):
+        raise QueryError(f"'{name}' 값이 허용 범위({minimum}~{maximum})를 벗어났습니다: {value}")
+    return number
+
+
+def _filters(params):
+    return params.get('q', ''), params.get('district'), params.get('industry_code')
+
+
+def _limit(params):
+    return _number(params, 'limit', config.API_DEFAULT_LIMIT, 1, config.API_MAX_LIMIT, int)
+
+
+def _shops_response(request, shops, **meta):
+    """매장 목록을 요청한 형식(JSON/Arrow)으로 응답 (meta는 JSON 본문 또는 X- 헤더로 전달)"""
+    wants_arrow = request.query_params.get('format') == 'arrow' or ARROW_MEDIA_TYPE in request.headers.get('accept', '')
+    if wants_arrow:
+        headers = {f"X-{key.replace('_', '-').title()}": str(value) for key, value in meta.items()}
+        return Response(to_arrow_stream(shops), media_type=ARROW_MEDIA_TYPE, headers=headers)
+    # 행 수가 많을 수 있으므로 목록은 pandas로 한 번에 직렬화해 그대로 붙인다
+    records = shops.to_json(orient='records', force_ascii=False, double_precision=6)
+    head = json.dumps({**meta, 'count': len(shops)}, ensure_ascii=False)[:-1]
+    return Response(f'{head}, "shops": {records}}}', media_type='application/json')
+
+
+async def nearby(request):
+    """반경 안에서 조건에 맞는 매장을 가까운 순으로 반환 (lat/lon 대신 address로 위치 지정 가능)"""
+    params = request.query_params
+    service = request.app.state.service
+    address = params.get('address')
+    if address and 'lat' not in params:
+        found = await run_in_threadpool(geocode_many, [address])
+        lat, lon = found.get(address, (None, None))
+        if lat is None:
+            return JSONResponse({'error': f"주소의 좌표를 찾을 수 없습니다: {address}"}, status_code=404)
+    else:
+        lat = _number(params, 'lat', minimum=-90, maximum=90)
+        lon = _number(params, 'lon', minimum=-180, maximum=180)
+    radius_km = _number(params, 'radius_km', config.API_DEFAULT_RADIUS_KM, 0, 20000)
+    shops = await run_in_threadpool(service.nearby, lat, lon, radius_km, *_filters(params), limit=_limit(params))
+    return await run_in_threadpool(_shops_response, request, shops, lat=lat, lon=lon, radius_km=radius_km)
+
+
+async def search(request):
+    """조건(매장명/지역구/업종코드)에 맞는 매장을 데이터 순서로 페이지 단위로 반환"""
+    params = request.query_params
+    offset = _number(params, 'offset', 0, 0, cast=int)
+    total, shops = await run_in_threadpool(
+        request.app.state.service.search, *_filters(params), limit=_limit(params), offset=offset
+    )
+    return await run_in_threadpool(_shops_response, request, shops, total=total, offset=offset)
+
+
+async def stats(request):
+    """조건에 맞는 매장 수와 지역구별/상위 업종별 매장 수"""
+    params = request.query_params
+    top_n = _number(params, 'top_n', 10, 1, 1000, int)
+    return JSONResponse(await run_in_threadpool(request.app.state.service.stats, *_filters(params), top_n=top_n))
+
+
+async def _query_error(request, exc):
+    return JSONResponse({'error': str(exc)}, status_code=400)
+
+
+async def _geocode_unavailable(request, exc):
+    return JSONResponse({'error': f"주소 검색을 사용할 수 없습니다: {exc}"}, status_code=503)
+
+
+def create_app(csv_path=config.MAIN_DATA_PATH, service=None):
+    """조회 API 앱 생성 (service를 주면 그 데이터를, 아니면 시작할 때 csv_path를 읽어 사용)"""
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        app.state.service = service or ShopQueryService.from_csv(csv_path)
+        yield
+
+    return Starlette(
+        routes=[
+            Route('/nearby', nearby),
+            Route('/search', search),
+            Route('/stats', stats),
+        ],
+        exception_handlers={QueryError: _query_error, GeocodeAuthError: _geocode_unavailable},
+        lifespan=lifespan,
+    )
+
+
+app = create_app()
@@ -0,0 +1,152 @@
+"""조회 API 부하 테스트 (표준 라이브러리 asyncio HTTP/1.1 클라이언트)
+
+    python -m api.loadtest --url http://127.0.0.1:8000 --concurrency 1 8 64 --duration 10
+
+동시 접속 수마다 클라이언트가 각자 keep-alive 연결 하나로 요청을 연달아 보내고,
+엔드포인트별/전체 QPS와 p50/p99 지연 시간(ms)을 출력한다.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from urllib.parse import urlencode, urlsplit
+
+import numpy as np
+
+# 서울 시내 무작위 위치를 만들 범위 (위도, 경도)
+SEOUL_BOUNDS = ((37.43, 37.70), (126.80, 127.18))
+SEARCH_SYLLABLES = list('가나다라마바사아자차카타파하김이박최정강조윤장임')
+
+
+class HttpConnection:
+    """keep-alive로 GET 요청을 보내는 최소한의 HTTP/1.1 연결"""
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def get(self, path):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(f'GET {path} HTTP/1.1\r\nHost: {self.host}\r\n\r\n'.encode())
+        await self.writer.drain()
+
+        head = await self.reader.readuntil(b'\r\n\r\n')
+        lines = head.decode('latin-1').split('\r\n')
+        status = int(lines[0].split()[1])
+        headers = dict(line.split(': ', 1) for line in lines[1:] if ': ' in line)
+        headers = {key.lower(): value for key, value in headers.items()}
+        if headers.get('transfer-encoding') == 'chunked':
+            body = bytearray()
+            while size := int((await self.reader.readuntil(b'\r\n')).strip(), 16):
+                body += await self.reader.readexactly(size + 2)
+                del body[-2:]
+            await self.reader.readuntil(b'\r\n')
+        else:
+            body = await self.reader.readexactly(int(headers.get('content-length', 0)))
+        if headers.get('connection') == 'close':
+            await self.close()
+        return status, bytes(body)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+def make_requests(rng, count, endpoints, districts, industries):
+    """엔드포인트별 무작위 요청 경로 목록 (같은 시드면 같은 요청)"""
+    requests = []
+    for _ in range(count):
+        endpoint = rng.choice(endpoints)
+        params = {}
+        if rng.random() < 0.3 and districts:
+            params['district'] = rng.choice(districts)
+        if rng.random() < 0.2 and industries:
+            params['industry_code'] = rng.choice(industries)
+        if endpoint == 'nearby':
+            params['lat'] = round(rng.uniform(*SEOUL_BOUNDS[0]), 5)
+            params['lon'] = round(rng.uniform(*SEOUL_BOUNDS[1]), 5)
+            params['radius_km'] = rng.choice([0.5, 1, 3, 5])
+            if rng.random() < 0.2:
+                params['q'] = rng.choice(SEARCH_SYLLABLES)
+        elif endpoint == 'search':
+            params['q'] = ''.join(rng.sample(SEARCH_SYLLABLES, rng.choice([1, 2])))
+        requests.append((endpoint, f'/{endpoint}?{urlencode(params)}'))
+    return requests
+
+
+async def run_level(host, port, concurrency, duration, requests):
+    """concurrency개 클라이언트가 duration초 동안 요청을 보내고 (엔드포인트, 지연 초, 상태) 목록을 반환"""
+    results = []
+    deadline = time.perf_counter() + duration
+    cursor = itertools.count()
+
+    async def client():
+        connection = HttpConnection(host, port)
+        try:
+            while time.perf_counter() < deadline:
+                endpoint, path = requests[next(cursor) % len(requests)]
+                start = time.perf_counter()
+                try:
+                    status, _ = await connection.get(path)
+                except (OSError, asyncio.IncompleteReadError):
+                    await connection.close()
+                    status = 0
+                results.append((endpoint, time.perf_counter() - start, status))
+        finally:
+            await connection.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return results, time.perf_counter() - started
+
+
+def summarize(results, elapsed):
+    rows = []
+    for endpoint in sorted({endpoint for endpoint, _, _ in results}) + ['전체']:
+        selected = [(latency, status) for name, latency, status in results if endpoint in ('전체', name)]
+        latencies = np.array([latency for latency, _ in selected]) * 1000
+        errors = sum(status != 200 for _, status in selected)
+        rows.append((endpoint, len(selected), errors, len(selected) / elapsed,
+                     np.percentile(latencies, 50), np.percentile(latencies, 99)))
+    return rows
+
+
+async def main(args):
+    url = urlsplit(args.url)
+    host, port = url.hostname, url.port or 80
+
+    # 필터 값은 서버의 실제 지역구/업종 목록에서 고른다
+    connection = HttpConnection(host, port)
+    status, body = await connection.get('/stats?top_n=50')
+    await connection.close()
+    if status != 200:
+        raise SystemExit(f"/stats 응답 오류: HTTP {status}")
+    summary = json.loads(body)
+    print(f"대상: {args.url} (매장 {summary['total']:,}개)")
+
+    rng = random.Random(args.seed)
+    requests = make_requests(rng, args.requests, args.endpoints, list(summary['districts']), list(summary['industries']))
+
+    print(f"{'동시접속':>8} {'엔드포인트':<8} {'요청수':>8} {'오류':>6} {'QPS':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for concurrency in args.concurrency:
+        if args.warmup:
+            await run_level(host, port, concurrency, args.warmup, requests)
+        results, elapsed = await run_level(host, port, concurrency, args.duration, requests)
+        for endpoint, count, errors, qps, p50, p99 in summarize(results, elapsed):
+            print(f"{concurrency:>8} {endpoint:<8} {count:>8} {errors:>6} {qps:>9.1f} {p50:>9.2f} {p99:>9.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='매장 조회 API 부하 테스트')
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 64])
+    parser.add_argument('--duration', type=float, default=10, help='동시접속 수마다 측정할 시간 (초)')
+    parser.add_argument('--warmup', type=float, default=1, help='측정 전에 버리는 시간 (초)')
+    parser.add_argument('--endpoints', nargs='+', default=['nearby', 'search', 'stats'], choices=['nearby', 'search', 'stats'])
+    parser.add_argument('--requests', type=int, default=2000, help='미리 만들어 돌려 쓰는 요청 수')
+    parser.add_argument('--seed', type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,96 @@
+import numpy as np
+import pyarrow as pa
+
+from utils.filter_index import ShopFilterIndex
+from utils.preprocessing import full_address, load_shops
+from utils.shop_query import find_nearby_shops
+from utils.shop_store import ShopStore
+from utils.spatial_index import ShopSpatialIndex
+
+# 응답에 담는 매장 컬럼 (리스트 탭과 같은 정보 + 좌표)
+SHOP_COLUMNS = ['store_name', 'industry_code', 'full_address', 'district', 'latitude', 'longitude']
+
+
+class ShopQueryService:
+    """전처리된 매장 데이터와 공간/필터 인덱스를 한 번 만들어 두고 여러 요청이 공유한다
+
+    Streamlit 앱과 같은 전처리 결과(load_shops)와 같은 조회 함수
+    (find_nearby_shops)를 쓰므로, 같은 조건이면 앱의 지도/리스트와 같은 매장이 나온다.
+    만든 뒤에는 읽기만 하므로 여러 스레드에서 동시에 써도 된다.
+    """
+
+    def __init__(self, df):
+        if df.empty:
+            raise ValueError("매장 데이터가 비어 있습니다")
+        # DataFrame 대신 압축 저장소를 들고 있고, 응답할 행만 DataFrame으로 만든다
+        self.store = ShopStore.from_frame(df)
+        self.spatial_index = ShopSpatialIndex(self.store.latitude, self.store.longitude)
+        self.filter_index = ShopFilterIndex(df)
+        # 요청 파라미터는 문자열이므로 범주 값(업종코드가 숫자일 수도 있음)을 문자열로 찾는다
+        self._categories = {
+            column: {str(value): value for value in self.store.categories(column)}
+            for column in ('district', 'industry_code')
+        }
+
+    @classmethod
+    def from_csv(cls, csv_path):
+        return cls(load_shops(csv_path))
+
+    def _page(self, positions):
+        shops = self.store.frame(positions).reset_index(drop=True)
+        shops['full_address'] = full_address(shops)
+        return shops[SHOP_COLUMNS]
+
+    def _category(self, column, value):
+        if not value or value == '전체':
+            return '전체'
+        return self._categories[column].get(value, value)
+
+    def _rows(self, search_query, district, industry_code):
+        """필터 조건에 맞는 행 위치 (조건이 없으면 None)"""
+        district = self._category('district', district)
+        industry_code = self._category('industry_code', industry_code)
+        return self.filter_index.query(
+            search_query or '',
+            None if district == '전체' else district,
+            None if industry_code == '전체' else industry_code,
+        )
+
+    def nearby(self, lat, lon, radius_km, search_query='', district=None, industry_code=None, limit=100):
+        """반경 안에서 조건에 맞는 매장을 가까운 순으로 최대 limit개 (distance 컬럼 포함)"""
+        positions, distances = find_nearby_shops(
+            self.spatial_index, self.filter_index, lat, lon, radius_km, search_query or '',
+            self._category('district', district), self._category('industry_code', industry_code), limit,
+        )
+        shops = self._page(positions)
+        shops['distance'] = distances
+        return shops
+
+    def search(self, search_query='', district=None, industry_code=None, limit=100, offset=0):
+        """조건에 맞는 매장을 데이터 순서로 offset부터 limit개, 전체 개수와 함께 반환"""
+        rows = self._rows(search_query, district, industry_code)
+        total = len(self.store) if rows is None else len(rows)
+        page = np.arange(offset, min(offset + limit, total)) if rows is None else rows[offset:offset + limit]
+        return total, self._page(page)
+
+    def stats(self, search_query='', district=None, industry_code=None, top_n=10):
+        """조건에 맞는 매장의 개수, 지역구별 개수, 상위 업종별 개수"""
+        rows = self._rows(search_query, district, industry_code)
+        result = {'total': len(self.store) if rows is None else len(rows)}
+        for column, key, limit in (('district', 'districts', None), ('industry_code', 'industries', top_n)):
+            categories = self.store.categories(column)
+            # 마지막 칸은 결측값 몫이므로 버린다
+            counts = np.bincount(self.store.codes(column, rows), minlength=len(categories) + 1)[:-1]
+            order = np.argsort(-counts, kind='stable')
+            order = order[counts[order] > 0][:limit]
+            result[key] = {str(categories[i]): int(counts[i]) for i in order}
+        return result
+
+
+def to_arrow_stream(df):
+    """DataFrame을 Arrow IPC 스트림 바이트로 변환"""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
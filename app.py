@@ -4,8 +4,10 @@ from dotenv import load_dotenv
 
 import config
 from services.kakao_api import geocode
-from utils.helpers import calculate_distance, configure_matplotlib_fonts
-from utils.data_loader import load_and_preprocess_data
+from utils.helpers import configure_matplotlib_fonts
+from utils.data_loader import load_shop_store, load_analysis_frame, load_spatial_index, load_filter_index, load_cluster_pyramid
+from utils.preprocessing import full_address
+from utils.shop_query import find_nearby_shops
 from components.ui import create_sidebar, display_main_stats, create_tabs
 
 def main():
@@ -24,7 +26,7 @@ def main():
                          placeholder="예: 서울 종로구 세종대로 172",
                          key="address_input")
     if st.button("내 위치 찾기"):
-        lat, lon = geocode(addr)
+        lat, lon = geocode(addr, parallel=config.GEOCODE_PARALLEL_PROBING)
         if lat is None:
             st.error("좌표를 찾을 수 없습니다. 주소를 다시 확인하세요.")
         else:
@@ -42,31 +44,26 @@ def main():
     user_lon = st.session_state.get("user_lon")
     current_addr = st.session_state.get("user_addr")
 
-    df_shops = load_and_preprocess_data(config.MAIN_DATA_PATH)
+    shops = load_shop_store(config.MAIN_DATA_PATH)
 
-    if df_shops.empty:
+    if shops is None:
         st.stop()
 
-    search_query, selected_district, selected_industry_code, max_distance = create_sidebar(df_shops)
+    search_query, selected_district, selected_industry_code, max_distance = create_sidebar(shops)
 
-    filtered_df = df_shops.copy()
-    if search_query:
-        filtered_df = filtered_df[filtered_df['store_name'].str.contains(search_query, case=False, na=False)]
-    if selected_district != '전체':
-        filtered_df = filtered_df[filtered_df['district'] == selected_district]
-    if selected_industry_code != '전체':
-        filtered_df = filtered_df[filtered_df['industry_code'] == selected_industry_code]
+    # 미리 만든 필터/공간 인덱스로 조건에 맞는 가까운 매장만 찾는다
+    positions, distances = find_nearby_shops(
+        load_spatial_index(config.MAIN_DATA_PATH), load_filter_index(config.MAIN_DATA_PATH),
+        user_lat, user_lon, max_distance, search_query, selected_district, selected_industry_code
+    )
+    filtered_df = shops.frame(positions)
+    filtered_df['distance'] = distances
+    filtered_df['full_address'] = full_address(filtered_df)
+    marker_clusters = load_cluster_pyramid(config.MAIN_DATA_PATH).clusters(positions, config.MAP_MAX_CLUSTER_FEATURES)
 
-    if not filtered_df.empty:
-        filtered_df['distance'] = filtered_df.apply(
-            lambda row: calculate_distance(user_lat, user_lon, row['latitude'], row['longitude']),
-            axis=1
-        )
-        filtered_df = filtered_df[filtered_df['distance'] <= max_distance]
-        filtered_df = filtered_df.sort_values('distance').head(1000)
-
-    display_main_stats(df_shops, filtered_df, current_addr)
-    create_tabs(filtered_df, df_shops, user_lat, user_lon, max_distance, KAKAO_MAP_API_KEY)
+    display_main_stats(shops, filtered_df, current_addr)
+    create_tabs(filtered_df, load_analysis_frame(config.MAIN_DATA_PATH), user_lat, user_lon, max_distance,
+                KAKAO_MAP_API_KEY, marker_clusters)
 
     st.markdown("---")
     st.markdown("🔧 **카카오맵 API**를 활용한 민생회복 소비쿠폰 사용처 검색 서비스")
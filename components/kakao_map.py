@@ -1,293 +1,145 @@
-
-import streamlit as st
-import pandas as pd
+import hashlib
 import json
-import html
-
-def create_kakao_map(filtered_df, user_lat, user_lon, max_distance, kakao_api_key):
-    """수정된 카카오맵을 생성하는 함수 - kakao.maps.load() 사용"""
-
-    if not kakao_api_key:
-        return "<div style='padding:20px; text-align:center; color:red;'>❌ API 키가 없어서 지도를 표시할 수 없습니다.</div>"
-
-    # 마커 데이터를 JSON 형태로 준비 (안전하게 처리)
-    markers_data = []
-    for idx, row in filtered_df.iterrows():
-        try:
-            if pd.notnull(row['latitude']) and pd.notnull(row['longitude']):
-                # HTML 이스케이프 처리로 XSS 방지
-                markers_data.append({
-                    'lat': float(row['latitude']),
-                    'lng': float(row['longitude']),
-                    'name': html.escape(str(row['store_name'])[:50]),
-                    'address': html.escape(str(row['full_address'])[:100]),
-                    'industry_code': html.escape(str(row['industry_code'])),
-                    'distance': round(float(row['distance']), 2)
-                })
-        except Exception as e:
-            # 개별 마커 오류는 무시하고 계속 진행
-            continue
-
-    if not markers_data:
-        return "<div style='padding:20px; text-align:center;'>📍 표시할 매장이 없습니다.</div>"
-
-    # JSON 안전하게 생성
-    try:
-        markers_json = json.dumps(markers_data, ensure_ascii=False)
-    except Exception as e:
-        st.error(f"JSON 데이터 생성 오류: {e}")
-        return "<div style='padding:20px; text-align:center; color:red;'>❌ 데이터 처리 오류</div>"
-
-
-
-    kakao_map_html = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <title>카카오맵 - 민생회복 소비쿠폰 사용처</title>
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <style>
-        html, body {{
-            width: 100%;
-            height: 100%;
-            margin: 0;
-            padding: 0;
-        }}
-        #map {{
-            width: 100%;
-            height: 600px;
-        }}
-        #loading {{
-            position: absolute;
-            top: 50%;
-            left: 50%;
-            transform: translate(-50%, -50%);
-            z-index: 1000;
-            background: rgba(255, 255, 255, 0.9);
-            padding: 20px;
-            border-radius: 8px;
-            box-shadow: 0 4px 12px rgba(0,0,0,0.15);
-            text-align: center;
-            font-family: Arial, sans-serif;
-        }}
-        .error {{
-            color: red;
-            padding: 20px;
-            text-align: center;
-            font-family: Arial, sans-serif;
-        }}
-    </style>
-</head>
-<body>
-    <div id="loading">
-        🗺️ 지도 로딩 중...<br>
-        <small>잠시만 기다려주세요</small>
-    </div>
-    <div id="map"></div>
-
-    <script type="text/javascript" src="//dapi.kakao.com/v2/maps/sdk.js?appkey={kakao_api_key}&libraries=services,clusterer&autoload=false"></script>
-    <script>
-        console.log('스크립트 로딩 시작');
-
-        function hideLoading() {{
-            const loading = document.getElementById('loading');
-            if (loading) loading.style.display = 'none';
-        }}
-
-        function showError(message) {{
-            hideLoading();
-            document.getElementById('map').innerHTML = '<div class="error">❌ ' + message + '</div>';
-            console.error(message);
-        }}
-
-        // 전역 오류 처리
-        window.onerror = function(msg, url, line, col, error) {{
-            showError('JavaScript 오류: ' + msg);
-            return true;
-        }};
-
-        // 🔑 핵심: kakao.maps.load() 함수 사용!
-        try {{
-            if (typeof kakao === 'undefined') {{
-                throw new Error('카카오맵 스크립트가 로드되지 않았습니다. API 키를 확인해주세요.');
-            }}
-
-            console.log('카카오 객체 확인 완료');
-
-
-            // 여기가 핵심! kakao.maps.load() 콜백 안에서 모든 지도 관련 코드 실행
-            kakao.maps.load(function() {{
-                console.log('카카오맵 라이브러리 로딩 완료');
-
-                try {{
-                    hideLoading();
-
-                    // 지도 생성
-                    var mapContainer = document.getElementById('map');
-                    var mapOption = {{
-                        center: new kakao.maps.LatLng({user_lat}, {user_lon}),
-                        level: 5
-                    }};
-                    var map = new kakao.maps.Map(mapContainer, mapOption);
-
-                    console.log('지도 생성 완료');
+import os
 
-                    // 내 위치 마커
-                    var userPosition = new kakao.maps.LatLng({user_lat}, {user_lon});
-                    var userMarker = new kakao.maps.Marker({{
-                        position: userPosition,
-                        image: new kakao.maps.MarkerImage(
-                            'https://t1.daumcdn.net/localimg/localimages/07/mapapidoc/marker_red.png',
-                            new kakao.maps.Size(50, 50),
-                            new kakao.maps.Point(25, 50)
-                        )
-                    }});
-                    userMarker.setMap(map);
-
-                    // 내 위치 정보창
-                    var userInfowindow = new kakao.maps.InfoWindow({{
-                        content: '<div style="padding:5px;font-size:12px;">🏠 내 위치</div>'
-                    }});
-                    userInfowindow.open(map, userMarker);
-
-                    // 검색 반경 원
-                    var circle = new kakao.maps.Circle({{
-                        center: userPosition,
-                        radius: {max_distance * 1000},
-                        strokeWeight: 2,
-                        strokeColor: '#FF0000',
-                        strokeOpacity: 0.8,
-                        strokeStyle: 'dashed',
-                        fillColor: '#FF0000',
-                        fillOpacity: 0.1
-                    }});
-                    circle.setMap(map);
-
-                    // 마커 클러스터러 생성 (조건부)
-                    var clusterer = null;
-                    var markersData = {markers_json};
-
-                    console.log('매장 데이터 수:', markersData.length);
-
-                    if (typeof kakao.maps.MarkerClusterer !== 'undefined' && markersData.length > 50) {{
-                        clusterer = new kakao.maps.MarkerClusterer({{
-                            map: map,
-                            averageCenter: true,
-                            minLevel: 4,
-                            disableClickZoom: false,
-                            styles: [{{ 
-                                width: '53px', height: '52px',
-                                background: 'rgba(255, 0, 0, 0.4)',
-                                borderRadius: "50%",
-                                color: '#fff', textAlign: 'center', fontWeight: 'bold', lineHeight: '53px'
-                            }}, {{ 
-                                width: '56px', height: '55px',
-                                background: 'rgba(255, 0, 0, 0.4)',
-                                borderRadius: "50%",
-                                color: '#fff', textAlign: 'center', fontWeight: 'bold', lineHeight: '56px'
-                            }}, {{ 
-                                width: '66px', height: '65px',
-                                background: 'rgba(255, 0, 0, 0.4)',
-                                borderRadius: "50%",
-                                color: '#fff', textAlign: 'center', fontWeight: 'bold', lineHeight: '66px'
-                            }}]
-                        }});
-                        console.log('마커 클러스터러 생성 완료');
-                    }} else {{
-                        console.log('마커 클러스터러 사용하지 않음 (매장 수: ' + markersData.length + ')');
-                    }}
-
-                    // 매장 마커들 생성
-                    var markers = [];
-                    for (var i = 0; i < markersData.length; i++) {{
-                        try {{
-                            var data = markersData[i];
-                            var marker = new kakao.maps.Marker({{
-                                position: new kakao.maps.LatLng(data.lat, data.lng)
-                            }});
-
-                            // 인포윈도우 생성
-                            var infowindow = new kakao.maps.InfoWindow({{
-                                content: '<div style="padding:10px;min-width:200px;">' +
-                                            '<strong>' + data.name + '</strong><br/>' +
-                                            '<span style="font-size:12px;">업종: ' + data.industry_code + '</span><br/>' +
-                                            '<span style="font-size:12px;">주소: ' + data.address + '</span><br/>' +
-                                            '<span style="font-size:12px;">거리: ' + data.distance.toFixed(2) + 'km</span>' +
-                                            '</div>',
-                                removable : true
-                            }});
-
-                            // 마커 클릭 이벤트
-                            (function(marker, infowindow) {{
-                                kakao.maps.event.addListener(marker, 'click', function() {{
-                                    console.log(infowindow);
-                                    infowindow.open(map, marker);
-                                }});
-                            }})(marker, infowindow);
-
-                            markers.push(marker);
-                        }} catch (e) {{
-                            console.error('마커 생성 오류:', e);
-                        }}
-                    }}
-
-                    // 마커들을 지도에 추가
-                    if (clusterer) {{
-                        clusterer.addMarkers(markers);
-                        console.log('클러스터러에 마커 추가 완료');
-                    }} else {{
-                        // 클러스터러가 없으면 직접 추가
-                        for (var i = 0; i < markers.length; i++) {{
-                            markers[i].setMap(map);
-                        }}
-                        console.log('지도에 마커 직접 추가 완료');
-                    }}
-
-                    // 지도 범위 조정
-                    if (markers.length > 0) {{
-                        var bounds = new kakao.maps.LatLngBounds();
-                        bounds.extend(userPosition);
-
-                        for (var i = 0; i < markersData.length; i++) {{
-                            bounds.extend(new kakao.maps.LatLng(markersData[i].lat, markersData[i].lng));
-                        }}
-
-                        map.setBounds(bounds);
-                        console.log('지도 범위 조정 완료');
-                    }}
-
-                    console.log('🎉 모든 지도 초기화 완료!');
-
-                    // 지도 이동/확대/축소 시 경계 좌표를 Python으로 전송
-                    kakao.maps.event.addListener(map, 'bounds_changed', function() {{
-                        var bounds = map.getBounds();
-                        var swLatlng = bounds.getSouthWest();
-                        var neLatlng = bounds.getNorthEast();
-
-                        var boundsData = {{
-                            topLeftLat: neLatlng.getLat(),
-                            topLeftLon: swLatlng.getLng(),
-                            bottomRightLat: swLatlng.getLat(),
-                            bottomRightLon: neLatlng.getLng()
-                        }};
-
-                        // Python으로 데이터 전송 필요
-
-                    }});
-
-                }} catch (error) {{
-                    console.error('지도 생성 오류:', error);
-                    showError('지도 생성 중 오류가 발생했습니다: ' + error.message);
-                }}
-            }});
-        }} catch (error) {{
-            console.error('카카오맵 초기화 오류:', error);
-            showError('카카오맵을 초기화할 수 없습니다: ' + error.message);
-        }}
-    </script>
-</body>
-</html>
-"""
-
-    return kakao_map_html
\ No newline at end of file
+import numpy as np
+import pandas as pd
+import streamlit as st
+import streamlit.components.v1 as components
+
+import config
+
+COORD_SCALE = 100000  # 좌표 정수화 배율 (1e-5도 ≈ 1m)
+
+# 정적 프런트엔드(빌드 과정 없음)를 한 번 등록해 두고, 재실행마다 iframe을 새로 만들지 않는다
+_FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'kakao_map_frontend')
+_kakao_map_component = components.declare_component('kakao_map', path=_FRONTEND_DIR)
+
+
+def build_marker_payload(shops_df):
+    """지도에 보낼 열 단위 매장 데이터 (매장 id = DataFrame 인덱스)
+
+    마커를 그리는 데 필요한 것만 보낸다: 좌표는 최소값 기준 정수로, 업종 코드는
+    사전(중복 없는 값 목록) + 번호로. 매장명과 주소는 팝업을 열 때 shop_detail로 따로 받는다.
+    """
+    df = shops_df[shops_df['latitude'].notna() & shops_df['longitude'].notna()]
+    lats = df['latitude'].to_numpy(dtype=np.float64)
+    lngs = df['longitude'].to_numpy(dtype=np.float64)
+    lat0 = float(lats.min()) if len(df) else 0.0
+    lng0 = float(lngs.min()) if len(df) else 0.0
+    industry_codes, industries = pd.factorize(df['industry_code'].astype(str))
+
+    return {
+        'id': df.index.to_numpy(dtype=np.int64).tolist(),
+        'scale': COORD_SCALE,
+        'lat0': lat0,
+        'lng0': lng0,
+        'lat': np.rint((lats - lat0) * COORD_SCALE).astype(np.int64).tolist(),
+        'lng': np.rint((lngs - lng0) * COORD_SCALE).astype(np.int64).tolist(),
+        'industries': list(industries),
+        'industry': industry_codes.tolist(),
+    }
+
+
+def shop_detail(shops_df, shop_id):
+    """팝업에 표시할 한 매장의 매장명/주소 (지금 결과에 없는 매장이면 값이 None)"""
+    if shop_id not in shops_df.index:
+        return {'id': shop_id, 'name': None, 'address': None}
+    row = shops_df.loc[shop_id]
+    return {'id': shop_id, 'name': str(row['store_name'])[:50], 'address': str(row['full_address'])[:100]}
+
+
+def build_cluster_payload(clusters, ids):
+    """레벨별 군집(ShopClusterPyramid.clusters 결과)을 정수 좌표로 변환
+
+    매장이 하나뿐인 군집의 'row'(ids 안의 순번)는 매장 id로 바꾼다.
+    """
+    clusters = clusters or {}
+    all_lats = np.concatenate([c['lat'] for c in clusters.values()] or [np.zeros(1)])
+    all_lngs = np.concatenate([c['lng'] for c in clusters.values()] or [np.zeros(1)])
+    lat0, lng0 = float(all_lats.min(initial=np.inf)), float(all_lngs.min(initial=np.inf))
+    levels = {}
+    for level, cluster in clusters.items():
+        rows = cluster['row']
+        levels[str(level)] = {
+            'lat': np.rint((cluster['lat'] - lat0) * COORD_SCALE).astype(np.int64).tolist(),
+            'lng': np.rint((cluster['lng'] - lng0) * COORD_SCALE).astype(np.int64).tolist(),
+            'count': cluster['count'].tolist(),
+            'row': np.where(rows >= 0, ids[np.maximum(rows, 0)], -1).tolist(),
+        }
+    return {'scale': COORD_SCALE, 'lat0': lat0, 'lng0': lng0, 'levels': levels}
+
+
+def kakao_map(filtered_df, user_lat, user_lon, max_distance, kakao_api_key, clusters=None, key='kakao_map'):
+    """카카오맵 컴포넌트를 그린다 - 재실행마다 바뀐 부분만 보낸다
+
+    세션마다 프런트엔드에 보낸 상태(매장 id, 중심, 반경, 군집)와 버전을 기억해 두고,
+    이번 결과와의 차이(추가/삭제 매장 등)만 base_version → version 변경분으로 보낸다.
+    프런트엔드가 버전이 맞지 않는다고 알려 오면 다음 실행에서 전체 데이터를 보낸다.
+    팝업을 연 매장의 매장명/주소는 프런트엔드가 요청할 때(detail) 그 매장 것만 보낸다.
+    clusters는 filtered_df 행 순서 기준 레벨별 군집이다.
+    """
+    sync_key = f'{key}_sync'
+    sync = st.session_state.get(sync_key)
+    request = st.session_state.get(key) or {}
+
+    if sync is None or request.get('resync', sync['resync']) != sync['resync']:
+        # 첫 실행이거나 프런트엔드가 전체 데이터를 요청한 경우
+        sync = {
+            'version': sync['version'] if sync else 0,
+            'ids': np.empty(0, dtype=np.int64),
+            'center': None,
+            'radius': None,
+            'clusters': None,
+            'resync': request.get('resync'),
+            'detail_seq': sync['detail_seq'] if sync else None,
+        }
+        base_version = None
+    else:
+        base_version = sync['version']
+
+    ids = filtered_df.index.to_numpy(dtype=np.int64)
+    sorted_ids = np.sort(ids)
+    added = np.setdiff1d(sorted_ids, sync['ids'], assume_unique=True)
+    removed = np.setdiff1d(sync['ids'], sorted_ids, assume_unique=True)
+
+    delta = {}
+    if len(added):
+        delta['add'] = build_marker_payload(filtered_df.loc[added])
+    if len(removed):
+        delta['remove'] = removed.tolist()
+    center = [float(user_lat), float(user_lon)]
+    if center != sync['center']:
+        delta['center'] = center
+    if max_distance != sync['radius']:
+        delta['radius'] = max_distance
+
+    cluster_payload = build_cluster_payload(clusters, ids)
+    cluster_digest = hashlib.sha1(json.dumps(cluster_payload, sort_keys=True).encode()).hexdigest()
+    if cluster_digest != sync['clusters']:
+        delta['clusters'] = cluster_payload
+
+    # 팝업 상세 요청은 버전과 무관하게 요청마다 한 번만 응답한다
+    detail = None
+    detail_request = request.get('detail')
+    if detail_request and detail_request.get('seq') != sync['detail_seq']:
+        detail = shop_detail(filtered_df, detail_request['id'])
+        sync['detail_seq'] = detail_request.get('seq')
+
+    if delta or base_version is None:
+        sync['version'] += 1
+        sync.update(ids=sorted_ids, center=center, radius=max_distance, clusters=cluster_digest)
+    else:
+        base_version = sync['version']
+    st.session_state[sync_key] = sync
+
+    return _kakao_map_component(
+        api_key=kakao_api_key,
+        version=sync['version'],
+        base_version=base_version,
+        delta=delta,
+        detail=detail,
+        max_visible=config.MAP_MAX_VISIBLE_MARKERS,
+        key=key,
+        default=None,
+    )
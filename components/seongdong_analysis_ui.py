@@ -2,7 +2,9 @@ import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-from utils.seongdong_analysis_utils import DONG_MERGE_MAP, plot_bar
+from analysis.seongdong_analysis_core import calculate_dong_analysis, merge_dong_population
+from utils.chart_cache import show_chart
+from utils.seongdong_analysis_utils import DONG_MERGE_MAP, count_stores_by_dong, plot_bar
 
 def display_data_summary_tab(shop_df, pop_df, merged_df):
     st.markdown("### 🔍 데이터 출처 및 설명")
@@ -30,7 +32,7 @@ def display_data_summary_tab(shop_df, pop_df, merged_df):
     """)
     mapping_df = pd.DataFrame(list(DONG_MERGE_MAP.items()), columns=['행정동', '통합동'])
     st.dataframe(mapping_df, use_container_width=True)
-    st.write(f"데이터 병합 후: {len(merged_df)}행, 총인구수 유효한 행: {merged_df['총인구수'].notna().sum()}개")
+    st.write(f"데이터 병합 후: {len(merged_df)}개 동 (매장 {merged_df['매장수'].sum():,}개), 총인구수 유효한 동: {merged_df['총인구수'].notna().sum()}개")
     st.markdown("### 🛠️ 전처리 흐름")
     st.markdown("""
     1. **데이터 수집**: 웹 크롤링으로 가맹점 데이터 수집
@@ -110,7 +112,7 @@ def display_shop_stats_tab(shop_df):
         return
     
     # 동별 매장 수 통계
-    store_counts = shop_df['dong'].value_counts().reset_index()
+    store_counts = count_stores_by_dong(shop_df).reset_index()
     store_counts.columns = ['dong', '매장수']
     
     if len(store_counts) == 0:
@@ -133,13 +135,15 @@ def display_shop_stats_tab(shop_df):
     # 매장 분포 히스토그램
     if len(store_counts) > 1:
         st.markdown("#### 📈 매장 수 분포")
-        fig, ax = plt.subplots(figsize=(10, 4))
-        plt.hist(store_counts['매장수'], bins=min(10, len(store_counts)), alpha=0.7, color='skyblue', edgecolor='black')
-        plt.title('동별 매장 수 분포')
-        plt.xlabel('매장 수')
-        plt.ylabel('동의 개수')
-        plt.tight_layout()
-        st.pyplot(fig)
+        def draw():
+            fig, ax = plt.subplots(figsize=(10, 4))
+            plt.hist(store_counts['매장수'], bins=min(10, len(store_counts)), alpha=0.7, color='skyblue', edgecolor='black')
+            plt.title('동별 매장 수 분포')
+            plt.xlabel('매장 수')
+            plt.ylabel('동의 개수')
+            plt.tight_layout()
+            return fig
+        show_chart(store_counts, 'store_count_hist', draw)
     
     # 데이터 테이블 표시
     st.markdown("#### 📋 동별 매장 수 상세")
@@ -166,115 +170,40 @@ def display_integrated_analysis_tab(shop_df, pop_df, merged_df, dong_analysis=No
     valid_merged = merged_df[merged_df['총인구수'].notna() & (merged_df['총인구수'] > 0)]
     
     st.write(f"🔍 **통합 분석 데이터 현황**")
-    st.write(f"전체 병합 데이터: {len(merged_df)}개")
-    st.write(f"총인구수 정보가 있는 데이터: {len(valid_merged)}개")
+    st.write(f"전체 병합 데이터: {merged_df['매장수'].sum()}개")
+    st.write(f"총인구수 정보가 있는 데이터: {valid_merged['매장수'].sum()}개")
     
-    # 병합이 제대로 안된 경우를 위한 대안 - 동 이름으로 직접 매칭
+    # 병합이 제대로 안된 경우를 위한 대안 - 동 이름으로 다시 병합
     if len(valid_merged) == 0 or dong_analysis is None:
         st.warning("⚠️ 병합 데이터에서 총인구수를 찾을 수 없거나 분석 데이터가 없습니다. 대안 방법을 시도합니다.")
-        
-        # 가맹점 데이터의 동별 매장수 계산
-        if 'dong' in shop_df.columns:
-            store_counts = shop_df['dong'].value_counts().reset_index()
-            store_counts.columns = ['dong', '매장수']
+        dong_analysis = calculate_dong_analysis(merge_dong_population(shop_df, pop_df))
+        if not dong_analysis.empty:
+            st.success(f"✅ **동 이름 매칭 성공: {len(dong_analysis)}개 동 분석 가능**")
+        else:
+            # 대안 분석도 실패한 경우
+            st.markdown("#### 📊 기본 가맹점 통계")
+            if len(shop_df) > 0:
+                store_counts = count_stores_by_dong(shop_df).reset_index()
+                store_counts.columns = ['dong', '매장수']
             
-            # 인구 데이터에서 동별 총인구수 가져오기
-            pop_summary = pop_df[['행정기관', '총인구수', '남자인구수', '여자인구수']].copy()
+                def draw():
+                    fig, ax = plt.subplots(figsize=(12, 6))
+                    bars = sns.barplot(data=store_counts.head(10), x='dong', y='매장수', ax=ax)
+                    ax.set_title('동별 가맹점 수 (상위 10개)', fontsize=14, fontweight='bold')
+                    ax.set_xlabel('동', fontsize=12)
+                    ax.set_ylabel('매장 수', fontsize=12)
             
-            # 수동으로 매칭해보기
-            manual_merged = []
-            for _, store_row in store_counts.iterrows():
-                dong_name = store_row['dong']
-                매장수 = store_row['매장수']
-                
-                # 인구 데이터에서 해당 동 찾기
-                pop_match = pop_summary[pop_summary['행정기관'] == dong_name]
-                
-                if len(pop_match) > 0:
-                    pop_data = pop_match.iloc[0]
-                    manual_merged.append({
-                        'dong': dong_name,
-                        '매장수': 매장수,
-                        '총인구수': pop_data['총인구수'],
-                        '남자인구수': pop_data['남자인구수'],
-                        '여자인구수': pop_data['여자인구수']
-                    })
+                    for bar in ax.patches:
+                        height = bar.get_height()
+                        ax.text(bar.get_x() + bar.get_width()/2., height,
+                                f'{int(height)}', ha='center', va='bottom', fontsize=10)
             
-            if manual_merged:
-                dong_analysis = pd.DataFrame(manual_merged)
-                dong_analysis['인구대비매장밀도'] = dong_analysis['매장수'] / dong_analysis['총인구수'] * 10000
-                dong_analysis['성비'] = dong_analysis['남자인구수'] / dong_analysis['여자인구수']
-                
-                st.success(f"✅ **수동 매칭 성공: {len(dong_analysis)}개 동 분석 가능**")
-                
-                # 인구 대비 매장 밀도 시각화
-                st.markdown("#### 🏆 동별 인구 대비 매장 밀도 (인구 1만명당 매장 수)")
-                st.info("💡 **인구 대비 매장 밀도**: 총인구수 대비 가맹점 수로 계산한 상권 밀도 지표입니다.")
-                
-                density_sorted = dong_analysis.sort_values('인구대비매장밀도', ascending=False)
-                plot_bar(density_sorted, "dong", "인구대비매장밀도", 
-                        "동별 인구 대비 매장 밀도", "동", "1만명당 매장수", color="green")
-                
-                # 상위/하위 동 강조
-                if len(density_sorted) >= 1:
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        top_dong = density_sorted.iloc[0]
-                        st.success(f"🥇 **매장밀도 1위**: {top_dong['dong']} ({top_dong['인구대비매장밀도']:.2f}개/만명)")
-                    with col2:
-                        if len(density_sorted) > 1:
-                            bottom_dong = density_sorted.iloc[-1]
-                            st.warning(f"🔻 **매장밀도 최하위**: {bottom_dong['dong']} ({bottom_dong['인구대비매장밀도']:.2f}개/만명)")
-                
-                # 성비와 매장수 관계 분석
-                if len(dong_analysis) > 1:
-                    fig, ax = plt.subplots(figsize=(10, 6))
-                    scatter = ax.scatter(dong_analysis['성비'], dong_analysis['매장수'], 
-                                       c=dong_analysis['인구대비매장밀도'], cmap='viridis', s=100, alpha=0.7)
-                    
-                    for i, row in dong_analysis.iterrows():
-                        ax.annotate(row['dong'], (row['성비'], row['매장수']), 
-                                   xytext=(5, 5), textcoords='offset points', fontsize=8)
-                    
-                    plt.colorbar(scatter, label='인구 대비 매장 밀도')
-                    plt.xlabel('성비 (남자/여자)')
-                    plt.ylabel('매장 수')
-                    plt.title('성비와 매장 수 관계 (색상: 인구 대비 매장 밀도)')
+                    plt.xticks(rotation=45)
                     plt.tight_layout()
-                    st.pyplot(fig)
-                
-                # 통합 분석 테이블
-                st.markdown("#### 📋 동별 종합 분석 테이블")
-                display_df = dong_analysis[['dong', '총인구수', '매장수', '인구대비매장밀도', '성비']].copy()
-                display_df = display_df.sort_values('인구대비매장밀도', ascending=False)
-                display_df['인구대비매장밀도'] = display_df['인구대비매장밀도'].round(2)
-                display_df['성비'] = display_df['성비'].round(3)
-                st.dataframe(display_df, use_container_width=True)
-                
-                return  # 성공적으로 분석했으므로 여기서 종료
+                    return fig
+                show_chart(store_counts.head(10), 'store_count_top10', draw)
         
-        # 대안 분석도 실패한 경우
-        st.markdown("#### 📊 기본 가맹점 통계")
-        if len(shop_df) > 0:
-            store_counts = shop_df['dong'].value_counts().reset_index()
-            store_counts.columns = ['dong', '매장수']
-            
-            fig, ax = plt.subplots(figsize=(12, 6))
-            bars = sns.barplot(data=store_counts.head(10), x='dong', y='매장수', ax=ax)
-            ax.set_title('동별 가맹점 수 (상위 10개)', fontsize=14, fontweight='bold')
-            ax.set_xlabel('동', fontsize=12)
-            ax.set_ylabel('매장 수', fontsize=12)
-            
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height,
-                        f'{int(height)}', ha='center', va='bottom', fontsize=10)
-            
-            plt.xticks(rotation=45)
-            plt.tight_layout()
-            st.pyplot(fig)
-        
-        return
+            return
     
     # 인구 대비 매장 밀도 계산
     # dong_analysis는 외부에서 계산되어 넘어온다고 가정
@@ -305,20 +234,22 @@ def display_integrated_analysis_tab(shop_df, pop_df, merged_df, dong_analysis=No
     
     # 성비와 매장수 관계 분석
     if len(dong_analysis) > 1:
-        fig, ax = plt.subplots(figsize=(10, 6))
-        scatter = ax.scatter(dong_analysis['성비'], dong_analysis['매장수'], 
-                           c=dong_analysis['인구대비매장밀도'], cmap='viridis', s=100, alpha=0.7)
+        def draw():
+            fig, ax = plt.subplots(figsize=(10, 6))
+            scatter = ax.scatter(dong_analysis['성비'], dong_analysis['매장수'], 
+                               c=dong_analysis['인구대비매장밀도'], cmap='viridis', s=100, alpha=0.7)
         
-        for i, row in dong_analysis.iterrows():
-            ax.annotate(row['dong'], (row['성비'], row['매장수']), 
-                       xytext=(5, 5), textcoords='offset points', fontsize=8)
+            for dong, ratio, stores in zip(dong_analysis['dong'], dong_analysis['성비'], dong_analysis['매장수']):
+                ax.annotate(dong, (ratio, stores), 
+                           xytext=(5, 5), textcoords='offset points', fontsize=8)
         
-        plt.colorbar(scatter, label='인구 대비 매장 밀도')
-        plt.xlabel('성비 (남자/여자)')
-        plt.ylabel('매장 수')
-        plt.title('성비와 매장 수 관계 (색상: 인구 대비 매장 밀도)')
-        plt.tight_layout()
-        st.pyplot(fig)
+            plt.colorbar(scatter, label='인구 대비 매장 밀도')
+            plt.xlabel('성비 (남자/여자)')
+            plt.ylabel('매장 수')
+            plt.title('성비와 매장 수 관계 (색상: 인구 대비 매장 밀도)')
+            plt.tight_layout()
+            return fig
+        show_chart(dong_analysis[['dong', '성비', '매장수', '인구대비매장밀도']], 'sex_ratio_scatter', draw)
     
     # 통합 분석 테이블
     st.markdown("#### 📋 동별 종합 분석 테이블")
@@ -340,7 +271,7 @@ def display_advanced_analysis_tab(shop_df, pop_df, merged_df, dong_analysis=None
     valid_merged = merged_df.dropna(subset=['총인구수'])
     
     st.write(f"🔍 **고급 분석 데이터 현황**")
-    st.write(f"유효한 통합 데이터: {len(valid_merged)}개")
+    st.write(f"유효한 통합 데이터: {valid_merged['매장수'].sum()}개")
     
     # 유효한 데이터가 있는 경우에만 고급 분석 진행
     if len(valid_merged) > 0 and dong_analysis is not None:
@@ -353,26 +284,25 @@ def display_advanced_analysis_tab(shop_df, pop_df, merged_df, dong_analysis=None
         # 2. 인구 증감과 매장 수 관계
         st.markdown("#### 📈 인구 증감률과 매장 수 관계")
         if '전월대비' in merged_df.columns:
-            growth_analysis = merged_df.dropna(subset=['전월대비']).groupby('dong').agg({
-                'store_name': 'count',
-                '전월대비': 'first'
-            }).reset_index()
+            growth_analysis = merged_df.dropna(subset=['전월대비'])[['dong', '매장수', '전월대비']].reset_index(drop=True)
             
             if len(growth_analysis) > 1:
-                fig, ax = plt.subplots(figsize=(10, 6))
-                scatter = ax.scatter(growth_analysis['전월대비'], growth_analysis['store_name'], 
-                                   s=100, alpha=0.7, c='coral')
+                def draw():
+                    fig, ax = plt.subplots(figsize=(10, 6))
+                    scatter = ax.scatter(growth_analysis['전월대비'], growth_analysis['매장수'], 
+                                       s=100, alpha=0.7, c='coral')
                 
-                for i, row in growth_analysis.iterrows():
-                    ax.annotate(row['dong'], (row['전월대비'], row['store_name']), 
-                               xytext=(5, 5), textcoords='offset points', fontsize=8)
+                    for dong, growth, stores in zip(growth_analysis['dong'], growth_analysis['전월대비'], growth_analysis['매장수']):
+                        ax.annotate(dong, (growth, stores), 
+                                   xytext=(5, 5), textcoords='offset points', fontsize=8)
                 
-                plt.xlabel('전월대비 인구 증감률 (%)')
-                plt.ylabel('매장 수')
-                plt.title('인구 증감률과 매장 수 관계')
-                plt.axvline(x=0, color='red', linestyle='--', alpha=0.5)
-                plt.tight_layout()
-                st.pyplot(fig)
+                    plt.xlabel('전월대비 인구 증감률 (%)')
+                    plt.ylabel('매장 수')
+                    plt.title('인구 증감률과 매장 수 관계')
+                    plt.axvline(x=0, color='red', linestyle='--', alpha=0.5)
+                    plt.tight_layout()
+                    return fig
+                show_chart(growth_analysis, 'growth_scatter', draw)
         
         # 인사이트 표시
         st.markdown("#### 💡 핵심 인사이트")
@@ -383,7 +313,7 @@ def display_advanced_analysis_tab(shop_df, pop_df, merged_df, dong_analysis=None
         # 기본 분석
         st.markdown("#### 📊 기본 가맹점 분석")
         if len(shop_df) > 0 and 'dong' in shop_df.columns:
-            store_counts = shop_df['dong'].value_counts().reset_index()
+            store_counts = count_stores_by_dong(shop_df).reset_index()
             store_counts.columns = ['dong', '매장수']
             plot_bar(store_counts.head(10), "dong", "매장수", "동별 가맹점 수 (상위 10개)", "동", "매장수", color="skyblue")
             
@@ -410,38 +340,42 @@ def display_advanced_analysis_tab(shop_df, pop_df, merged_df, dong_analysis=None
         
         with col1:
             st.markdown("**군집별 동 분포**")
-            fig, ax = plt.subplots(figsize=(8, 4))
-            cluster_counts = pd.Series(cluster_labels).value_counts().sort_index()
-            colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#FFA07A'][:len(cluster_counts)]
-            bars = ax.bar(cluster_counts.index, cluster_counts.values, color=colors)
-            ax.set_title('군집별 동 개수')
-            ax.set_xlabel('군집')
-            ax.set_ylabel('동 개수')
+            def draw():
+                fig, ax = plt.subplots(figsize=(8, 4))
+                cluster_counts = pd.Series(cluster_labels).value_counts().sort_index()
+                colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#FFA07A'][:len(cluster_counts)]
+                bars = ax.bar(cluster_counts.index, cluster_counts.values, color=colors)
+                ax.set_title('군집별 동 개수')
+                ax.set_xlabel('군집')
+                ax.set_ylabel('동 개수')
             
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height,
-                        f'{int(height)}', ha='center', va='bottom')
+                for bar in bars:
+                    height = bar.get_height()
+                    ax.text(bar.get_x() + bar.get_width()/2., height,
+                            f'{int(height)}', ha='center', va='bottom')
             
-            plt.tight_layout()
-            st.pyplot(fig)
+                plt.tight_layout()
+                return fig
+            show_chart(cluster_labels, 'cluster_dong_counts', draw)
         
         with col2:
             st.markdown("**군집별 총 매장 수**")
-            fig, ax = plt.subplots(figsize=(8, 4))
-            colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#FFA07A'][:len(cluster_store_counts)]
-            bars = ax.bar(cluster_store_counts['군집'], cluster_store_counts['총매장수'], color=colors)
-            ax.set_title('군집별 총 매장 수')
-            ax.set_xlabel('군집')
-            ax.set_ylabel('매장 수')
+            def draw():
+                fig, ax = plt.subplots(figsize=(8, 4))
+                colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#FFA07A'][:len(cluster_store_counts)]
+                bars = ax.bar(cluster_store_counts['군집'], cluster_store_counts['총매장수'], color=colors)
+                ax.set_title('군집별 총 매장 수')
+                ax.set_xlabel('군집')
+                ax.set_ylabel('매장 수')
             
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height,
-                        f'{int(height)}', ha='center', va='bottom')
+                for bar in bars:
+                    height = bar.get_height()
+                    ax.text(bar.get_x() + bar.get_width()/2., height,
+                            f'{int(height)}', ha='center', va='bottom')
             
-            plt.tight_layout()
-            st.pyplot(fig)
+                plt.tight_layout()
+                return fig
+            show_chart(cluster_store_counts, 'cluster_store_counts', draw)
         
         # 군집별 특성 요약
         st.markdown("#### 📊 군집별 평균 특성")
@@ -450,8 +384,8 @@ def display_advanced_analysis_tab(shop_df, pop_df, merged_df, dong_analysis=None
         
         # 군집별 동 목록 표시 (추가할 부분)
         st.markdown("#### 🏘️ 군집별 동 구성")
-        for cluster_id in sorted(pop_df_clustered['군집'].unique()):
-            cluster_dongs = pop_df_clustered[pop_df_clustered['군집'] == cluster_id]['행정기관'].tolist()
+        for cluster_id, cluster_dongs in pop_df_clustered.groupby('군집')['행정기관']:
+            cluster_dongs = cluster_dongs.astype(str).tolist()
             dong_list = ', '.join(cluster_dongs)
             
             # 군집별 색상 매칭
@@ -464,24 +398,27 @@ def display_advanced_analysis_tab(shop_df, pop_df, merged_df, dong_analysis=None
         if len(valid_merged) > 0:
             cluster_merged = merged_df.merge(pop_df_clustered[['행정기관', '군집']], 
                                            left_on='dong', right_on='행정기관', how='left')
+            # 분모는 기존 매장 행 단위 병합에서처럼 매장마다 그 동의 인구를 더한 값
             cluster_density = cluster_merged.dropna(subset=['총인구수']).groupby('군집').apply(
-                lambda x: (x['store_name'].count() / x['총인구수'].sum() * 10000) if x['총인구수'].sum() > 0 else 0
+                lambda x: (x['매장수'].sum() / (x['매장수'] * x['총인구수']).sum() * 10000) if (x['매장수'] * x['총인구수']).sum() > 0 else 0
             ).reset_index(name='평균매장밀도')
             
-            fig, ax = plt.subplots(figsize=(10, 4))
-            bars = ax.bar(cluster_density['군집'], cluster_density['평균매장밀도'], 
-                         color=['#FF6B6B', '#4ECDC4', '#45B7D1', '#FFA07A'][:len(cluster_density)])
-            ax.set_title('군집별 평균 인구 대비 매장 밀도')
-            ax.set_xlabel('군집')
-            ax.set_ylabel('1만명당 매장수')
+            def draw():
+                fig, ax = plt.subplots(figsize=(10, 4))
+                bars = ax.bar(cluster_density['군집'], cluster_density['평균매장밀도'], 
+                             color=['#FF6B6B', '#4ECDC4', '#45B7D1', '#FFA07A'][:len(cluster_density)])
+                ax.set_title('군집별 평균 인구 대비 매장 밀도')
+                ax.set_xlabel('군집')
+                ax.set_ylabel('1만명당 매장수')
             
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height,
-                        f'{height:.2f}', ha='center', va='bottom')
+                for bar in bars:
+                    height = bar.get_height()
+                    ax.text(bar.get_x() + bar.get_width()/2., height,
+                            f'{height:.2f}', ha='center', va='bottom')
             
-            plt.tight_layout()
-            st.pyplot(fig)
+                plt.tight_layout()
+                return fig
+            show_chart(cluster_density, 'cluster_density', draw)
         
     else:
         st.info("군집 분석을 위한 충분한 데이터가 없습니다.")
@@ -498,7 +435,7 @@ def display_advanced_analysis_tab(shop_df, pop_df, merged_df, dong_analysis=None
     
     # 매장 수 1위 동
     if 'dong' in shop_df.columns and len(shop_df) > 0:
-        store_counts = shop_df['dong'].value_counts()
+        store_counts = count_stores_by_dong(shop_df)
         if len(store_counts) > 0:
             top_stores_dong = store_counts.index[0]
             top_stores_count = store_counts.iloc[0]
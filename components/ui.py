@@ -1,25 +1,24 @@
 
 import streamlit as st
-import pandas as pd
-import streamlit.components.v1 as components
 import altair as alt
 
 import config
-from components.kakao_map import create_kakao_map
+from components.kakao_map import kakao_map
 from analysis.main_analysis import generate_analysis
+from utils.reference_data import district_area, district_population
 from analysis.seongdong_analysis import run_seongdong_analysis
 
-def create_sidebar(df_shops):
+def create_sidebar(shops):
     st.sidebar.header("🔍 필터 설정")
     search_query = st.sidebar.text_input("매장 이름 검색")
-    all_districts = ['전체'] + sorted(df_shops['district'].unique().tolist())
+    all_districts = ['전체'] + sorted(shops.column('district').unique().tolist())
     selected_district = st.sidebar.selectbox("지역구 선택", all_districts)
-    all_industry_codes = ['전체'] + sorted(df_shops['industry_code'].unique().tolist())
+    all_industry_codes = ['전체'] + sorted(shops.column('industry_code').unique().tolist())
     selected_industry_code = st.sidebar.selectbox("업종코드 선택", all_industry_codes)
     max_distance = st.sidebar.slider("내 위치에서 최대 거리 (km)", 0.5, 20.0, 5.0, 0.5)
     return search_query, selected_district, selected_industry_code, max_distance
 
-def display_main_stats(df_shops, filtered_df, current_addr):
+def display_main_stats(shops, filtered_df, current_addr):
     st.markdown("---")
     st.subheader("💡 현재 위치:")
     st.info(f"**{current_addr}**")
@@ -27,7 +26,7 @@ def display_main_stats(df_shops, filtered_df, current_addr):
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        st.metric("전체 매장 수", f"{len(df_shops):,}")
+        st.metric("전체 매장 수", f"{len(shops):,}")
 
     with col2:
         st.metric("필터된 매장 수", f"{len(filtered_df):,}")
@@ -42,7 +41,7 @@ def display_main_stats(df_shops, filtered_df, current_addr):
     with col4:
         st.metric("지역구 수", len(filtered_df['district'].unique()) if not filtered_df.empty else 0)
 
-def create_tabs(filtered_df, df_shops, user_lat, user_lon, max_distance, KAKAO_MAP_API_KEY):
+def create_tabs(filtered_df, analysis_frame, user_lat, user_lon, max_distance, KAKAO_MAP_API_KEY, marker_clusters=None):
     tab1, tab2, tab3, tab4 = st.tabs(["🗺️ 카카오맵 보기", "📋 리스트 보기", "📊 통계", "📈 성동구청 크롤링 분석"])
 
     with tab1:
@@ -51,13 +50,11 @@ def create_tabs(filtered_df, df_shops, user_lat, user_lon, max_distance, KAKAO_M
             if not KAKAO_MAP_API_KEY:
                 st.error("🔑 카카오 맵 API 키가 없어서 지도를 표시할 수 없습니다.")
             else:
-                with st.spinner(f'🗺️ {len(filtered_df)}개 매장의 카카오맵을 생성하는 중...'):
-                    try:
-                        kakao_map_html = create_kakao_map(filtered_df, user_lat, user_lon, max_distance, KAKAO_MAP_API_KEY)
-                        components.html(kakao_map_html, height=650)
-                    except Exception as e:
-                        st.error(f"❌ 지도 생성 중 오류 발생: {e}")
-                st.info(f"✅ 총 {len(filtered_df)}개의 매장이 지도에 표시되었습니다. 마커를 클릭하면 상세 정보를 볼 수 있습니다.")
+                try:
+                    kakao_map(filtered_df, user_lat, user_lon, max_distance, KAKAO_MAP_API_KEY, clusters=marker_clusters)
+                except Exception as e:
+                    st.error(f"❌ 지도 생성 중 오류 발생: {e}")
+                st.info(f"✅ 총 {len(filtered_df)}개의 매장을 지도에 불러왔습니다. 현재 화면 안의 매장이 마커로 표시되며, 마커를 클릭하면 상세 정보를 볼 수 있습니다.")
         else:
             st.warning("필터 조건에 맞는 매장이 없습니다. 검색 조건을 조정해 주세요.")
 
@@ -81,14 +78,15 @@ def create_tabs(filtered_df, df_shops, user_lat, user_lon, max_distance, KAKAO_M
 
     with tab3:
         st.subheader("📊 서울시 소비쿠폰 가맹점 통계 분석")
+        # 통계는 지역구/업종만 쓰므로 로더가 한 번 만들어 둔 두 컬럼 DataFrame과 데이터 지문을 쓴다
+        df_shops, fingerprint = analysis_frame
         if not filtered_df.empty:
             try:
-                generate_analysis(df_shops)
+                generate_analysis(df_shops, fingerprint)
+                store_counts = df_shops.groupby("district", observed=True).size().rename("stores")
                 st.markdown("### 👥 인구 대비 가맹점 수 (1,000명당)")
                 try:
-                    store_counts = df_shops.groupby("district").size().reset_index(name="stores")
-                    pop_df = pd.read_csv(config.POPULATION_DATA_PATH, skiprows=2, usecols=[0, 2], names=["district", "population"], header=None)
-                    pop_df = pop_df.merge(store_counts, on="district", how="inner")
+                    pop_df = district_population().join(store_counts, how="inner").reset_index()
                     pop_df["stores_per_1000"] = pop_df["stores"] / pop_df["population"] * 1000
                     bubble = (alt.Chart(pop_df).mark_circle(opacity=0.7).encode(
                             x=alt.X("population:Q", title="인구수"),
@@ -105,9 +103,7 @@ def create_tabs(filtered_df, df_shops, user_lat, user_lon, max_distance, KAKAO_M
 
                 st.markdown("### 🌐 구면적 대비 매장 밀도 (개/km²)")
                 try:
-                    store_counts = df_shops.groupby("district").size().reset_index(name="stores")
-                    area_df = pd.read_csv(config.AREA_DATA_PATH, skiprows=3, usecols=[1, 3], names=["district", "area_km2"], header=None)
-                    area_df = area_df.merge(store_counts, on="district", how="inner")
+                    area_df = district_area().join(store_counts, how="inner").reset_index()
                     area_df["density"] = area_df["stores"] / area_df["area_km2"]
                     bar = (alt.Chart(area_df.sort_values("density", ascending=False)).mark_bar().encode(
                             x=alt.X("density:Q", title="개/km²"),
@@ -136,7 +132,7 @@ def create_tabs(filtered_df, df_shops, user_lat, user_lon, max_distance, KAKAO_M
             st.warning("조건에 맞는 매장이 없어서 기본 통계를 표시합니다.")
             if not df_shops.empty:
                 try:
-                    generate_analysis(df_shops)
+                    generate_analysis(df_shops, fingerprint)
                 except Exception as e:
                     st.error(f"통계 분석 중 오류가 발생했습니다: {e}")
             else:
@@ -6,7 +6,46 @@ MAIN_DATA_PATH = './data/shops.csv'
 SEONGDONG_DATA_PATH = './data/shops_seongdong.csv'
 POPULATION_DATA_PATH = './data/district_population.csv'
 AREA_DATA_PATH = './data/district_area_km2.csv'
+SEONGDONG_POPULATION_DATA_PATH = './data/seongdong_Population.csv'
+CACHE_DIR = './data/.cache'  # 전처리 결과 캐시 (원본 CSV 해시/mtime 기준)
+
+# --- 데이터 전처리 ---
+PREPROCESS_WORKERS = None                  # 매장 CSV 전처리 프로세스 수 (None이면 CPU 수, 1이면 현재 프로세스에서만 처리)
+PREPROCESS_CHUNK_BYTES = 64 * 1024 * 1024  # 이보다 큰 CSV는 이 크기 안팎의 줄 단위 조각으로 나눠 병렬 처리
+PREPROCESS_STREAM_MIN_BYTES = 1024 ** 3     # 이 크기 이상의 CSV는 메모리에 다 올리지 않고 청크 단위로 캐시에 바로 쓴다
+PREPROCESS_STREAM_CHUNK_ROWS = 200_000     # 스트리밍 전처리에서 한 번에 읽는 행 수 (최대 메모리 사용량을 정한다)
+ENCODING_SNIFF_PREFIX_BYTES = 1024 * 1024  # 인코딩 판별에 쓰는 파일 앞부분 크기
+ENCODING_SNIFF_BLOCKS = 32                 # 앞부분 외에 파일 전체에서 고르게 뽑는 표본 블록 수
+ENCODING_SNIFF_BLOCK_BYTES = 64 * 1024     # 표본 블록 하나의 크기
+
+# --- 검색 결과 ---
+MAX_RESULTS = 50000  # 거리순으로 보여줄 최대 매장 수
+MAP_MAX_VISIBLE_MARKERS = 2000  # 지도 화면 안에 한 번에 만드는 최대 마커 수 (거리순)
+MAP_CLUSTER_MIN_LEVEL = 4       # 이 카카오맵 레벨부터(축소할수록 큰 레벨) 서버에서 계산한 군집으로 표시
+MAP_CLUSTER_GRID_PX = 60        # 군집 격자 칸 크기 (화면 픽셀)
+MAP_MAX_CLUSTER_FEATURES = 2000 # 한 레벨의 군집이 이보다 많으면 그 레벨은 마커로 표시
+
+# --- 조회 API (api/) ---
+API_DEFAULT_LIMIT = 100     # /nearby, /search가 한 번에 돌려주는 기본 매장 수
+API_MAX_LIMIT = 5000        # limit 파라미터의 최대값
+API_DEFAULT_RADIUS_KM = 5.0 # /nearby 기본 반경 (사이드바 기본값과 같음)
+
+# --- 성동구 분석 ---
+SEONGDONG_CLUSTER_METHOD = 'kmeans'  # 'minibatch'면 데이터가 바뀔 때 직전 군집 중심에서 MiniBatchKMeans로 이어서 학습
+
+# --- 차트 캐시 ---
+CHART_CACHE_MAX_BYTES = 64 * 1024 * 1024  # 렌더링한 차트 이미지를 메모리에 보관하는 최대 크기
+CHART_MAX_WIDTH_PX = 2 * 730  # st.image 최대 표시 폭. 더 넓은 차트는 저장할 때 한 번 줄인다
 
 # --- API 키 (환경 변수 이름) ---
 KAKAO_MAP_API_KEY_ENV = "KAKAO_MAP_API_KEY"
-KAKAO_REST_API_KEY_ENV = "KAKAO_REST_API_KEY"
\ No newline at end of file
+KAKAO_REST_API_KEY_ENV = "KAKAO_REST_API_KEY"
+
+# --- 카카오 로컬 API ---
+KAKAO_ADDRESS_SEARCH_URL = "https://dapi.kakao.com/v2/local/search/address.json"
+GEOCODE_PARALLEL_PROBING = False  # True면 여러 주소 형식을 동시에 요청
+
+# --- 지오코딩 캐시 ---
+GEOCODE_CACHE_PATH = './data/.cache/geocode.sqlite3'
+GEOCODE_CACHE_TTL = 30 * 24 * 3600       # 찾은 주소는 30일간 재사용 (초)
+GEOCODE_NEGATIVE_TTL = 24 * 3600         # 찾지 못한 주소는 1일간 다시 요청하지 않음 (초)
@@ -0,0 +1,38 @@
+"""거리 계산 벤치마크: 행별 DataFrame.apply와 numpy 벡터 연산(calculate_distances) 비교
+
+    python -m scripts.bench_distances --rows 10000 100000 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.helpers import calculate_distance, calculate_distances
+
+ORIGIN = (37.5458, 127.0409)  # 앱의 기본 위치 (성동구 왕십리로 58)
+
+
+def bench(n, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'latitude': 37.43 + rng.random(n) * 0.25, 'longitude': 126.8 + rng.random(n) * 0.4})
+
+    start = time.perf_counter()
+    rowwise = df.apply(lambda row: calculate_distance(*ORIGIN, row['latitude'], row['longitude']), axis=1).to_numpy()
+    apply_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectorized = calculate_distances(*ORIGIN, df['latitude'].to_numpy(), df['longitude'].to_numpy())
+    vector_time = time.perf_counter() - start
+    return n / apply_time, n / vector_time, float(np.abs(rowwise - vectorized).max())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='거리 계산 벤치마크')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'apply rows/s':>14} {'vectorized rows/s':>18} {'max |diff| km':>14}")
+    for n in args.rows:
+        apply_rate, vector_rate, diff = bench(n)
+        print(f"{n:>10,} {apply_rate:>14,.0f} {vector_rate:>18,.0f} {diff:>14.1e}")
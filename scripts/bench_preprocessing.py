@@ -0,0 +1,70 @@
+"""매장 CSV 전처리 벤치마크: 한 번에 읽기 / 프로세스 풀 / 스트리밍의 시간과 최대 메모리
+
+    python -m scripts.bench_preprocessing /tmp/shops_5m.csv --modes single 1 2 4 stream
+
+모드마다 새 프로세스에서 실행하고(캐시 없이), 시간과 최대 RSS(VmHWM, 부모 프로세스)를 출력한다.
+single은 파일 전체를 pd.read_csv 한 번으로 읽고 같은 정리를 하는 기준선이고,
+숫자 모드는 read_shops_csv(workers=N), stream은 stream_shops_to_cache이다.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _peak_rss():
+    with open('/proc/self/status') as f:
+        return int(re.search(r'VmHWM:\s+(\d+)', f.read()).group(1)) * 1024
+
+
+def run_mode(csv_path, mode, cache_dir):
+    """현재 프로세스에서 한 모드를 실행해 (행 수, 초)를 반환"""
+    import pandas as pd
+
+    import config
+    from utils import preprocessing
+    from utils.shop_cache import compact_shop_dtypes, read_cached_shops
+
+    config.CACHE_DIR = cache_dir
+    start = time.perf_counter()
+    if mode == 'single':
+        encoding = preprocessing.detect_encoding(csv_path)
+        df = pd.read_csv(csv_path, encoding=encoding, skipinitialspace=True, quoting=1)
+        df.columns = df.columns.str.strip()
+        df = compact_shop_dtypes(preprocessing.clean_shops(df))
+        rows = len(df)
+    elif mode == 'stream':
+        preprocessing.stream_shops_to_cache(csv_path)
+        rows = len(read_cached_shops(csv_path))
+    else:
+        rows = len(preprocessing.read_shops_csv(csv_path, workers=int(mode)))
+    return rows, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='매장 CSV 전처리 벤치마크')
+    parser.add_argument('csv_path')
+    parser.add_argument('--modes', nargs='+', default=['single', '1', '2', '4', 'stream'])
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            rows, seconds = run_mode(args.csv_path, args.child, cache_dir)
+        print(json.dumps({'rows': rows, 'seconds': seconds, 'peak': _peak_rss()}))
+        sys.exit()
+
+    size = os.path.getsize(args.csv_path)
+    print(f"{args.csv_path} ({size / 2 ** 20:,.0f} MB)")
+    print(f"{'mode':>8} {'rows':>12} {'seconds':>9} {'peak RSS MB':>12}")
+    for mode in args.modes:
+        out = subprocess.run([sys.executable, '-m', 'scripts.bench_preprocessing', args.csv_path, '--child', mode],
+                             cwd=ROOT, capture_output=True, text=True, check=True).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        print(f"{mode:>8} {result['rows']:>12,} {result['seconds']:>9.1f} {result['peak'] / 2 ** 20:>12,.0f}")
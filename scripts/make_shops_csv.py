@@ -0,0 +1,49 @@
+"""벤치마크용 서울 매장 CSV 생성 (원본과 같은 컬럼, 모든 값을 따옴표로 감싼 형식)
+
+    python -m scripts.make_shops_csv 1000000 /tmp/shops_1m.csv --encoding cp949
+"""
+import argparse
+import csv
+
+import numpy as np
+import pandas as pd
+
+from utils.preprocessing import SEOUL_DISTRICTS
+
+INDUSTRIES = ['음식점/식음료업', '보건/복지', '학원', '유통업 영리', '의류/잡화', '미용/뷰티', '스포츠/레저',
+              '생활/편의', '숙박', '여행', '자동차', '가전/통신', '서적/문구', '기타']
+SYLLABLES = np.array(list('가나다라마바사아자차카타파하김이박최정강조윤장임한오서신권황안송전홍'))
+SUFFIXES = np.array(['', ' Cafe', ' 2호점', 'GS25'])
+
+
+def make_shops(n, seed=0):
+    """서울 시내 무작위 좌표의 매장 n개 (원본 CSV 컬럼 이름)"""
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(2, 9, n)
+    syllables = SYLLABLES[rng.integers(0, len(SYLLABLES), (n, 8))]
+    names = [''.join(row[:length]) for row, length in zip(syllables, lengths)]
+    roads = pd.Series(syllables[:, 0]) + pd.Series(syllables[:, 1]) + '로 ' + pd.Series(rng.integers(1, 501, n)).astype(str)
+    return pd.DataFrame({
+        '이름': pd.Series(names) + SUFFIXES[rng.integers(0, len(SUFFIXES), n)],
+        '서울페이업종코드': np.array(INDUSTRIES)[rng.integers(0, len(INDUSTRIES), n)],
+        '주소': '서울특별시 ' + pd.Series(np.array(SEOUL_DISTRICTS)[rng.integers(0, len(SEOUL_DISTRICTS), n)]) + ' ' + roads,
+        '상세주소': np.where(rng.random(n) < 0.7, pd.Series(rng.integers(1, 6, n)).astype(str) + '층', ''),
+        '위도': (37.43 + rng.random(n) * 0.25).round(6),
+        '경도': (126.8 + rng.random(n) * 0.4).round(6),
+    })
+
+
+def write_shops_csv(path, n, encoding='utf-8', seed=0):
+    with open(path, 'w', encoding=encoding, newline='') as f:
+        make_shops(n, seed).to_csv(f, index=False, quoting=csv.QUOTE_ALL)
+    return path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='벤치마크용 매장 CSV 생성')
+    parser.add_argument('rows', type=int)
+    parser.add_argument('path')
+    parser.add_argument('--encoding', default='utf-8', choices=['utf-8', 'utf-8-sig', 'cp949'])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    write_shops_csv(args.path, args.rows, args.encoding, args.seed)
@@ -0,0 +1,56 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+
+def normalize_address(address):
+    """캐시 키로 쓰는 주소 정규화 (NFC, 앞뒤 공백 제거, 연속 공백 하나로)"""
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFC', address)).strip()
+
+
+class GeocodeCache:
+    """주소 → 좌표를 저장하는 SQLite 캐시
+
+    찾지 못한 주소(음성 결과)도 좌표 없이 저장해 같은 주소를 반복 요청하지 않는다.
+    성공 결과는 ttl, 음성 결과는 negative_ttl(초)이 지나면 만료된다.
+    여러 스레드에서 함께 쓸 수 있도록 연결 하나를 잠금으로 보호한다.
+    """
+
+    def __init__(self, path, ttl, negative_ttl):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocode ("
+                "address TEXT PRIMARY KEY, latitude REAL, longitude REAL, updated_at REAL NOT NULL)"
+            )
+
+    def get(self, address):
+        """캐시된 (위도, 경도)를 반환. 음성 결과는 (None, None), 없거나 만료되면 None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT latitude, longitude, updated_at FROM geocode WHERE address = ?",
+                (normalize_address(address),)
+            ).fetchone()
+        if row is None:
+            return None
+        lat, lon, updated_at = row
+        ttl = self.negative_ttl if lat is None else self.ttl
+        if time.time() - updated_at > ttl:
+            return None
+        return lat, lon
+
+    def set(self, address, lat, lon):
+        """좌표를 저장 (찾지 못한 주소는 lat, lon을 None으로)"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO geocode (address, latitude, longitude, updated_at) VALUES (?, ?, ?, ?)",
+                (normalize_address(address), lat, lon, time.time())
+            )
@@ -1,65 +1,170 @@
-
+import logging
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import requests
+from requests.adapters import HTTPAdapter
 import streamlit as st
 import config
+from services.geocode_cache import GeocodeCache, normalize_address
+
+_session = None
+_session_pool_size = 0
+_session_lock = threading.Lock()
+_geocode_cache = None
+_geocode_cache_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+
+def get_session(pool_size=10):
+    """연결을 재사용하는 공용 requests 세션 (pool_size가 지금 연결 풀보다 크면 풀을 키운다)"""
+    global _session, _session_pool_size
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+        if pool_size > _session_pool_size:
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+            _session_pool_size = pool_size
+        return _session
+
+
+def get_geocode_cache():
+    """디스크에 저장되는 공용 지오코딩 캐시"""
+    global _geocode_cache
+    with _geocode_cache_lock:
+        if _geocode_cache is None:
+            _geocode_cache = GeocodeCache(config.GEOCODE_CACHE_PATH, config.GEOCODE_CACHE_TTL,
+                                          config.GEOCODE_NEGATIVE_TTL)
+        return _geocode_cache
+
+
+def address_variations(address):
+    """성공률을 높이기 위해 시도할 주소 형식 목록 (중복 제거, 우선순위 순)"""
+    variations = [
+        address,
+        address.replace("역", ""),  # "신림역" → "신림"
+        f"서울 관악구 {address}" if "서울" not in address else address,
+        f"서울특별시 관악구 {address}" if "서울특별시" not in address else address,
+        f"서울특별시 관악구 신림동" if "신림" in address else address
+    ]
+    return list(dict.fromkeys(variations))
+
+
+def search_address(session, rest_key, query, url=None, timeout=10):
+    """카카오 주소 검색 API 1회 호출 → (HTTP 상태 코드, 첫 번째 검색 결과 또는 None)"""
+    # 핵심: params로 넘겨 올바르게 URL 인코딩
+    response = session.get(url or config.KAKAO_ADDRESS_SEARCH_URL,
+                           headers={"Authorization": f"KakaoAK {rest_key}"},
+                           params={"query": query}, timeout=timeout)
+    if response.status_code != 200:
+        return response.status_code, None
+    documents = response.json().get("documents")
+    return 200, documents[0] if documents else None
+
+
+def _search_outcome(session, rest_key, query, url):
+    try:
+        status_code, document = search_address(session, rest_key, query, url=url)
+        return status_code, document, None
+    except requests.exceptions.RequestException as e:
+        return None, None, e
+
+
+def probe_variations(session, rest_key, variations, url=None, parallel=False):
+    """주소 형식들을 검색해 (순번, 주소, 상태 코드, 검색 결과, 예외)를 우선순위 순으로 내보낸다
+
+    parallel=True이면 모든 형식을 공용 연결 풀로 동시에 요청하고, 앞선 형식의 결과가
+    확정되는 대로 순서대로 내보낸다. 401/403 응답은 순서와 관계없이 바로 내보내 호출자가
+    즉시 중단할 수 있게 한다. 호출자가 중간에 멈추면 남은 요청의 결과는 기다리지 않는다.
+    """
+    if not parallel:
+        for i, query in enumerate(variations, 1):
+            yield (i, query) + _search_outcome(session, rest_key, query, url)
+        return
+
+    executor = ThreadPoolExecutor(max_workers=len(variations))
+    try:
+        futures = {executor.submit(_search_outcome, session, rest_key, query, url): i
+                   for i, query in enumerate(variations, 1)}
+        outcomes = {}
+        next_i = 1
+        for future in as_completed(futures):
+            i = futures[future]
+            outcomes[i] = future.result()
+            if outcomes[i][0] in (401, 403):
+                yield (i, variations[i - 1]) + outcomes[i]
+                return
+            while next_i in outcomes:
+                yield (next_i, variations[next_i - 1]) + outcomes.pop(next_i)
+                next_i += 1
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
 
 @st.cache_data(show_spinner=False)
-def geocode(address: str):
-    """개선된 한글 주소 → (lat, lon) 튜플 반환"""
+def geocode(address: str, parallel: bool = False):
+    """개선된 한글 주소 → (lat, lon) 튜플 반환
+
+    parallel=True이면 여러 주소 형식을 동시에 요청해 실패 시 대기 시간을 줄인다.
+    """
     if not address:
         return None, None
 
+    cached = get_geocode_cache().get(address)
+    if cached is not None:
+        if cached[0] is not None:
+            return cached
+        st.error("❌ 이전에 좌표를 찾지 못한 주소입니다. 다른 주소 형식으로 입력해 주세요")
+        return None, None
+
     REST_KEY = os.getenv(config.KAKAO_REST_API_KEY_ENV)
     if not REST_KEY:
         st.error(f"❌ {config.KAKAO_REST_API_KEY_ENV} 환경변수가 설정되지 않았습니다")
         return None, None
 
     # 여러 주소 형식으로 시도 (성공률 향상)
-    address_variations = [
-        address,
-        address.replace("역", ""),  # "신림역" → "신림"
-        f"서울 관악구 {address}" if "서울" not in address else address,
-        f"서울특별시 관악구 {address}" if "서울특별시" not in address else address,
-        f"서울특별시 관악구 신림동" if "신림" in address else address
-    ]
+    session = get_session()
+    all_not_found = True
 
-    # 중복 제거
-    address_variations = list(dict.fromkeys(address_variations))
+    for i, test_address, status_code, document, error in probe_variations(
+            session, REST_KEY, address_variations(address), parallel=parallel):
+        if error is not None:
+            all_not_found = False
+            st.warning(f"시도 {i}: '{test_address}' - 네트워크 오류: {error}")
+            continue
 
-    url = "https://dapi.kakao.com/v2/local/search/address.json"
-    headers = {"Authorization": f"KakaoAK {REST_KEY}"}
+        if status_code == 200:
+            if document:
+                y = float(document["y"])  # 위도
+                x = float(document["x"])  # 경도
+                address_name = document.get("address_name", "")
 
-    for i, test_address in enumerate(address_variations, 1):
-        try:
-            # 핵심: 올바른 URL 인코딩
-            params = {"query": test_address}
-            response = requests.get(url, headers=headers, params=params, timeout=10)
-
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("documents"):
-                    y = float(data["documents"][0]["y"])  # 위도
-                    x = float(data["documents"][0]["x"])  # 경도
-                    address_name = data["documents"][0].get("address_name", "")
-
-                    st.info(f"✅ 주소 찾기 성공 ({i}번째 시도): {address_name}")
-                    return y, x
-
-            elif response.status_code == 401:
-                st.error("❌ 401 오류: REST API 키가 잘못되었습니다")
-                st.error(f"💡 해결방법: .env 파일의 {config.KAKAO_REST_API_KEY_ENV} 확인")
-                break
-            elif response.status_code == 403:
-                st.error("❌ 403 오류: API 사용 권한이 없습니다")
-                st.error("💡 해결방법: 카카오 개발자센터에서 도메인/IP 설정 확인")
-                break
-            else:
-                st.warning(f"시도 {i}: '{test_address}' - HTTP {response.status_code}")
+                st.info(f"✅ 주소 찾기 성공 ({i}번째 시도): {address_name}")
+                get_geocode_cache().set(address, y, x)
+                return y, x
 
-        except requests.exceptions.RequestException as e:
-            st.warning(f"시도 {i}: '{test_address}' - 네트워크 오류: {e}")
-            continue
+        elif status_code == 401:
+            st.error("❌ 401 오류: REST API 키가 잘못되었습니다")
+            st.error(f"💡 해결방법: .env 파일의 {config.KAKAO_REST_API_KEY_ENV} 확인")
+            all_not_found = False
+            break
+        elif status_code == 403:
+            st.error("❌ 403 오류: API 사용 권한이 없습니다")
+            st.error("💡 해결방법: 카카오 개발자센터에서 도메인/IP 설정 확인")
+            all_not_found = False
+            break
+        else:
+            all_not_found = False
+            st.warning(f"시도 {i}: '{test_address}' - HTTP {status_code}")
+
+    # 모든 형식에서 검색 결과가 없었던 경우에만 음성 결과로 저장 (일시적 오류는 저장하지 않음)
+    if all_not_found:
+        get_geocode_cache().set(address, None, None)
 
     st.error("❌ 모든 주소 형식으로 시도했지만 좌표를 찾을 수 없습니다")
     st.info("💡 다음 주소 형식들을 시도해보세요:")
@@ -67,4 +172,93 @@ def geocode(address: str):
     st.info("   • 서울 관악구 신림로 378")
     st.info("   • 관악구 신림동")
 
-    return None, None
\ No newline at end of file
+    return None, None
+
+
+class RateLimiter:
+    """여러 스레드가 공유하는 초당 요청 수 제한"""
+
+    def __init__(self, rate_per_second):
+        self.interval = 1.0 / rate_per_second if rate_per_second else 0.0
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(self._next_time, now)
+            self._next_time = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class GeocodeAuthError(Exception):
+    """API 키 오류(401/403)로 더 이상 요청해도 소용없는 경우"""
+
+
+def _geocode_uncached(session, rest_key, address, rate_limiter, url):
+    """주소 형식을 차례로 시도 → ((lat, lon), 캐시 저장 여부)"""
+    all_not_found = True
+    for test_address in address_variations(address):
+        rate_limiter.wait()
+        try:
+            status_code, document = search_address(session, rest_key, test_address, url=url)
+            if status_code == 200 and document:
+                return (float(document["y"]), float(document["x"])), True
+        except requests.exceptions.RequestException as e:
+            logger.warning("지오코딩 네트워크 오류 '%s': %s", test_address, e)
+            all_not_found = False
+            continue
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            # 200 응답이지만 본문 형식이 다른 경우도 이 주소만 실패로 보고 배치는 계속한다
+            logger.warning("지오코딩 응답 형식 오류 '%s': %r", test_address, e)
+            all_not_found = False
+            continue
+        if status_code in (401, 403):
+            raise GeocodeAuthError(f"HTTP {status_code}")
+        if status_code != 200:
+            all_not_found = False
+    return (None, None), all_not_found
+
+
+def geocode_many(addresses, max_workers=8, rate_limit=10, rest_key=None, url=None, cache=None):
+    """여러 주소를 한 번에 좌표로 변환 → {주소: (lat, lon)} (찾지 못하면 (None, None))
+
+    정규화한 주소로 중복을 제거하고 디스크 캐시를 먼저 확인한 뒤, 남은 주소만
+    공용 세션(get_session)의 연결 풀을 공유하는 스레드로 동시에 요청하므로 호출 사이에도
+    연결을 재사용한다. rate_limit은 전체 초당 요청 수이다.
+    Streamlit에 의존하지 않으므로 배치 작업에서도 사용할 수 있다.
+    """
+    rest_key = rest_key or os.getenv(config.KAKAO_REST_API_KEY_ENV)
+    if not rest_key:
+        raise GeocodeAuthError(f"{config.KAKAO_REST_API_KEY_ENV} 환경변수가 설정되지 않았습니다")
+    cache = cache or get_geocode_cache()
+
+    keys = {address: normalize_address(address) for address in addresses if address}
+    results = {}
+    pending = []
+    for key in dict.fromkeys(keys.values()):
+        cached = cache.get(key)
+        if cached is None:
+            pending.append(key)
+        else:
+            results[key] = cached
+
+    if pending:
+        session = get_session(max_workers)
+        rate_limiter = RateLimiter(rate_limit)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {key: executor.submit(_geocode_uncached, session, rest_key, key, rate_limiter, url)
+                       for key in pending}
+            try:
+                for key, future in futures.items():
+                    coords, cacheable = future.result()
+                    results[key] = coords
+                    if cacheable:
+                        cache.set(key, *coords)
+            except GeocodeAuthError:
+                for future in futures.values():
+                    future.cancel()
+                raise
+
+    return {address: results.get(key, (None, None)) for address, key in keys.items()}
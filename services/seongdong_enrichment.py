@@ -0,0 +1,98 @@
+import argparse
+import os
+import re
+from functools import partial
+
+import pandas as pd
+
+import config
+from services.kakao_api import geocode_many
+
+# 건물 뒤의 층/호수(쉼표 뒤)와 괄호 안 법정동은 주소 검색에 방해가 되므로 뺀다
+_DETAIL_PATTERN = re.compile(r'\s*(,.*|\(.*?\))\s*$')
+
+
+def geocode_query(address):
+    """가맹점 주소에서 좌표 검색에 쓸 부분만 남긴다
+
+    '서울 성동구 독서당로294, 2층 (금호동4가)' → '서울 성동구 독서당로294'
+    """
+    previous = None
+    while previous != address:
+        previous, address = address, _DETAIL_PATTERN.sub('', address)
+    return address.strip()
+
+
+def coords_path(csv_path):
+    """가맹점 CSV 옆에 저장하는 좌표 파일 경로 (크롤링으로 CSV를 다시 써도 유지된다)"""
+    base, _ = os.path.splitext(csv_path)
+    return base + '.coords.csv'
+
+
+def load_shop_coords(csv_path):
+    """저장된 주소별 좌표 (인덱스: address, 컬럼: latitude, longitude). 없으면 빈 DataFrame"""
+    path = coords_path(csv_path)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=['latitude', 'longitude'], dtype='float64').rename_axis('address')
+    coords = pd.read_csv(path, dtype={'address': str, 'latitude': 'float64', 'longitude': 'float64'},
+                         keep_default_na=False, na_values=[''], encoding='utf-8-sig')
+    return coords.drop_duplicates('address', keep='last').set_index('address')
+
+
+def kakao_geocoder(max_workers=8, rate_limit=10):
+    """카카오 주소 검색 API를 쓰는 지오코더 (주소 목록 → {주소: (lat, lon)})"""
+    return partial(geocode_many, max_workers=max_workers, rate_limit=rate_limit)
+
+
+def lookup_geocoder(table):
+    """미리 준비한 {주소: (lat, lon)} 표로 답하는 지오코더 (오프라인 실행/테스트용)"""
+    return lambda queries: {query: table.get(query, (None, None)) for query in queries}
+
+
+def enrich_seongdong_shops(csv_path=config.SEONGDONG_DATA_PATH, geocoder=None, retry_missing=False):
+    """성동구 가맹점 주소를 좌표로 바꿔 CSV 옆의 좌표 파일에 저장하고 통계를 반환
+
+    geocoder는 주소 목록을 받아 {주소: (lat, lon)}을 돌려주는 함수이다 (기본값은 카카오 API).
+    이미 좌표가 있는 주소는 건너뛰고, retry_missing=True이면 전에 찾지 못한 주소도 다시 요청한다.
+    같은 검색어(geocode_query)로 바뀌는 주소는 한 번만 요청한다.
+    """
+    geocoder = geocoder or kakao_geocoder()
+    shops = pd.read_csv(csv_path, dtype=str, keep_default_na=False, encoding='utf-8-sig')
+    addresses = pd.Series(shops['address'].unique())
+    addresses = addresses[addresses != '']
+
+    coords = load_shop_coords(csv_path)
+    known = coords.index if retry_missing is False else coords.dropna().index
+    pending = addresses[~addresses.isin(known)]
+    queries = pending.map(geocode_query)
+
+    found = geocoder(list(dict.fromkeys(queries))) if len(queries) else {}
+    located = queries.map(lambda query: found.get(query) or (None, None))
+    fresh = pd.DataFrame({
+        'latitude': [lat for lat, _ in located],
+        'longitude': [lon for _, lon in located],
+    }, index=pd.Index(pending, name='address'), dtype='float64')
+
+    coords = pd.concat([coords[~coords.index.isin(fresh.index)], fresh])
+    coords = coords[coords.index.isin(addresses)]
+    path = coords_path(csv_path)
+    temp_path = path + '.tmp'
+    coords.reset_index().to_csv(temp_path, index=False, encoding='utf-8-sig')
+    os.replace(temp_path, path)
+
+    return {
+        'addresses': len(addresses),
+        'requested': len(dict.fromkeys(queries)),
+        'geocoded': int(fresh['latitude'].notna().sum()),
+        'missing': int(coords['latitude'].isna().sum() + (~addresses.isin(coords.index)).sum()),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='성동구 가맹점 주소 좌표 변환 (결과는 CSV 옆 .coords.csv)')
+    parser.add_argument('--csv', default=config.SEONGDONG_DATA_PATH)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--rate-limit', type=float, default=10)
+    parser.add_argument('--retry-missing', action='store_true')
+    args = parser.parse_args()
+    print(enrich_seongdong_shops(args.csv, kakao_geocoder(args.workers, args.rate_limit), args.retry_missing))
@@ -1,6 +1,16 @@
-
+import glob
+import hashlib
+import json
+import os
 import time
+from collections import Counter
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
@@ -9,9 +19,243 @@ from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import streamlit as st
-import os
 
-def crawl_shops_seongdong(output_path='./data/shops_seongdong.csv', max_pages=2):
+from services.kakao_api import RateLimiter
+
+BASE_URL = "https://www.sd.go.kr/main/webRecoveryCouponList.do?searchName=&searchEmdNm=&searchAddress=&searchBizRegNo=&key=5269&pageIndex={}"
+
+
+def parse_shop_rows(html):
+    """목록 페이지 HTML에서 매장 행(상호명, 동, 주소)을 추출"""
+    soup = BeautifulSoup(html, 'lxml')
+    result_list = []
+    for row in soup.select("table.table tbody tr"):
+        cols = row.find_all("th")
+        if len(cols) < 3:
+            continue
+        result_list.append({
+            "store_name": cols[0].get_text(strip=True),
+            "dong": cols[1].get_text(strip=True),
+            "address": cols[2].get_text(strip=True)
+        })
+    return result_list
+
+
+def _checkpoint_path(checkpoint_dir, page):
+    return os.path.join(checkpoint_dir, f"page_{page:04d}.json")
+
+
+def _save_checkpoint(checkpoint_dir, page, rows):
+    # 중단되어도 반쯤 쓴 파일이 남지 않도록 임시 파일에 쓴 뒤 이름을 바꾼다
+    path = _checkpoint_path(checkpoint_dir, page)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(rows, f, ensure_ascii=False)
+    os.replace(path + '.tmp', path)
+
+
+def _load_checkpoint(checkpoint_dir, page):
+    with open(_checkpoint_path(checkpoint_dir, page), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _clear_checkpoints(checkpoint_dir):
+    for path in glob.glob(os.path.join(checkpoint_dir, 'page_*.json')):
+        os.remove(path)
+    if os.path.isdir(checkpoint_dir) and not os.listdir(checkpoint_dir):
+        os.rmdir(checkpoint_dir)
+
+
+def _pooled_session(max_workers):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def fetch_page(session, page, base_url=BASE_URL, timeout=10):
+    """목록 페이지 하나를 가져와 매장 행 목록으로 반환"""
+    response = session.get(base_url.format(page), timeout=timeout)
+    response.raise_for_status()
+    return parse_shop_rows(response.text)
+
+
+def crawl_pages(pages, checkpoint_dir, base_url=BASE_URL, max_workers=4, rate_limit=4, timeout=10):
+    """브라우저 없이 목록 페이지들을 동시에 가져와 페이지별로 체크포인트에 저장
+
+    이미 체크포인트가 있는 페이지는 건너뛰므로 중단된 크롤링을 이어서 할 수 있다.
+    rate_limit은 전체 초당 요청 수이다. 실패한 페이지 번호 목록을 반환한다.
+    """
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    pending = [page for page in pages if not os.path.exists(_checkpoint_path(checkpoint_dir, page))]
+    rate_limiter = RateLimiter(rate_limit)
+
+    def fetch(session, page):
+        rate_limiter.wait()
+        rows = fetch_page(session, page, base_url, timeout)
+        _save_checkpoint(checkpoint_dir, page, rows)
+        return rows
+
+    failed = []
+    with _pooled_session(max_workers) as session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(fetch, session, page): page for page in pending}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except (requests.exceptions.RequestException, OSError):
+                failed.append(futures[future])
+    return sorted(failed)
+
+
+def _row_key(row):
+    return row["store_name"], row["address"]
+
+
+def _page_hash(rows):
+    """페이지의 행 집합 해시 (행 순서와 무관)"""
+    rows = sorted([row["store_name"], row["dong"], row["address"]] for row in rows)
+    return hashlib.sha1(json.dumps(rows, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def _manifest_path(output_path):
+    return output_path + '.manifest.json'
+
+
+def load_crawl_manifest(output_path):
+    """마지막 크롤링의 페이지별 해시/키와 통계 (없으면 None)"""
+    path = _manifest_path(output_path)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _page_entry(rows):
+    return {"hash": _page_hash(rows), "keys": [list(_row_key(row)) for row in rows]}
+
+
+def _save_crawl_manifest(output_path, pages, mode, stats):
+    """페이지별 해시/키와 이번 크롤링 통계를 원자적으로 저장"""
+    manifest = {
+        "updated_at": datetime.now().isoformat(timespec='seconds'),
+        "mode": mode,
+        "last_run": stats,
+        "pages": {str(page): pages[page] for page in sorted(pages)},
+    }
+    path = _manifest_path(output_path)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(path + '.tmp', path)
+
+
+def _crawl_incremental(output_path, manifest, max_pages, max_workers, rate_limit, base_url):
+    """바뀐 앞쪽 페이지만 다시 가져와 기존 CSV에 추가/삭제를 반영
+
+    목록을 앞에서부터 읽다가 행 집합 해시가 지난 크롤링과 같은 페이지(또는 빈 페이지)를
+    만나면 멈춘다. 그 앞 페이지들에 있던 키 중 다시 보이지 않는 것은 삭제된 것으로 본다.
+    """
+    old_pages = {int(page): info for page, info in manifest["pages"].items()}
+    rate_limiter = RateLimiter(rate_limit)
+
+    def fetch(session, page):
+        rate_limiter.wait()
+        return fetch_page(session, page, base_url)
+
+    fetched = {}
+    stop_page, stop_rows = None, []
+    page, batch = 1, 1
+    with _pooled_session(max_workers) as session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while stop_page is None and page <= max_pages:
+            # 대부분 앞쪽 몇 페이지에서 멈추므로 한 페이지부터 시작해 묶음 크기를 늘린다
+            batch_pages = range(page, min(page + batch, max_pages + 1))
+            results = list(executor.map(lambda p: fetch(session, p), batch_pages))
+            for current, rows in zip(batch_pages, results):
+                old = old_pages.get(current)
+                if not rows or (old is not None and old["hash"] == _page_hash(rows)):
+                    stop_page, stop_rows = current, rows
+                    break
+                fetched[current] = rows
+            page += len(batch_pages)
+            batch = min(batch * 2, max_workers)
+
+    existing = pd.read_csv(output_path, dtype=str, keep_default_na=False, encoding='utf-8-sig')
+    existing_keys = set(zip(existing["store_name"], existing["address"]))
+    new_rows = [row for page_rows in fetched.values() for row in page_rows]
+    fetched_keys = {_row_key(row) for row in new_rows}
+    seen_keys = fetched_keys | {_row_key(row) for row in stop_rows}
+
+    # 다시 읽은 범위(바뀐 페이지들, 빈 페이지에서 멈췄으면 그 뒤 전부)의 이전 행을 새로 읽은 행으로 교체한다.
+    # 같은 키가 여러 번 나올 수 있으므로 이전 페이지에 있던 개수만큼만 기존 행에서 뺀다
+    dropped = [page for page in old_pages if stop_page is not None and not stop_rows and page >= stop_page]
+    replaced = Counter(tuple(key) for page in list(fetched) + dropped for key in old_pages.get(page, {}).get("keys", []))
+    deleted_keys = set(replaced) - seen_keys
+
+    keep = []
+    for key in zip(existing["store_name"], existing["address"]):
+        keep.append(replaced[key] == 0)
+        if replaced[key]:
+            replaced[key] -= 1
+    fresh = pd.DataFrame(new_rows, columns=["store_name", "dong", "address"])
+    df = pd.concat([fresh, existing.loc[keep, ["store_name", "dong", "address"]]], ignore_index=True)
+    df.to_csv(output_path, index=False, encoding='utf-8-sig')
+
+    stats = {
+        "pages_fetched": len(fetched) + (1 if stop_page else 0),
+        "inserted": len(fetched_keys - existing_keys),
+        "deleted": len(deleted_keys & existing_keys),
+    }
+    pages = {page: info for page, info in old_pages.items() if page not in dropped}
+    pages.update({page: _page_entry(rows) for page, rows in fetched.items()})
+    _save_crawl_manifest(output_path, pages, "incremental", stats)
+    return df
+
+
+def crawl_shops_seongdong(output_path='./data/shops_seongdong.csv', max_pages=2, use_browser=False,
+                          max_workers=4, rate_limit=4, base_url=BASE_URL, incremental=False):
+    """성동구청 소비쿠폰 가맹점 목록을 수집해 CSV로 저장
+
+    기본은 requests로 페이지를 동시에 가져오는 빠른 경로이며, 페이지마다 체크포인트를
+    남겨 실패한 뒤 다시 실행하면 남은 페이지만 가져온다. 모든 페이지를 받은 뒤에만 CSV를
+    쓰고 체크포인트를 지운다. 빠른 경로로 한 행도 얻지 못하면 브라우저(Selenium)로 수집한다.
+    incremental=True이고 이전 CSV와 크롤링 기록(manifest)이 있으면 바뀐 페이지만 다시 가져오고,
+    기록이 없으면 알린 뒤 전체를 수집해 기록을 만든다.
+    """
+    if use_browser:
+        return _crawl_with_browser(output_path, max_pages)
+
+    manifest = load_crawl_manifest(output_path) if incremental and os.path.exists(output_path) else None
+    if incremental and manifest is None:
+        st.info("이전 크롤링 기록(manifest)이 없어 이번에는 전체 페이지를 수집합니다. 다음 업데이트부터는 바뀐 페이지만 수집합니다.")
+    if manifest is not None:
+        try:
+            return _crawl_incremental(output_path, manifest, max_pages, max_workers, rate_limit, base_url)
+        except requests.exceptions.RequestException as e:
+            st.error(f"[ERROR] 증분 크롤링 중 에러 발생: {e}")
+            return pd.read_csv(output_path, encoding='utf-8-sig')
+
+    pages = range(1, max_pages + 1)
+    checkpoint_dir = output_path + '.pages'
+    failed = crawl_pages(pages, checkpoint_dir, base_url=base_url, max_workers=max_workers, rate_limit=rate_limit)
+
+    done = {page: _load_checkpoint(checkpoint_dir, page) for page in pages if page not in failed}
+    result_list = [row for rows in done.values() for row in rows]
+    if failed:
+        st.error(f"[ERROR] {len(failed)}개 페이지 수집 실패 (페이지 {failed}). 다시 실행하면 남은 페이지만 수집합니다.")
+        return pd.DataFrame(result_list)
+    if not result_list:
+        _clear_checkpoints(checkpoint_dir)
+        return _crawl_with_browser(output_path, max_pages)
+
+    df = pd.DataFrame(result_list)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    df.to_csv(output_path, index=False, encoding='utf-8-sig')
+    _save_crawl_manifest(output_path, {page: _page_entry(rows) for page, rows in done.items() if rows}, "full",
+                         {"pages_fetched": len(done), "inserted": len(df), "deleted": 0})
+    _clear_checkpoints(checkpoint_dir)
+    return df
+
+
+def _crawl_with_browser(output_path='./data/shops_seongdong.csv', max_pages=2):
     chrome_options = Options()
     chrome_options.add_argument('--headless')
     chrome_options.add_argument('--no-sandbox')
@@ -21,13 +265,11 @@ def crawl_shops_seongdong(output_path='./data/shops_seongdong.csv', max_pages=2)
     service = Service(ChromeDriverManager().install())
     driver = webdriver.Chrome(service=service, options=chrome_options)
 
-    base_url = "https://www.sd.go.kr/main/webRecoveryCouponList.do?searchName=&searchEmdNm=&searchAddress=&searchBizRegNo=&key=5269&pageIndex={}"
-
     result_list = []
 
     try:
         for page in range(1, max_pages + 1):
-            driver.get(base_url.format(page))
+            driver.get(BASE_URL.format(page))
             WebDriverWait(driver, 10).until(
                 EC.presence_of_all_elements_located((By.CSS_SELECTOR, "table.table tbody tr"))
             )
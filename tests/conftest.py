@@ -0,0 +1,71 @@
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+# 저장소 루트의 패키지(utils, api, ...)를 설치 없이 import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class _KakaoHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        with self.server.stub.lock:
+            self.server.stub.connections += 1
+
+    def do_GET(self):
+        stub = self.server.stub
+        query = parse_qs(urlsplit(self.path).query).get('query', [''])[0]
+        with stub.lock:
+            stub.queries.append(query)
+        time.sleep(stub.delays.get(query, stub.latency))
+        status = stub.statuses.get(query, stub.status)
+        documents = []
+        if status == 200 and query in stub.known:
+            lat, lon = stub.known[query]
+            documents = [{'y': str(lat), 'x': str(lon), 'address_name': query}]
+        body = stub.bodies.get(query) or json.dumps({'documents': documents}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class KakaoStub:
+    """카카오 주소 검색 API를 흉내 내는 로컬 서버 (known에 있는 주소만 찾는다)"""
+
+    def __init__(self):
+        self.known = {}
+        self.status = 200
+        self.statuses = {}   # 주소별 응답 코드
+        self.latency = 0.0
+        self.delays = {}     # 주소별 응답 지연 (초)
+        self.bodies = {}     # 주소별 응답 본문 (bytes, 형식이 깨진 응답 흉내)
+        self.queries = []
+        self.connections = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _KakaoHandler)
+        self.server.daemon_threads = True
+        self.server.stub = self
+        self.url = f'http://127.0.0.1:{self.server.server_port}/v2/local/search/address.json'
+
+
+@pytest.fixture
+def kakao_stub():
+    stub = KakaoStub()
+    thread = threading.Thread(target=stub.server.serve_forever, daemon=True)
+    thread.start()
+    yield stub
+    stub.server.shutdown()
+    stub.server.server_close()
@@ -0,0 +1,93 @@
+import asyncio
+import json
+import threading
+from urllib.parse import urlencode
+
+import numpy as np
+import pandas as pd
+
+from api.app import create_app
+from api.service import ShopQueryService
+from utils.shop_cache import compact_shop_dtypes
+
+
+async def _get(app, path, **params):
+    """ASGI 앱에 GET 요청 하나를 보내고 (상태, 본문)을 반환"""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': urlencode(params).encode(),
+        'headers': [], 'client': ('test', 0), 'server': ('test', 80), 'app': app,
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    status = next(m['status'] for m in messages if m['type'] == 'http.response.start')
+    body = b''.join(m.get('body', b'') for m in messages if m['type'] == 'http.response.body')
+    return status, body
+
+
+def _service():
+    n = 200
+    rng = np.random.default_rng(0)
+    df = compact_shop_dtypes(pd.DataFrame({
+        'store_name': [f'김밥{i}' if i % 4 == 0 else f'카페{i}' for i in range(n)],
+        'industry_code': rng.choice(['음식점/식음료업', '학원'], n),
+        'address': [f'서울특별시 성동구 왕십리로 {i}' for i in range(n)],
+        'detail_address': [None] * n,
+        'latitude': rng.uniform(37.54, 37.56, n),
+        'longitude': rng.uniform(127.03, 127.05, n),
+        'district': ['성동구'] * n,
+    }))
+    return ShopQueryService(df)
+
+
+def test_endpoints():
+    app = create_app(service=_service())
+
+    async def run():
+        async with app.router.lifespan_context(app):
+            return (await _get(app, '/nearby', lat=37.55, lon=127.04, radius_km=1, limit=5),
+                    await _get(app, '/search', q='김밥', limit=3),
+                    await _get(app, '/stats'),
+                    await _get(app, '/nearby', lat='abc', lon=127))
+
+    nearby, search, stats, bad = asyncio.run(run())
+    body = json.loads(nearby[1])
+    assert nearby[0] == 200 and body['count'] == 5
+    distances = [shop['distance'] for shop in body['shops']]
+    assert distances == sorted(distances)
+    body = json.loads(search[1])
+    assert body['total'] == 50 and all('김밥' in shop['store_name'] for shop in body['shops'])
+    assert json.loads(stats[1])['total'] == 200
+    assert bad[0] == 400
+
+
+def test_queries_do_not_block_event_loop():
+    # search가 끝나려면 stats가 실행되어야 한다: 조회가 이벤트 루프에서 돌면 stats가 시작되지 못해 시간 초과
+    service = _service()
+    stats_started = threading.Event()
+    search, stats = service.search, service.stats
+
+    def blocking_search(*args, **kwargs):
+        assert stats_started.wait(timeout=5), "동시 요청이 순서대로만 처리되었습니다"
+        return search(*args, **kwargs)
+
+    def signalling_stats(*args, **kwargs):
+        stats_started.set()
+        return stats(*args, **kwargs)
+
+    service.search, service.stats = blocking_search, signalling_stats
+    app = create_app(service=service)
+
+    async def run():
+        async with app.router.lifespan_context(app):
+            return await asyncio.gather(_get(app, '/search', q='카페'), _get(app, '/stats'))
+
+    (search_status, _), (stats_status, _) = asyncio.run(run())
+    assert search_status == 200 and stats_status == 200
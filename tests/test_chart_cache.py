@@ -0,0 +1,77 @@
+import ctypes
+import logging
+import os
+
+import matplotlib
+
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from utils import chart_cache
+from utils.chart_cache import ChartCache, render_chart
+
+
+def _rss_bytes():
+    # 해제됐지만 프로세스에 남아 있는 힙을 돌려준 뒤 재서 앞선 테스트의 단편화가 섞이지 않게 한다
+    ctypes.CDLL('libc.so.6').malloc_trim(0)
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def _bar(series):
+    def draw():
+        fig, ax = plt.subplots(figsize=(6, 3))
+        ax.bar(series.index.astype(str), series.to_numpy())
+        return fig
+    return draw
+
+
+def test_lru_evicts_least_recently_used_within_bound():
+    cache = ChartCache(max_bytes=100)
+    for key in 'abc':
+        cache.put(key, b'x' * 40)
+    assert len(cache) == 2 and cache.total_bytes == 80
+    assert cache.get('a') is None
+
+    cache.get('b')                 # b를 최근 사용으로 올리면 다음에는 c가 밀려난다
+    cache.put('d', b'x' * 40)
+    assert cache.get('c') is None and cache.get('b') is not None
+    assert cache.total_bytes <= cache.max_bytes
+
+    cache.put('b', b'x' * 10)      # 같은 키를 덮어쓰면 크기를 다시 계산한다
+    assert cache.total_bytes == 50
+    cache.put('huge', b'x' * 101)  # 한도보다 큰 항목은 넣지 않는다
+    assert cache.get('huge') is None and cache.total_bytes == 50
+
+
+def test_reruns_reuse_bytes_and_keep_memory_flat(monkeypatch, caplog):
+    # 설치되지 않은 한글 글꼴 경고를 pytest가 모두 보관하면 그만큼 RSS가 늘어나므로 끈다
+    caplog.set_level(logging.ERROR, logger='matplotlib.font_manager')
+    cache = ChartCache(max_bytes=512 * 1024)
+    monkeypatch.setattr(chart_cache, '_chart_cache', cache)
+    rng = np.random.default_rng(0)
+    # 재실행마다 같은 차트 5개 + 새 데이터 차트 1개 (새 차트가 쌓여도 캐시 한도에서 밀려난다)
+    fixed = [pd.Series(rng.integers(1, 100, 12), index=[f'd{i}' for i in range(12)]) for _ in range(5)]
+    draws = []
+
+    def rerun():
+        for j, series in enumerate(fixed):
+            draw = _bar(series)
+            render_chart(series, ('bar', j), lambda: draws.append(j) or draw())
+        fresh = pd.Series(rng.integers(1, 100, 12))
+        render_chart(fresh, ('bar', 'fresh'), _bar(fresh))
+
+    # 캐시가 한도까지 찰 때까지는 바이트가 쌓이므로, 찬 뒤의 200번 재실행을 잰다
+    for _ in range(40):
+        rerun()
+    assert len(cache) < 45
+    baseline = _rss_bytes()
+    for _ in range(200):
+        rerun()
+
+    assert sorted(draws) == list(range(5))          # 바뀌지 않은 차트는 한 번만 그린다
+    assert plt.get_fignums() == []                 # 그림은 저장 직후 모두 닫힌다
+    assert cache.total_bytes <= cache.max_bytes
+    assert _rss_bytes() - baseline < 16 * 1024 * 1024
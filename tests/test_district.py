@@ -0,0 +1,29 @@
+import pandas as pd
+import pytest
+
+from utils.preprocessing import extract_seoul_district
+
+
+@pytest.mark.parametrize('address, district', [
+    ('서울특별시 중구 세종대로 110', '중구'),
+    ('서울특별시 중랑구 망우로 353', '중랑구'),
+    ('서울 동대문구 천호대로 145', '동대문구'),
+    ('서울특별시 서대문구 연희로 248', '서대문구'),
+    ('중랑구 중구로 1', '중랑구'),  # 가장 먼저 나오는 구, 긴 이름 우선
+    ('(04750) 서울특별시 성동구 왕십리로 58', '성동구'),  # 앞 두 토큰에 없으면 전체 주소에서
+    ('서울특별시  성동구  왕십리로 58', '성동구'),
+    ('부산광역시 중구 중앙대로 100', '기타'),
+    ('경기도 성남시 분당구 판교역로 235', '기타'),
+    ('', '기타'),
+    (None, '기타'),
+])
+def test_extract_seoul_district(address, district):
+    result = extract_seoul_district(pd.Series([address, '서울특별시 강남구 테헤란로 1'], dtype=object))
+    assert list(result) == [district, '강남구']
+
+
+def test_repeated_heads_share_one_match():
+    addresses = pd.Series(['서울특별시 중랑구 망우로 1', '서울특별시 중구 을지로 1', '서울특별시 중랑구 동일로 2'] * 1000)
+    result = extract_seoul_district(addresses)
+    assert list(result[:3]) == ['중랑구', '중구', '중랑구']
+    assert (result.codes[3:] == result.codes[:-3]).all()
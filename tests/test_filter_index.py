@@ -0,0 +1,101 @@
+import unicodedata
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.filter_index import ShopFilterIndex
+
+DISTRICTS = ['성동구', '중구', '강남구', '마포구', '기타']
+INDUSTRIES = ['음식점/식음료업', '보건/복지', '학원', '숙박']
+SYLLABLES = list('가나다라마바사김이박카페약국')
+WORDS = ['Cafe', 'CAFE', 'cafe', 'GS25', 'Mart', ' 2호점', '(주)', '마트약국']
+
+
+def _shops(n, seed):
+    rng = np.random.default_rng(seed)
+    names = []
+    for _ in range(n):
+        parts = list(rng.choice(SYLLABLES, rng.integers(1, 6)))
+        if rng.random() < 0.4:
+            parts.insert(rng.integers(0, len(parts) + 1), rng.choice(WORDS))
+        names.append(''.join(parts))
+    names[::97] = [None] * len(names[::97])
+    return pd.DataFrame({
+        'store_name': names,
+        'district': rng.choice(DISTRICTS, n),
+        'industry_code': rng.choice(INDUSTRIES, n),
+    })
+
+
+def _queries(df, seed):
+    """실제 이름의 부분 문자열(1~6글자, 영문 대소문자 섞음)과 자주 쓰는 검색어"""
+    rng = np.random.default_rng(seed)
+    names = df['store_name'].dropna().tolist()
+    queries = ['cafe', 'CaFe', '2호점', '마트약국', '마트약국x', '없는매장', 'gs2', '약']
+    for _ in range(60):
+        name = names[rng.integers(len(names))]
+        start = rng.integers(0, len(name))
+        query = name[start:start + rng.integers(1, 7)].strip() or name
+        queries.append(''.join(c.swapcase() if rng.random() < 0.5 else c for c in query))
+    return queries
+
+
+def _reference(df, query, district, industry_code):
+    """인덱스 이전의 pandas 마스크 (검색은 글자 그대로, 대소문자 무시)"""
+    mask = np.ones(len(df), dtype=bool)
+    if query:
+        mask &= df['store_name'].str.contains(query, case=False, regex=False, na=False).to_numpy()
+    if district is not None:
+        mask &= (df['district'] == district).to_numpy()
+    if industry_code is not None:
+        mask &= (df['industry_code'] == industry_code).to_numpy()
+    return np.flatnonzero(mask)
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_query_matches_pandas_mask(seed):
+    df = _shops(3000, seed)
+    index = ShopFilterIndex(df)
+    rng = np.random.default_rng(seed)
+    for query in _queries(df, seed):
+        for district, industry_code in [(None, None), (rng.choice(DISTRICTS), None),
+                                        (None, rng.choice(INDUSTRIES)), (rng.choice(DISTRICTS), rng.choice(INDUSTRIES))]:
+            rows = index.query(query, district, industry_code)
+            np.testing.assert_array_equal(rows, _reference(df, query, district, industry_code), err_msg=repr(query))
+
+
+def test_attribute_filters_without_query():
+    df = _shops(3000, 3)
+    index = ShopFilterIndex(df)
+    assert index.query('', None, None) is None
+    np.testing.assert_array_equal(index.query('', '성동구', None), _reference(df, '', '성동구', None))
+    np.testing.assert_array_equal(index.query('', '성동구', '학원'), _reference(df, '', '성동구', '학원'))
+
+
+def test_unknown_category_is_empty():
+    index = ShopFilterIndex(_shops(500, 4))
+    assert len(index.query('', '부산진구', None)) == 0
+    assert len(index.query('cafe', None, '없는업종')) == 0
+
+
+def test_search_is_literal_not_regex():
+    df = pd.DataFrame({'store_name': ['(주)한빛', '주한빛', 'A.B마트', 'AXB마트'],
+                       'district': '중구', 'industry_code': '학원'})
+    index = ShopFilterIndex(df)
+    assert index.query('(주)', None, None).tolist() == [0]
+    assert index.query('a.b', None, None).tolist() == [2]
+    assert index.query('.', None, None).tolist() == [2]
+
+
+def test_case_folding_is_ascii_only_and_hangul_is_nfc():
+    df = pd.DataFrame({'store_name': ['CAFÉ 성수', 'café 성수', 'ＣＡＦＥ', unicodedata.normalize('NFD', '한빛')],
+                       'district': '중구', 'industry_code': '학원'})
+    index = ShopFilterIndex(df)
+    # 영문만 대소문자를 무시하고, É/é나 전각 문자는 서로 다른 글자로 본다
+    assert index.query('caf', None, None).tolist() == [0, 1]
+    assert index.query('CAFÉ', None, None).tolist() == [0]
+    assert index.query('ｃａｆｅ', None, None).tolist() == []
+    # 자모로 풀린 이름도 NFC 음절로 합쳐 찾는다
+    assert index.query('한빛', None, None).tolist() == [3]
+    assert index.query(unicodedata.normalize('NFD', '빛'), None, None).tolist() == [3]
@@ -0,0 +1,144 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from services import kakao_api
+from services.geocode_cache import GeocodeCache
+from services.kakao_api import GeocodeAuthError, address_variations, geocode_many, probe_variations
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return GeocodeCache(str(tmp_path / 'geocode.sqlite3'), 3600, 3600)
+
+
+def _known(stub, count, start=0):
+    addresses = [f'서울 성동구 왕십리로 {i}' for i in range(start, start + count)]
+    stub.known.update({address: (37.5 + i * 1e-4, 127.0 + i * 1e-4) for i, address in enumerate(addresses, start)})
+    return addresses
+
+
+def test_geocode_many_dedupes_and_caches(kakao_stub, cache):
+    addresses = _known(kakao_stub, 20)
+    unknown = '없는 주소 1'
+    batch = addresses + ['  서울 성동구   왕십리로 3 ', unknown]
+
+    result = geocode_many(batch, rate_limit=0, rest_key='test', url=kakao_stub.url, cache=cache)
+    assert result['서울 성동구 왕십리로 3'] == kakao_stub.known['서울 성동구 왕십리로 3']
+    assert result['  서울 성동구   왕십리로 3 '] == result['서울 성동구 왕십리로 3']
+    assert result[unknown] == (None, None)
+    # 찾은 주소는 한 번씩, 못 찾은 주소는 모든 주소 형식을 한 번씩 요청한다
+    assert len(kakao_stub.queries) == len(addresses) + len(address_variations(unknown))
+
+    requests_before = len(kakao_stub.queries)
+    assert geocode_many(batch, rate_limit=0, rest_key='test', url=kakao_stub.url, cache=cache) == result
+    assert len(kakao_stub.queries) == requests_before
+
+
+def test_geocode_many_reuses_pooled_connections_between_batches(kakao_stub, cache):
+    kakao_stub.latency = 0.01
+    geocode_many(_known(kakao_stub, 40), max_workers=4, rate_limit=0, rest_key='test', url=kakao_stub.url, cache=cache)
+    first_batch = kakao_stub.connections
+    assert 0 < first_batch <= 4
+
+    geocode_many(_known(kakao_stub, 40, start=40), max_workers=4, rate_limit=0, rest_key='test', url=kakao_stub.url,
+                 cache=cache)
+    assert len(kakao_stub.queries) == 80
+    assert kakao_stub.connections == first_batch
+    assert kakao_api.get_session() is kakao_api.get_session(4)
+
+
+def test_geocode_many_stops_on_auth_error(kakao_stub, cache):
+    kakao_stub.status = 401
+    with pytest.raises(GeocodeAuthError):
+        geocode_many(_known(kakao_stub, 10), max_workers=2, rate_limit=0, rest_key='bad', url=kakao_stub.url,
+                     cache=cache)
+    assert len(kakao_stub.queries) < 10
+
+
+def test_geocode_many_treats_malformed_responses_as_misses(kakao_stub, cache):
+    addresses = _known(kakao_stub, 6)
+    broken = {
+        addresses[0]: b'<html>busy</html>',
+        addresses[1]: b'{"documents": [{"x": "127.0"}]}',
+        addresses[2]: b'{"documents": [{"y": "north", "x": "127.0"}]}',
+        addresses[3]: b'[]',
+    }
+    for address, body in broken.items():
+        for variation in address_variations(address):
+            kakao_stub.bodies[variation] = body
+
+    result = geocode_many(addresses, max_workers=3, rate_limit=0, rest_key='test', url=kakao_stub.url, cache=cache)
+    for address in addresses:
+        assert result[address] == ((None, None) if address in broken else kakao_stub.known[address])
+
+    # 형식 오류는 일시적 실패이므로 음성 결과로 캐시하지 않고 다음 호출에서 다시 요청한다
+    kakao_stub.bodies.clear()
+    kakao_stub.queries.clear()
+    result = geocode_many(addresses, max_workers=3, rate_limit=0, rest_key='test', url=kakao_stub.url, cache=cache)
+    assert sorted(kakao_stub.queries) == sorted(broken)
+    assert all(result[address] == kakao_stub.known[address] for address in addresses)
+
+
+def test_shared_geocode_cache_is_created_once(tmp_path, monkeypatch):
+    created = []
+
+    class SlowCache:
+        def __init__(self, *args):
+            time.sleep(0.05)
+            created.append(self)
+
+    monkeypatch.setattr(kakao_api, 'GeocodeCache', SlowCache)
+    monkeypatch.setattr(kakao_api, '_geocode_cache', None)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(kakao_api.get_geocode_cache())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(created) == 1
+    assert all(cache is created[0] for cache in results)
+
+
+VARIATIONS = ['v1', 'v2', 'v3', 'v4', 'v5']
+
+
+def _probe(stub, parallel):
+    with requests.Session() as session:
+        started = time.perf_counter()
+        outcomes = []
+        for i, query, status_code, document, error in probe_variations(session, 'test', VARIATIONS, url=stub.url,
+                                                                        parallel=parallel):
+            outcomes.append((i, query, status_code, document is not None))
+            if document is not None or status_code in (401, 403):
+                break
+        return outcomes, time.perf_counter() - started
+
+
+@pytest.mark.parametrize('parallel', [False, True])
+def test_probe_yields_in_priority_order(kakao_stub, parallel):
+    # 뒤 순위 형식이 먼저 응답해도 앞 순위 결과가 정해진 뒤에만 나온다
+    kakao_stub.known = {'v3': (37.5, 127.0), 'v5': (37.6, 127.1)}
+    kakao_stub.delays = {'v1': 0.15, 'v2': 0.1, 'v3': 0.05, 'v4': 0.0, 'v5': 0.0}
+    outcomes, _ = _probe(kakao_stub, parallel)
+    assert outcomes == [(1, 'v1', 200, False), (2, 'v2', 200, False), (3, 'v3', 200, True)]
+
+
+def test_parallel_probe_miss_costs_one_round_trip(kakao_stub):
+    kakao_stub.latency = 0.2
+    sequential, sequential_time = _probe(kakao_stub, parallel=False)
+    parallel, parallel_time = _probe(kakao_stub, parallel=True)
+    assert parallel == sequential and len(parallel) == len(VARIATIONS)
+    assert sequential_time > 0.2 * len(VARIATIONS)
+    assert parallel_time < 0.2 * 2.5
+
+
+def test_parallel_probe_stops_on_auth_error_out_of_order(kakao_stub):
+    # 401은 앞 순위 형식이 아직 응답하지 않았어도 바로 나와 호출자가 멈출 수 있다
+    kakao_stub.statuses = {'v4': 401}
+    kakao_stub.delays = {'v1': 1.0, 'v2': 1.0, 'v3': 1.0}
+    outcomes, elapsed = _probe(kakao_stub, parallel=True)
+    assert outcomes == [(4, 'v4', 401, False)]
+    assert elapsed < 0.8
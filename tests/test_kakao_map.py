@@ -0,0 +1,71 @@
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from components import kakao_map as km
+
+
+@pytest.fixture
+def component(monkeypatch):
+    """세션 상태를 dict로, 컴포넌트를 호출 인자 기록으로 바꾼다"""
+    calls = []
+    monkeypatch.setattr(km, 'st', types.SimpleNamespace(session_state={}))
+    monkeypatch.setattr(km, '_kakao_map_component', lambda **kwargs: calls.append(kwargs))
+    return calls
+
+
+def _shops(ids):
+    ids = np.asarray(ids)
+    return pd.DataFrame({
+        'store_name': [f'가게{i}' for i in ids],
+        'industry_code': ['학원' if i % 2 else '숙박' for i in ids],
+        'full_address': [f'서울특별시 성동구 왕십리로 {i}' for i in ids],
+        'latitude': 37.5 + ids * 1e-4,
+        'longitude': 127.0 + ids * 1e-4,
+    }, index=ids)
+
+
+def _render(df, request=None):
+    if request is not None:
+        km.st.session_state['kakao_map'] = request
+    km.kakao_map(df, 37.5, 127.0, 5.0, 'key')
+
+
+def test_marker_payload_has_no_names_or_addresses():
+    payload = km.build_marker_payload(_shops([3, 1, 2]))
+    assert set(payload) == {'id', 'scale', 'lat0', 'lng0', 'lat', 'lng', 'industries', 'industry'}
+    assert payload['id'] == [3, 1, 2]
+    assert [payload['industries'][code] for code in payload['industry']] == ['학원', '학원', '숙박']
+
+
+def test_deltas_follow_result_changes(component):
+    _render(_shops(range(5)))
+    first = component[-1]
+    assert first['base_version'] is None and first['delta']['add']['id'] == [0, 1, 2, 3, 4]
+
+    _render(_shops(range(3, 8)))
+    second = component[-1]
+    assert second['base_version'] == first['version'] and second['version'] == first['version'] + 1
+    assert second['delta']['add']['id'] == [5, 6, 7]
+    assert second['delta']['remove'] == [0, 1, 2]
+
+
+def test_popup_detail_is_sent_once_per_request(component):
+    df = _shops(range(5))
+    _render(df)
+    version = component[-1]['version']
+
+    _render(df, {'resync': None, 'version': version, 'detail': {'id': 3, 'seq': 'a:1'}})
+    reply = component[-1]
+    assert reply['detail'] == {'id': 3, 'name': '가게3', 'address': '서울특별시 성동구 왕십리로 3'}
+    # 상세 요청은 변경분이 아니므로 버전이 그대로이고 전체 데이터를 다시 보내지 않는다
+    assert reply['version'] == version and reply['delta'] == {}
+
+    # 컴포넌트 값은 재실행 사이에 남아 있으므로 같은 요청에는 다시 응답하지 않는다
+    _render(df)
+    assert component[-1]['detail'] is None
+
+    _render(_shops(range(10, 12)), {'resync': None, 'version': version, 'detail': {'id': 4, 'seq': 'a:2'}})
+    assert component[-1]['detail'] == {'id': 4, 'name': None, 'address': None}
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import entropy
+
+from analysis.main_analysis import compute_analysis_stats
+from utils.shop_cache import compact_shop_dtypes
+
+
+def _reference_stats(df):
+    """행렬로 바꾸기 전의 pandas 구현 (value_counts/pivot_table/groupby)"""
+    df = df.rename(columns={'district': '자치구', 'industry_code': '업종명'})
+    df = df.astype({'자치구': str, '업종명': str})
+    seoul = df[df['자치구'] != '기타']
+
+    def diversity(series):
+        counts = series.value_counts()
+        return entropy(counts / counts.sum(), base=2)
+
+    df['의료여부'] = df['업종명'].apply(lambda x: x == '보건/복지')
+    medical_ratio = df[df['자치구'] != '기타'].groupby('자치구')['의료여부'].mean() * 100
+    df_food = df[df['업종명'] == '음식점/식음료업']
+    food_ratio = df_food['자치구'].value_counts() / df['자치구'].value_counts() * 100
+    return {
+        'total': len(df),
+        'district_count': df['자치구'].nunique(),
+        'industry_count': df['업종명'].nunique(),
+        'top_industries': df['업종명'].value_counts(),
+        'heatmap_data': seoul.pivot_table(index='자치구', columns='업종명', aggfunc='size', fill_value=0),
+        'entropy': seoul.groupby('자치구')['업종명'].apply(diversity).sort_values(ascending=False),
+        'district_counts': seoul['자치구'].value_counts(),
+        'food_ratio': food_ratio.dropna().sort_values(ascending=False),
+        'medical_ratio': medical_ratio.sort_values(ascending=False),
+    }
+
+
+def _object_index(obj):
+    """인덱스 dtype(object/str)만 다른 것은 같은 결과로 본다"""
+    obj = obj.copy()
+    obj.index = obj.index.astype(object)
+    if isinstance(obj, pd.DataFrame):
+        obj.columns = obj.columns.astype(object)
+    return obj
+
+
+def _shops(n, seed, with_missing=False):
+    rng = np.random.default_rng(seed)
+    districts = np.array(['성동구', '중구', '강남구', '마포구', '기타'])
+    industries = np.array(['음식점/식음료업', '보건/복지', '학원', '기타', '숙박'], dtype=object)
+    df = pd.DataFrame({
+        'store_name': [f'매장{i}' for i in range(n)],
+        'industry_code': industries[rng.integers(0, len(industries), n)],
+        'district': districts[rng.integers(0, len(districts), n)],
+        'latitude': np.full(n, 37.5),
+        'longitude': np.full(n, 127.0),
+    })
+    if with_missing:
+        df.loc[rng.choice(n, 3, replace=False), 'industry_code'] = np.nan
+    return df
+
+
+@pytest.mark.parametrize('n, seed, with_missing', [(60, 0, False), (500, 1, False), (5000, 2, False), (500, 3, True)])
+@pytest.mark.parametrize('categorical', [False, True])
+def test_matches_pandas_reference(n, seed, with_missing, categorical):
+    df = _shops(n, seed, with_missing)
+    if categorical:
+        df = compact_shop_dtypes(df)
+    expected, actual = _reference_stats(df), compute_analysis_stats(df)
+
+    assert actual.keys() == expected.keys()
+    for key in ('total', 'district_count', 'industry_count'):
+        assert actual[key] == expected[key]
+    pd.testing.assert_frame_equal(_object_index(actual['heatmap_data']), _object_index(expected['heatmap_data']),
+                                  check_exact=True)
+    for key in ('top_industries', 'entropy', 'district_counts', 'food_ratio', 'medical_ratio'):
+        pd.testing.assert_series_equal(_object_index(actual[key]), _object_index(expected[key]), obj=key,
+                                       check_exact=True)
@@ -0,0 +1,151 @@
+import csv
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import config
+from utils.preprocessing import DataLoadError, _line_ranges, load_shops, read_shops_csv, stream_shops_to_cache
+from utils.shop_cache import read_cached_shops
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _write_shops(path, n, seed=0, encoding='utf-8', extra_rows=()):
+    """원본 형식(모든 값을 따옴표로 감싼 CSV)의 매장 파일 생성 (extra_rows는 끝에 그대로 붙인다)"""
+    rng = np.random.default_rng(seed)
+    districts = np.array(['성동구', '중구', '강남구', '마포구'])
+    df = pd.DataFrame({
+        '이름': [f'가게{i}' for i in range(n)],
+        '서울페이업종코드': rng.choice(['음식점/식음료업', '학원', '기타'], n),
+        '주소': [f'서울특별시 {d} 왕십리로 {i}' for i, d in enumerate(districts[rng.integers(0, 4, n)])],
+        '상세주소': np.where(rng.random(n) < 0.5, '2층', ''),
+        '위도': rng.uniform(37.4, 37.7, n).round(6),
+        '경도': rng.uniform(126.8, 127.2, n).round(6),
+        '비고': 'x' * 40,
+    })
+    with open(path, 'w', encoding=encoding, newline='') as f:
+        df.to_csv(f, index=False, quoting=csv.QUOTE_ALL)
+        f.write(''.join(extra_rows))
+    return path
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'CACHE_DIR', str(tmp_path / 'cache'))
+
+
+@pytest.mark.parametrize('encoding', ['utf-8', 'cp949'])
+def test_streamed_cache_matches_single_read(tmp_path, encoding):
+    path = _write_shops(tmp_path / f'shops.{encoding}.csv', 5000, encoding=encoding, extra_rows=[
+        '"줄\n바꿈 가게","기타","서울특별시 성동구 왕십리로 1","2층\n안쪽","37.5","127.0","x"\n',
+        '"좌표 오류","기타","서울특별시 중구 세종대로 1","","abc","127.0","x"\n',
+        '"빈 좌표","학원","서울특별시 중구 세종대로 2","","","","x"\n',
+        # 마지막 청크에서 처음 나오는 업종 (캐시에는 사전 증분으로 기록된다)
+        '"늦은 업종","숙박","서울시 마포구 독막로 3","","37.55","126.9","x"\n',
+    ])
+    expected = read_shops_csv(str(path), workers=1)
+    stream_shops_to_cache(str(path), chunk_rows=700)
+    streamed = read_cached_shops(str(path))
+
+    pd.testing.assert_frame_equal(streamed, expected)
+    assert len(streamed) == 5002
+    assert '숙박' in streamed['industry_code'].cat.categories
+    assert '\n' in streamed['store_name'].iloc[5000]
+
+
+def test_parallel_read_keeps_multiline_fields_across_chunk_boundaries(tmp_path):
+    base = _write_shops(tmp_path / 'base.csv', 120).read_text(encoding='utf-8').splitlines(keepends=True)
+    memo = '\n'.join(f'메모 {i} ""따옴표"" 포함' for i in range(2000))
+
+    def long_row(name):
+        return f'"{name}","기타","서울특별시 성동구 왕십리로 1","{memo}","37.5","127.0","x"\n'
+
+    # 세 조각으로 나눌 때 1/3, 2/3 지점이 각각 여러 줄 필드 안에 들어가도록 배치한다
+    path = tmp_path / 'shops.csv'
+    path.write_text(''.join(base[:41] + [long_row('긴 메모 1')] + base[41:81] + [long_row('긴 메모 2')] + base[81:]),
+                    encoding='utf-8')
+    size = os.path.getsize(path)
+    start = len(base[0].encode())
+    first, second = len(''.join(base[:41]).encode()), size - len(''.join(base[81:]).encode())
+    assert first < start + (size - start) // 3 < first + len(long_row('긴 메모 1').encode())
+    assert second - len(long_row('긴 메모 2').encode()) < start + (size - start) * 2 // 3 < second
+
+    ranges = _line_ranges(str(path), start, 3)
+    assert len(ranges) == 3
+    data = path.read_bytes()
+    for begin, end in ranges:
+        assert data[begin:end].count(b'"') % 2 == 0 and data[end - 2:end] == b'"\n'
+
+    parallel = read_shops_csv(str(path), workers=3, chunk_bytes=size // 2)
+    pd.testing.assert_frame_equal(parallel, read_shops_csv(str(path), workers=1))
+    assert len(parallel) == 122
+    assert parallel['detail_address'].str.count('\n').max() == 1999
+
+
+def test_load_shops_streams_large_files(tmp_path, monkeypatch):
+    path = str(_write_shops(tmp_path / 'shops.csv', 3000))
+    monkeypatch.setattr(config, 'PREPROCESS_STREAM_MIN_BYTES', 1)
+    monkeypatch.setattr(config, 'PREPROCESS_STREAM_CHUNK_ROWS', 1000)
+    streamed = load_shops(path)
+    pd.testing.assert_frame_equal(streamed, read_shops_csv(path, workers=1))
+    assert not [name for name in os.listdir(config.CACHE_DIR) if name.endswith('.tmp')]
+
+
+def test_streaming_errors(tmp_path):
+    header_only = tmp_path / 'header.csv'
+    header_only.write_text('"이름","서울페이업종코드","주소","상세주소","위도","경도"\n', encoding='utf-8')
+    with pytest.raises(DataLoadError, match='위도/경도'):
+        stream_shops_to_cache(str(header_only))
+    missing = tmp_path / 'missing.csv'
+    missing.write_text('"이름","서울페이업종코드","주소","상세주소","위도","lng"\n"a","b","c","","37","127"\n',
+                       encoding='utf-8')
+    with pytest.raises(DataLoadError, match='경도'):
+        stream_shops_to_cache(str(missing))
+    assert read_cached_shops(str(header_only)) is None
+    assert not os.listdir(config.CACHE_DIR)
+
+
+# ru_maxrss는 부모 프로세스 값을 물려받으므로 exec 후 새로 시작하는 VmHWM(최대 RSS)을 읽는다
+_PEAK_SCRIPT = """
+import json, re, sys
+sys.path.insert(0, sys.argv[1])
+import config
+config.CACHE_DIR = sys.argv[3]
+from utils.preprocessing import read_shops_csv, stream_shops_to_cache
+
+def peak():
+    with open('/proc/self/status') as f:
+        return int(re.search(r'VmHWM:\\s+(\\d+)', f.read()).group(1)) * 1024
+
+before = peak()
+if sys.argv[4] == 'stream':
+    stream_shops_to_cache(sys.argv[2], chunk_rows=10000)
+else:
+    read_shops_csv(sys.argv[2], workers=1)
+print(json.dumps(peak() - before))
+"""
+
+
+def _peak_growth(path, cache_dir, mode):
+    """새 프로세스에서 전처리하는 동안 늘어난 최대 RSS (바이트)"""
+    out = subprocess.run([sys.executable, '-c', _PEAK_SCRIPT, ROOT, str(path), str(cache_dir), mode],
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/status'), reason='VmHWM은 Linux에서만 읽을 수 있다')
+def test_streaming_peak_memory_does_not_grow_with_file_size(tmp_path):
+    small = _write_shops(tmp_path / 'small.csv', 50_000)
+    large = _write_shops(tmp_path / 'large.csv', 250_000, seed=1)
+    stream_small = _peak_growth(small, tmp_path / 'c1', 'stream')
+    stream_large = _peak_growth(large, tmp_path / 'c2', 'stream')
+    full_large = _peak_growth(large, tmp_path / 'c3', 'full')
+
+    # 파일이 5배(약 30MB 늘어남)여도 스트리밍의 최대 메모리는 청크 크기만큼으로 거의 같다
+    assert stream_large - stream_small < 16 * 1024 * 1024
+    assert stream_large < full_large / 2
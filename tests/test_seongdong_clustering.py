@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis import seongdong_analysis_core as core
+from analysis.seongdong_analysis_core import merge_dong_population, perform_kmeans_clustering
+
+FEATURES = ['총인구수', '남자인구수', '여자인구수', '5세이하인구수', '65세이상인구수']
+
+
+@pytest.fixture
+def fits(monkeypatch):
+    """캐시를 비우고 실제 학습 횟수와 초기 중심을 기록"""
+    core._fit_clusters.clear()
+    calls = []
+
+    class CountingMiniBatch(core.MiniBatchKMeans):
+        def fit_predict(self, X, *args, **kwargs):
+            calls.append(('minibatch', None if isinstance(self.init, str) else np.array(self.init)))
+            return super().fit_predict(X, *args, **kwargs)
+
+    class CountingKMeans(core.KMeans):
+        def fit_predict(self, X, *args, **kwargs):
+            calls.append(('kmeans', None))
+            return super().fit_predict(X, *args, **kwargs)
+
+    monkeypatch.setattr(core, 'MiniBatchKMeans', CountingMiniBatch)
+    monkeypatch.setattr(core, 'KMeans', CountingKMeans)
+    yield calls
+    core._fit_clusters.clear()
+
+
+def _frames(seed=0, n_dongs=17):
+    rng = np.random.default_rng(seed)
+    # 인구 규모가 뚜렷이 다른 네 무리의 동
+    scale = np.repeat([8000, 20000, 35000, 50000], -(-n_dongs // 4))[:n_dongs] * (1 + rng.random(n_dongs) * 0.05)
+    pop_df = pd.DataFrame({
+        '행정기관': [f'동{i}' for i in range(n_dongs)],
+        '총인구수': scale,
+        '남자인구수': scale * 0.48,
+        '여자인구수': scale * 0.52,
+        '5세이하인구수': scale * (0.03 + rng.random(n_dongs) * 0.01),
+        '65세이상인구수': scale * (0.15 + rng.random(n_dongs) * 0.02),
+    })
+    shop_df = pd.DataFrame({'dong': rng.choice(pop_df['행정기관'], 300)})
+    return pop_df, shop_df, merge_dong_population(shop_df, pop_df)
+
+
+@pytest.mark.parametrize('method', ['kmeans', 'minibatch'])
+def test_rerun_with_unchanged_data_does_not_refit(fits, method):
+    pop_df, shop_df, merged_df = _frames()
+    warm_start = {}
+    first = perform_kmeans_clustering(pop_df, shop_df, merged_df, method=method, warm_start=warm_start)
+    assert len(fits) == 1
+
+    for _ in range(3):
+        again = perform_kmeans_clustering(pop_df, shop_df, merged_df, method=method, warm_start=warm_start)
+        pd.testing.assert_frame_equal(again['pop_df_clustered'], first['pop_df_clustered'])
+    assert len(fits) == 1
+
+    # 다른 세션(빈 warm_start)도 같은 데이터면 캐시된 결과를 쓴다
+    perform_kmeans_clustering(pop_df, shop_df, merged_df, method=method, warm_start={})
+    assert len(fits) == 1
+
+
+def test_minibatch_warm_start_keeps_labels_stable(fits):
+    pop_df, shop_df, merged_df = _frames()
+    warm_start = {}
+    first = perform_kmeans_clustering(pop_df, shop_df, merged_df, method='minibatch', warm_start=warm_start)
+    (state,) = warm_start.values()
+    first_centers = state['centers']
+
+    # 한 동의 인구가 조금 바뀌면 직전 군집 중심에서 다시 학습하고 군집 번호가 유지된다
+    changed = pop_df.copy()
+    changed.loc[3, FEATURES] *= 1.01
+    second = perform_kmeans_clustering(changed, shop_df, merge_dong_population(shop_df, changed),
+                                       method='minibatch', warm_start=warm_start)
+    assert len(fits) == 2
+    scaler = core.StandardScaler().fit(changed[FEATURES].to_numpy())
+    np.testing.assert_allclose(fits[1][1], scaler.transform(first_centers))
+    np.testing.assert_array_equal(second['pop_df_clustered']['군집'], first['pop_df_clustered']['군집'])
+
+    # 바뀐 데이터로 다시 실행하면 같은 초기 중심을 넘기므로 다시 학습하지 않는다
+    perform_kmeans_clustering(changed, shop_df, merge_dong_population(shop_df, changed), method='minibatch',
+                              warm_start=warm_start)
+    assert len(fits) == 2
+
+
+def test_sessions_do_not_share_warm_start(fits):
+    pop_df, shop_df, merged_df = _frames()
+    changed = pop_df.copy()
+    changed.loc[3, FEATURES] *= 1.01
+    session_a, session_b = {}, {}
+
+    perform_kmeans_clustering(pop_df, shop_df, merged_df, method='minibatch', warm_start=session_a)
+    # B는 처음 보는 데이터로 시작하므로 A의 군집 중심을 쓰지 않는다
+    perform_kmeans_clustering(changed, shop_df, merge_dong_population(shop_df, changed), method='minibatch',
+                              warm_start=session_b)
+    assert [init is None for _, init in fits] == [True, True]
@@ -0,0 +1,106 @@
+import pandas as pd
+import pytest
+
+from analysis.seongdong_analysis_core import dong_centroids
+from services import seongdong_enrichment as enrichment
+from utils import seongdong_analysis_utils as utils
+
+TABLE = {
+    '서울 성동구 상원길 23': (37.5450, 127.0560),
+    '서울 성동구 독서당로294': (37.5480, 127.0200),
+    '서울 성동구 왕십리로 10': (37.5440, 127.0450),
+}
+
+
+def _geocoder(table):
+    """lookup_geocoder에 넘어간 검색어를 호출마다 기록"""
+    lookup = enrichment.lookup_geocoder(table)
+    calls = []
+
+    def geocoder(queries):
+        calls.append(list(queries))
+        return lookup(queries)
+
+    return geocoder, calls
+
+
+@pytest.fixture
+def shops_csv(tmp_path):
+    path = tmp_path / 'shops.csv'
+    pd.DataFrame({
+        'store_name': ['가게1', '가게2', '가게3', '가게4', '가게5'],
+        'dong': ['성수동1가', '금호동4가', '금호동4가', '성수동1가', '행당동'],
+        'address': [
+            '서울 성동구 상원길 23(성수동1가)',
+            '서울 성동구 독서당로294, 2층 (금호동4가)',
+            '서울 성동구 독서당로294, 3층 (금호동4가)',
+            '서울 성동구 왕십리로 10',
+            '서울 성동구 없는로 1',
+        ],
+    }).to_csv(path, index=False, encoding='utf-8-sig')
+    return str(path)
+
+
+def test_geocode_query_drops_floor_and_legal_dong():
+    assert enrichment.geocode_query('서울 성동구 독서당로294, 2층 (금호동4가)') == '서울 성동구 독서당로294'
+    assert enrichment.geocode_query('서울 성동구 상원길 23(성수동1가)') == '서울 성동구 상원길 23'
+
+
+def test_enrich_writes_sidecar_and_skips_known_addresses(shops_csv):
+    geocoder, calls = _geocoder(TABLE)
+    stats = enrichment.enrich_seongdong_shops(shops_csv, geocoder)
+
+    # 같은 검색어로 바뀌는 두 주소(2층/3층)는 한 번만 요청한다
+    assert sorted(calls[0]) == sorted(list(TABLE) + ['서울 성동구 없는로 1'])
+    assert stats == {'addresses': 5, 'requested': 4, 'geocoded': 4, 'missing': 1}
+    coords = enrichment.load_shop_coords(shops_csv)
+    assert coords.loc['서울 성동구 독서당로294, 3층 (금호동4가)'].tolist() == list(TABLE['서울 성동구 독서당로294'])
+    assert coords.loc['서울 성동구 없는로 1'].isna().all()
+
+    # 두 번째 실행은 찾지 못한 주소도 이미 기록되어 있으므로 요청하지 않는다
+    again = enrichment.enrich_seongdong_shops(shops_csv, geocoder)
+    assert len(calls) == 1
+    assert again == {'addresses': 5, 'requested': 0, 'geocoded': 0, 'missing': 1}
+    pd.testing.assert_frame_equal(enrichment.load_shop_coords(shops_csv), coords)
+
+
+def test_retry_missing_requests_only_missing_addresses(shops_csv):
+    geocoder, calls = _geocoder(TABLE)
+    enrichment.enrich_seongdong_shops(shops_csv, geocoder)
+
+    retry, retry_calls = _geocoder({**TABLE, '서울 성동구 없는로 1': (37.5600, 127.0400)})
+    stats = enrichment.enrich_seongdong_shops(shops_csv, retry, retry_missing=True)
+    assert retry_calls == [['서울 성동구 없는로 1']]
+    assert stats == {'addresses': 5, 'requested': 1, 'geocoded': 1, 'missing': 0}
+    assert enrichment.load_shop_coords(shops_csv).loc['서울 성동구 없는로 1'].tolist() == [37.56, 127.04]
+
+
+def test_sidecar_joins_into_merge_and_centroids(shops_csv, monkeypatch):
+    enrichment.enrich_seongdong_shops(shops_csv, enrichment.lookup_geocoder(TABLE))
+    population = pd.DataFrame({
+        '총인구수': [30000, 25000, 40000],
+        '남자인구수': [14000, 12000, 19000],
+        '여자인구수': [16000, 13000, 21000],
+    }, index=pd.Index(['성수1가제1동', '금호4가동', '행당제1동'], name='행정기관'))
+    monkeypatch.setattr(utils, 'seongdong_population', lambda: population)
+    utils._load_and_merge.clear()
+
+    shop_df, pop_df, merged_df = utils._load_and_merge(
+        utils._file_fingerprint(shops_csv), ('population',), utils._file_fingerprint(enrichment.coords_path(shops_csv)))
+    utils._load_and_merge.clear()
+
+    assert shop_df[['latitude', 'longitude']].notna().sum().tolist() == [4, 4]
+    assert shop_df.loc[4, ['latitude', 'longitude']].isna().all()
+
+    centroids = dong_centroids(shop_df)
+    assert centroids.loc['성수동1가', 'latitude'] == pytest.approx((37.5450 + 37.5440) / 2)
+    assert centroids.loc['금호동4가', 'longitude'] == pytest.approx(127.0200)
+    assert centroids.loc['금호동4가', '좌표매장수'] == 2
+    # 좌표를 찾지 못한 매장만 있는 동은 중심이 없다
+    assert '행당동' not in centroids.dropna().index
+
+    layers = {type(child).__name__: child for child in utils.create_folium_map(merged_df, shop_df)._children.values()}
+    assert len(layers['HeatMap'].data) == 4
+    markers = {feature['properties']['dong']: feature['geometry']['coordinates']
+               for feature in layers['GeoJson'].data['features']}
+    assert markers['성수동1가'] == pytest.approx([centroids.loc['성수동1가', 'longitude'], centroids.loc['성수동1가', 'latitude']])
@@ -0,0 +1,197 @@
+import html
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+import pytest
+
+from services.seongdong_scraper import crawl_shops_seongdong, load_crawl_manifest, parse_shop_rows
+
+
+def _page_html(rows):
+    cells = ''.join(
+        '<tr>' + ''.join(f'<th>{html.escape(value)}</th>' for value in row) + '</tr>'
+        for row in rows
+    )
+    # 칸이 모자란 행(안내 문구 등)은 건너뛰어야 한다
+    return f'<html><body><table class="table"><tbody><tr><th>안내</th></tr>{cells}</tbody></table></body></html>'
+
+
+class _ListHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        site = self.server.site
+        page = int(parse_qs(urlsplit(self.path).query)['pageIndex'][0])
+        with site.lock:
+            site.requests.append(page)
+            failing = site.failures.get(page, 0) > 0
+            if failing:
+                site.failures[page] -= 1
+        time.sleep(site.latency)
+        status, body = (500, b'error') if failing else (200, _page_html(site.pages.get(page, [])).encode())
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ListSite:
+    """성동구청 가맹점 목록 페이지를 흉내 내는 로컬 서버 (failures: 페이지별 남은 500 응답 횟수)"""
+
+    def __init__(self, n_pages, rows_per_page=10):
+        self.rows_per_page = rows_per_page
+        self.pages = {
+            page: [(f'가게{page}-{i}', '성수동1가', f'서울 성동구 상원길 {page * 100 + i}(성수동1가)')
+                   for i in range(rows_per_page)]
+            for page in range(1, n_pages + 1)
+        }
+        self.failures = {}
+        self.latency = 0.0
+        self.requests = []
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _ListHandler)
+        self.server.daemon_threads = True
+        self.server.site = self
+        self.url = f'http://127.0.0.1:{self.server.server_port}/list.do?key=5269&pageIndex={{}}'
+
+    def rows(self):
+        return [row for page in sorted(self.pages) for row in self.pages[page]]
+
+    def set_rows(self, rows):
+        """목록 전체를 바꾼다 (실제 사이트처럼 앞에서부터 페이지 크기로 다시 나눈다)"""
+        n = self.rows_per_page
+        self.pages = {i // n + 1: rows[i:i + n] for i in range(0, len(rows), n)}
+
+    def frame(self):
+        return pd.DataFrame(self.rows(), columns=['store_name', 'dong', 'address'])
+
+
+@pytest.fixture
+def list_site():
+    site = ListSite(n_pages=6)
+    thread = threading.Thread(target=site.server.serve_forever, daemon=True)
+    thread.start()
+    yield site
+    site.server.shutdown()
+    site.server.server_close()
+
+
+def test_parse_shop_rows_reads_th_cells():
+    rows = parse_shop_rows(_page_html([('가게', '성수동1가', '서울 성동구 상원길 23')]))
+    assert rows == [{'store_name': '가게', 'dong': '성수동1가', 'address': '서울 성동구 상원길 23'}]
+
+
+def test_crawl_resumes_from_page_checkpoints(list_site, tmp_path):
+    output_path = str(tmp_path / 'shops_seongdong.csv')
+    list_site.failures = {4: 1}
+    partial = crawl_shops_seongdong(output_path, max_pages=6, base_url=list_site.url, rate_limit=0)
+    assert len(partial) == 50
+    assert not os.path.exists(output_path)
+    assert len(os.listdir(output_path + '.pages')) == 5
+
+    list_site.requests.clear()
+    df = crawl_shops_seongdong(output_path, max_pages=6, base_url=list_site.url, rate_limit=0)
+    assert list_site.requests == [4]
+    pd.testing.assert_frame_equal(df, list_site.frame())
+    pd.testing.assert_frame_equal(pd.read_csv(output_path, encoding='utf-8-sig'), list_site.frame())
+    assert not os.path.exists(output_path + '.pages')
+
+
+def test_crawl_fetches_pages_concurrently(list_site, tmp_path):
+    list_site.latency = 0.2
+    started = time.perf_counter()
+    df = crawl_shops_seongdong(str(tmp_path / 'shops.csv'), max_pages=6, base_url=list_site.url, max_workers=4,
+                               rate_limit=0)
+    elapsed = time.perf_counter() - started
+    assert len(df) == 60
+    # 순서대로 가져오면 6 × 0.2초, 4개씩 동시에 가져오면 2번의 왕복
+    assert elapsed < 0.2 * 6 * 0.75
+
+
+def _read_csv(path):
+    return pd.read_csv(path, dtype=str, keep_default_na=False, encoding='utf-8-sig')
+
+
+def _incremental(site, output_path):
+    site.requests.clear()
+    return crawl_shops_seongdong(output_path, max_pages=10, base_url=site.url, rate_limit=0, incremental=True)
+
+
+@pytest.fixture
+def crawled(list_site, tmp_path):
+    output_path = str(tmp_path / 'shops_seongdong.csv')
+    crawl_shops_seongdong(output_path, max_pages=10, base_url=list_site.url, rate_limit=0)
+    assert load_crawl_manifest(output_path)['mode'] == 'full'
+    return output_path
+
+
+def test_incremental_without_changes_stops_at_first_page(list_site, crawled):
+    before = open(crawled, 'rb').read()
+    df = _incremental(list_site, crawled)
+    assert list_site.requests == [1]
+    assert open(crawled, 'rb').read() == before
+    pd.testing.assert_frame_equal(df, list_site.frame(), check_dtype=False)
+    assert load_crawl_manifest(crawled)['last_run'] == {'pages_fetched': 1, 'inserted': 0, 'deleted': 0}
+
+
+@pytest.mark.parametrize('change', ['insert', 'delete', 'replace'])
+def test_incremental_merges_first_page_changes(list_site, crawled, change):
+    rows = list_site.rows()
+    new = ('새가게', '왕십리도선동', '서울 성동구 왕십리로 1(행당동)')
+    if change == 'insert':
+        rows.insert(0, new)
+    elif change == 'delete':
+        del rows[3]
+    else:
+        rows[3] = new
+    list_site.set_rows(rows)
+
+    _incremental(list_site, crawled)
+    pd.testing.assert_frame_equal(_read_csv(crawled), list_site.frame())
+    if change == 'replace':
+        # 행 수가 그대로면 2페이지부터 같으므로 1페이지 뒤 첫 묶음(2~3페이지)에서 멈춘다
+        assert sorted(list_site.requests) == [1, 2, 3]
+    stats = load_crawl_manifest(crawled)['last_run']
+    assert (stats['inserted'], stats['deleted']) == {'insert': (1, 0), 'delete': (0, 1), 'replace': (1, 1)}[change]
+
+    # 반영한 뒤에는 다시 바뀐 것이 없다
+    _incremental(list_site, crawled)
+    assert list_site.requests == [1]
+
+
+def test_incremental_keeps_duplicate_keys_on_unchanged_pages(list_site, tmp_path):
+    # 같은 (상호명, 주소)가 1페이지에 두 번, 3페이지에 한 번 있는 체인점
+    dup = ('같은가게', '성수동2가', '서울 성동구 성수이로 1(성수동2가)')
+    rows = list_site.rows()
+    rows[1], rows[2], rows[25] = dup, dup, dup
+    list_site.set_rows(rows)
+    output_path = str(tmp_path / 'shops_seongdong.csv')
+    crawl_shops_seongdong(output_path, max_pages=10, base_url=list_site.url, rate_limit=0)
+
+    # 1페이지의 중복 한 개가 다른 가게로 바뀐다
+    rows[2] = ('새가게', '행당1동', '서울 성동구 행당로 1(행당동)')
+    list_site.set_rows(rows)
+    _incremental(list_site, output_path)
+
+    merged = _read_csv(output_path)
+    pd.testing.assert_frame_equal(merged, list_site.frame())
+    assert (merged['store_name'] == '같은가게').sum() == 2
+    assert sorted(list_site.requests) == [1, 2, 3]
+
+
+def test_incremental_without_manifest_runs_full_crawl(list_site, tmp_path):
+    output_path = str(tmp_path / 'shops_seongdong.csv')
+    list_site.frame().iloc[:5].to_csv(output_path, index=False, encoding='utf-8-sig')
+    df = _incremental(list_site, output_path)
+    pd.testing.assert_frame_equal(df, list_site.frame(), check_dtype=False)
+    assert load_crawl_manifest(output_path)['mode'] == 'full'
+    _incremental(list_site, output_path)
+    assert list_site.requests == [1]
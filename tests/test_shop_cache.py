@@ -0,0 +1,73 @@
+import os
+
+import pandas as pd
+import pytest
+
+import config
+from utils import shop_cache
+from utils.shop_cache import compact_shop_dtypes, read_cached_shops, write_cached_shops
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'CACHE_DIR', str(tmp_path / 'cache'))
+    return tmp_path / 'cache'
+
+
+def _shops(name):
+    return compact_shop_dtypes(pd.DataFrame({
+        'store_name': [name, f'{name} 2호점'],
+        'industry_code': ['학원', '숙박'],
+        'address': ['서울특별시 성동구 왕십리로 1', '서울특별시 중구 세종대로 2'],
+        'detail_address': ['1층', ''],
+        'latitude': [37.56, 37.57],
+        'longitude': [127.03, 126.98],
+        'district': ['성동구', '중구'],
+    }))
+
+
+def _csv(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_round_trip_and_invalidation(tmp_path, cache_dir):
+    csv_path = _csv(tmp_path / 'shops.csv', 'a')
+    df = _shops('가게')
+    write_cached_shops(csv_path, df)
+    pd.testing.assert_frame_equal(read_cached_shops(csv_path), df)
+
+    # 내용이 같으면 mtime만 바뀌어도 유효, 내용이 바뀌면 무효
+    os.utime(csv_path, ns=(1, 1))
+    pd.testing.assert_frame_equal(read_cached_shops(csv_path), df)
+    _csv(tmp_path / 'shops.csv', 'b')
+    assert read_cached_shops(csv_path) is None
+
+
+def test_same_basename_in_different_directories(tmp_path, cache_dir):
+    first = _csv(tmp_path / 'a' / 'shops.csv', 'same')
+    second = _csv(tmp_path / 'b' / 'shops.csv', 'same')
+    write_cached_shops(first, _shops('첫째'))
+    assert read_cached_shops(second) is None
+
+    write_cached_shops(second, _shops('둘째'))
+    assert read_cached_shops(first)['store_name'][0] == '첫째'
+    assert read_cached_shops(second)['store_name'][0] == '둘째'
+
+
+def test_failed_write_keeps_previous_cache(tmp_path, cache_dir, monkeypatch):
+    csv_path = _csv(tmp_path / 'shops.csv', 'a')
+    df = _shops('가게')
+    write_cached_shops(csv_path, df)
+
+    def crash(table, path, **kwargs):
+        with open(path, 'wb') as f:
+            f.write(b'ARROW1\x00\x00 truncated')
+        raise OSError('disk full')
+
+    monkeypatch.setattr(shop_cache.feather, 'write_feather', crash)
+    write_cached_shops(csv_path, _shops('새 가게'))
+
+    pd.testing.assert_frame_equal(read_cached_shops(csv_path), df)
+    assert not [name for name in os.listdir(cache_dir) if name.endswith('.tmp')]
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.shop_cache import compact_shop_dtypes
+from utils.shop_store import ShopStore
+
+
+@pytest.fixture
+def shops_df():
+    n = 40
+    rng = np.random.default_rng(0)
+    districts = np.array(['성동구', '중구', '강남구', '기타'])
+    industries = np.array(['기타', '음식점/식음료업', '학원'], dtype=object)
+    df = pd.DataFrame({
+        'store_name': [f'매장{i}' for i in range(n)],
+        'industry_code': industries[rng.integers(0, 3, n)],
+        'address': [f'서울특별시 성동구 왕십리로 {i}' for i in range(n)],
+        'detail_address': [None if i % 3 else f'{i}층' for i in range(n)],
+        'latitude': rng.uniform(37.4, 37.7, n),
+        'longitude': rng.uniform(126.8, 127.2, n),
+        'district': districts[rng.integers(0, 4, n)],
+    })
+    df.loc[5, 'industry_code'] = np.nan
+    return compact_shop_dtypes(df)
+
+
+def test_frame_matches_iloc_with_row_positions_as_index(shops_df):
+    store = ShopStore.from_frame(shops_df)
+    for positions in (np.array([7, 8, 9]), np.array([30, 2, 5, 0]), np.array([], dtype=np.int64)):
+        frame = store.frame(positions)
+        assert frame.index.tolist() == positions.tolist()
+        pd.testing.assert_frame_equal(frame, shops_df.iloc[positions], check_index_type=False)
+
+
+def test_full_frame_and_columns(shops_df):
+    store = ShopStore.from_frame(shops_df)
+    assert len(store) == len(shops_df)
+    pd.testing.assert_frame_equal(store.frame(), shops_df)
+    pd.testing.assert_frame_equal(store.frame(columns=['district', 'industry_code']),
+                                  shops_df[['district', 'industry_code']])
+
+
+def test_codes_are_compact_and_mark_missing(shops_df):
+    store = ShopStore.from_frame(shops_df)
+    assert store.codes('district').dtype == np.uint8
+    assert store.latitude.dtype == np.float32
+    categories = store.categories('industry_code')
+    assert store.codes('industry_code')[5] == len(categories)
+    assert store.nbytes > 0
+
+
+def test_marker_ids_follow_shops_between_results(shops_df):
+    from components.kakao_map import build_marker_payload
+    from utils.preprocessing import full_address
+
+    store = ShopStore.from_frame(shops_df)
+    first, second = store.frame(np.array([0, 1, 2])), store.frame(np.array([7, 8, 9]))
+    for frame in (first, second):
+        frame['full_address'] = full_address(frame)
+    assert build_marker_payload(first)['id'] == [0, 1, 2]
+    # 결과 크기가 같아도 다른 매장이면 id가 달라져 지도에 추가/삭제 변경분이 생긴다
+    assert build_marker_payload(second)['id'] == [7, 8, 9]
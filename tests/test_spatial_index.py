@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from utils.helpers import calculate_distances
+from utils.spatial_index import ShopSpatialIndex
+
+CENTER = (37.5458, 127.0409)
+
+
+def _points(n, seed):
+    rng = np.random.default_rng(seed)
+    lats = 37.43 + rng.random(n) * 0.25
+    lons = 126.8 + rng.random(n) * 0.4
+    # 같은 좌표의 매장(같은 건물)을 섞어 거리 동률의 순서도 확인한다
+    dup = rng.choice(n, n // 10, replace=False)
+    lats[dup], lons[dup] = lats[dup[0]], lons[dup[0]]
+    return lats, lons
+
+
+def _full_scan(lats, lons, lat, lon, radius_km):
+    distances = calculate_distances(lat, lon, lats, lons)
+    inside = np.flatnonzero(distances <= radius_km)
+    return inside, distances[inside]
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('radius_km', [0.3, 2.0, 5.0, 50.0])
+def test_query_radius_matches_full_scan(seed, radius_km):
+    lats, lons = _points(5000, seed)
+    index = ShopSpatialIndex(lats, lons)
+    for lat, lon in [CENTER, (lats[7], lons[7])]:
+        positions, distances = index.query_radius(lat, lon, radius_km)
+        expected_positions, expected_distances = _full_scan(lats, lons, lat, lon, radius_km)
+        np.testing.assert_array_equal(positions, expected_positions)
+        np.testing.assert_array_equal(distances, expected_distances)
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+@pytest.mark.parametrize('radius_km, k', [(2.0, 10), (5.0, 100), (5.0, 100000), (50.0, 1000), (0.01, 5)])
+def test_query_nearest_matches_full_scan(seed, radius_km, k):
+    lats, lons = _points(5000, seed)
+    index = ShopSpatialIndex(lats, lons)
+    for lat, lon in [CENTER, (lats[7], lons[7])]:
+        positions, distances = index.query_nearest(lat, lon, radius_km, k)
+        inside, inside_distances = _full_scan(lats, lons, lat, lon, radius_km)
+        order = np.argsort(inside_distances, kind='stable')[:k]
+        np.testing.assert_array_equal(positions, inside[order])
+        np.testing.assert_array_equal(distances, inside_distances[order])
+        assert len(positions) == min(k, len(inside))
+
+
+def test_empty_index():
+    index = ShopSpatialIndex([], [])
+    positions, distances = index.query_nearest(*CENTER, 5.0, 10)
+    assert len(positions) == 0 and len(distances) == 0
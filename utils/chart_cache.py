@@ -0,0 +1,119 @@
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import streamlit as st
+from PIL import Image
+
+import config
+
+
+def _fit_width(png, max_width):
+    """PNG가 max_width보다 넓으면 st.image와 같은 방식(BILINEAR)으로 미리 줄인다
+
+    st.image는 최대 폭보다 넓은 이미지를 표시할 때마다 디코딩/축소/재인코딩하므로,
+    캐시에 넣기 전에 한 번만 줄여 두면 재실행 때는 원본 바이트가 그대로 전달된다.
+    """
+    image = Image.open(io.BytesIO(png))
+    width, height = image.size
+    if width <= max_width:
+        return png
+    image = image.resize((max_width, int(1.0 * height * max_width / width)), resample=Image.BILINEAR)
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def figure_to_bytes(fig, fmt='png'):
+    """그림을 PNG/SVG 바이트로 저장하고 바로 닫는다 (st.pyplot과 같은 설정)"""
+    try:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt, dpi=200, bbox_inches='tight')
+    finally:
+        plt.close(fig)
+    if fmt == 'png':
+        return _fit_width(buffer.getvalue(), config.CHART_MAX_WIDTH_PX)
+    return buffer.getvalue()
+
+
+def data_fingerprint(data):
+    """차트에 쓰인 데이터(DataFrame, Series, 배열)의 SHA-1 해시"""
+    digest = hashlib.sha1()
+    if isinstance(data, pd.DataFrame):
+        digest.update(repr([(str(column), str(dtype)) for column, dtype in data.dtypes.items()]).encode())
+        digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    elif isinstance(data, pd.Series):
+        digest.update(repr((data.name, str(data.dtype))).encode())
+        digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    else:
+        values = np.asarray(data)
+        digest.update(repr((values.shape, str(values.dtype))).encode())
+        digest.update(np.ascontiguousarray(values).tobytes())
+    return digest.hexdigest()
+
+
+class ChartCache:
+    """렌더링된 차트 바이트를 저장하는 LRU 캐시 (전체 크기가 max_bytes를 넘으면 오래된 것부터 삭제)"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        with self._lock:
+            image = self._items.get(key)
+            if image is not None:
+                self._items.move_to_end(key)
+            return image
+
+    def put(self, key, image):
+        if len(image) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= len(previous)
+            self._items[key] = image
+            self.total_bytes += len(image)
+            while self.total_bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.total_bytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.total_bytes = 0
+
+
+_chart_cache = ChartCache(config.CHART_CACHE_MAX_BYTES)
+
+
+def render_chart(data, spec, draw, fmt='png'):
+    """(데이터 해시, 차트 설정)이 같으면 캐시된 바이트를, 아니면 draw()로 그려 저장한 바이트를 반환
+
+    draw는 인자 없이 matplotlib Figure를 만들어 반환하는 함수이고, 그림은 저장 직후 닫힌다.
+    spec에는 데이터 외에 그림을 바꾸는 값(컬럼, 제목, 색 등)을 모두 넣는다.
+    """
+    key = (data_fingerprint(data), repr(spec), fmt)
+    image = _chart_cache.get(key)
+    if image is None:
+        image = figure_to_bytes(draw(), fmt)
+        _chart_cache.put(key, image)
+    return image
+
+
+def show_chart(data, spec, draw, fmt='png'):
+    """render_chart 결과를 화면 너비에 맞춰 표시"""
+    image = render_chart(data, spec, draw, fmt)
+    if fmt == 'svg':
+        image = image.decode('utf-8')
+    st.image(image, use_container_width=True)
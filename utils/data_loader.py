@@ -1,78 +1,62 @@
 
 import pandas as pd
 import streamlit as st
-import os
 
-@st.cache_data
-def load_and_preprocess_data(csv_path):
-    if not os.path.exists(csv_path):
-        st.error(f"오류: '{csv_path}' 파일을 찾을 수 없습니다.")
-        return pd.DataFrame()
-
-    with st.spinner('대용량 데이터를 불러오고 전처리하는 중...'):
-        try:
-            encodings = ['utf-8', 'euc-kr', 'cp949', 'utf-8-sig']
-            df = None
-
-            for encoding in encodings:
-                try:
-                    df = pd.read_csv(csv_path, encoding=encoding, skipinitialspace=True, quoting=1)
-                    break
-                except (UnicodeDecodeError, pd.errors.ParserError):
-                    continue
-
-            if df is None:
-                st.error("지원되는 인코딩으로 파일을 읽을 수 없습니다.")
-                return pd.DataFrame()
-
-            df.columns = df.columns.str.strip()
-
-            required_cols = ['이름', '서울페이업종코드', '주소', '상세주소', '위도', '경도']
-            missing_cols = [col for col in required_cols if col not in df.columns]
-
-            if missing_cols:
-                st.error(f"CSV 파일에 다음 필수 컬럼이 없습니다: {', '.join(missing_cols)}")
-                return pd.DataFrame()
-
-            df = df.rename(columns={
-                '이름': 'store_name',
-                '서울페이업종코드': 'industry_code',
-                '주소': 'address',
-                '상세주소': 'detail_address',
-                '위도': 'latitude',
-                '경도': 'longitude'
-            })
+import config
 
-            df['full_address'] = df['address'].astype(str) + ' ' + df['detail_address'].fillna('').astype(str)
-            df['full_address'] = df['full_address'].str.strip()
+from utils.filter_index import ShopFilterIndex
+from utils.marker_clusters import ShopClusterPyramid
+from utils.preprocessing import DataLoadError, load_shops
+from utils.shop_cache import dataset_fingerprint, read_cached_shops
+from utils.shop_store import ShopStore
+from utils.spatial_index import ShopSpatialIndex
 
-            df['latitude'] = pd.to_numeric(df['latitude'], errors='coerce')
-            df['longitude'] = pd.to_numeric(df['longitude'], errors='coerce')
-
-            df.dropna(subset=['latitude', 'longitude'], inplace=True)
-
-            if df.empty:
-                st.warning("CSV 파일에 유효한 위도/경도 데이터가 없습니다.")
-                return pd.DataFrame()
-
-            seoul_districts = [
-                '강남구', '강동구', '강북구', '강서구', '관악구', '광진구', '구로구', '금천구', '노원구',
-                '도봉구', '동대문구', '동작구', '마포구', '서대문구', '서초구', '성동구', '성북구', '송파구',
-                '양천구', '영등포구', '용산구', '은평구', '종로구', '중구', '중랑구'
-            ]
-
-            def get_seoul_district_exact(address):
-                if not isinstance(address, str):
-                    return '기타'
-                for district_name in seoul_districts:
-                    if district_name in address:
-                        return district_name
-                return '기타'
-
-            df['district'] = df['address'].apply(get_seoul_district_exact)
-
-            return df
+def load_and_preprocess_data(csv_path):
+    """전처리된 매장 데이터 (utils.preprocessing.load_shops의 진행/오류를 화면에 표시, 실패하면 빈 DataFrame)"""
+    try:
+        cached = read_cached_shops(csv_path)
+        if cached is not None:
+            return cached
+        with st.spinner('대용량 데이터를 불러오고 전처리하는 중...'):
+            return load_shops(csv_path)
+    except DataLoadError as e:
+        st.error(f"오류: {e}")
+        return pd.DataFrame()
+    except Exception as e:
+        st.error(f"데이터 로드 및 전처리 중 오류 발생: {e}")
+        return pd.DataFrame()
 
-        except Exception as e:
-            st.error(f"데이터 로드 및 전처리 중 오류 발생: {e}")
-            return pd.DataFrame()
\ No newline at end of file
+@st.cache_resource(show_spinner=False)
+def load_shop_store(csv_path):
+    """전처리된 매장 데이터를 압축 저장소로 한 번만 생성 (재실행마다 복사하지 않고 공유, 실패하면 None)
+
+    DataFrame은 들고 있지 않고, 필요한 행/컬럼만 ShopStore.frame()으로 만든다.
+    """
+    df = load_and_preprocess_data(csv_path)
+    if df.empty:
+        return None
+    return ShopStore.from_frame(df)
+
+@st.cache_resource(show_spinner=False)
+def load_analysis_frame(csv_path):
+    """통계 탭에 쓸 지역구/업종 DataFrame과 분석 캐시 키(데이터 지문)를 한 번만 생성"""
+    frame = load_shop_store(csv_path).frame(columns=['district', 'industry_code'])
+    return frame, dataset_fingerprint(csv_path)
+
+@st.cache_resource(show_spinner=False)
+def load_spatial_index(csv_path):
+    """전처리된 매장 데이터로 공간 인덱스를 한 번만 생성"""
+    store = load_shop_store(csv_path)
+    return ShopSpatialIndex(store.latitude, store.longitude)
+
+@st.cache_resource(show_spinner=False)
+def load_filter_index(csv_path):
+    """전처리된 매장 데이터로 지역구/업종/매장명 필터 인덱스를 한 번만 생성"""
+    return ShopFilterIndex(load_shop_store(csv_path).frame(columns=['district', 'industry_code', 'store_name']))
+
+@st.cache_resource(show_spinner=False)
+def load_cluster_pyramid(csv_path):
+    """공간 인덱스와 같은 좌표로 지도 레벨별 군집 피라미드를 한 번만 생성"""
+    spatial_index = load_spatial_index(csv_path)
+    return ShopClusterPyramid(spatial_index.latitudes, spatial_index.longitudes,
+                              min_level=config.MAP_CLUSTER_MIN_LEVEL, grid_px=config.MAP_CLUSTER_GRID_PX)
@@ -0,0 +1,125 @@
+import string
+import unicodedata
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+NGRAM_SIZES = (1, 2, 3)  # 매장명 색인에 쓰는 n-gram 길이 (한 글자 = 한글 한 음절)
+
+
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def normalize_name(text):
+    """검색용 매장명 정규화 (한글 자모를 음절로 합치는 NFC + 영문 소문자)"""
+    if not isinstance(text, str):
+        return ''
+    return unicodedata.normalize('NFC', text).translate(_ASCII_LOWER)
+
+
+class ShopFilterIndex:
+    """지역구/업종 비트맵과 매장명 n-gram 역색인
+
+    지역구와 업종은 범주별로 행 비트맵(np.packbits)을 만들어 두고 AND로 교집합을 구한다.
+    매장명은 정규화한 이름의 1~3-gram마다 행 번호 목록(posting list)을 CSR 형태로
+    저장해, 검색어의 n-gram 목록을 교집합한 뒤 후보만 실제 문자열로 확인한다.
+    행 번호는 인덱스를 만든 DataFrame의 행 위치(iloc)이다.
+    """
+
+    def __init__(self, df):
+        self.n_rows = len(df)
+        self._bitmaps = {
+            column: self._build_bitmaps(df[column].astype('category'))
+            for column in ('district', 'industry_code')
+        }
+        # pyarrow의 utf8_normalize/utf8_lower는 한글 음절을 자모로 풀어 놓으므로 정규화는 파이썬에서 한다
+        self._names = pa.array([normalize_name(name) for name in df['store_name'].tolist()], type=pa.string())
+        self._grams, self._offsets, self._postings = self._build_ngram_index(self._names)
+
+    def _build_bitmaps(self, values):
+        codes = values.cat.codes.to_numpy()
+        return {
+            category: np.packbits(codes == code)
+            for code, category in enumerate(values.cat.categories)
+        }
+
+    def _build_ngram_index(self, arr):
+        lengths = pc.utf8_length(arr).to_numpy()
+
+        grams, rows = [], []
+        for size in NGRAM_SIZES:
+            for start in range(int(lengths.max(initial=0)) - size + 1):
+                active = np.flatnonzero(lengths >= start + size)
+                grams.append(pc.utf8_slice_codeunits(arr.take(active), start, start + size))
+                rows.append(active)
+        if not grams:
+            return {}, np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.int32)
+
+        encoded = pc.dictionary_encode(pa.chunked_array(grams)).combine_chunks()
+        gram_codes = encoded.indices.to_numpy().astype(np.int64)
+        # (n-gram, 행) 순으로 정렬하고, 같은 이름에 같은 n-gram이 여러 번 나오면 한 번만 남긴다
+        pairs = np.sort(gram_codes * self.n_rows + np.concatenate(rows))
+        pairs = pairs[np.concatenate(([True], pairs[1:] != pairs[:-1]))]
+        gram_codes, postings = np.divmod(pairs, self.n_rows)
+
+        offsets = np.zeros(len(encoded.dictionary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(gram_codes, minlength=len(encoded.dictionary)), out=offsets[1:])
+        lookup = {gram: code for code, gram in enumerate(encoded.dictionary.to_pylist())}
+        return lookup, offsets, postings.astype(np.int32)
+
+    def _posting(self, gram):
+        code = self._grams.get(gram)
+        if code is None:
+            return np.empty(0, dtype=np.int32)
+        return self._postings[self._offsets[code]:self._offsets[code + 1]]
+
+    def search_names(self, query):
+        """매장명에 검색어가 포함된 행 번호를 오름차순으로 반환 (대소문자 무시)"""
+        query = normalize_name(query)
+        size = min(len(query), max(NGRAM_SIZES))
+
+        postings = sorted(
+            (self._posting(query[i:i + size]) for i in range(len(query) - size + 1)),
+            key=len,
+        )
+        # 가장 짧은 목록부터 이진 탐색으로 교집합을 구해 비용이 결과 크기에 비례하도록 한다
+        rows = postings[0]
+        for posting in postings[1:]:
+            if len(rows) == 0:
+                break
+            if len(rows) > self.n_rows // 64:
+                # 후보가 많으면 행 마스크로 확인하는 편이 이진 탐색보다 빠르다
+                mask = np.zeros(self.n_rows, dtype=bool)
+                mask[posting] = True
+                rows = rows[mask[rows]]
+            else:
+                found = np.minimum(np.searchsorted(posting, rows), len(posting) - 1)
+                rows = rows[posting[found] == rows]
+
+        if len(query) > size:
+            # n-gram이 모두 있어도 연속으로 나오지 않을 수 있으므로 후보만 문자열로 확인
+            matched = pc.match_substring(self._names.take(rows), query).to_numpy(zero_copy_only=False)
+            rows = rows[matched]
+        return rows
+
+    def query(self, search_query='', district=None, industry_code=None):
+        """조건을 모두 만족하는 행 번호를 오름차순으로 반환, 조건이 없으면 None"""
+        bitmap = None
+        for column, value in (('district', district), ('industry_code', industry_code)):
+            if value is None:
+                continue
+            column_bitmap = self._bitmaps[column].get(value)
+            if column_bitmap is None:
+                return np.empty(0, dtype=np.int32)
+            bitmap = column_bitmap if bitmap is None else bitmap & column_bitmap
+
+        if not search_query:
+            if bitmap is None:
+                return None
+            return np.flatnonzero(np.unpackbits(bitmap, count=self.n_rows)).astype(np.int32)
+
+        rows = self.search_names(search_query)
+        if bitmap is not None and len(rows):
+            rows = rows[(bitmap[rows >> 3] >> (7 - (rows & 7))) & 1 == 1]
+        return rows
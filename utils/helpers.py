@@ -1,4 +1,5 @@
 import math
+import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
 import warnings
@@ -21,6 +22,27 @@ def calculate_distance(lat1, lon1, lat2, lon2):
 
     return R * c
 
+def calculate_distances(lat, lon, lats, lons):
+    """한 지점에서 여러 지점까지의 거리를 한 번에 계산 (km, numpy 벡터 연산)
+
+    calculate_distance와 같은 하버사인 공식을 배열 단위로 적용하므로
+    결과는 행별 계산과 동일하다.
+    """
+    R = 6371  # 지구의 반지름 (km)
+
+    lat1_rad = np.radians(lat)
+    lon1_rad = np.radians(lon)
+    lat2_rad = np.radians(np.asarray(lats, dtype=np.float64))
+    lon2_rad = np.radians(np.asarray(lons, dtype=np.float64))
+
+    dlat = lat2_rad - lat1_rad
+    dlon = lon2_rad - lon1_rad
+
+    a = np.sin(dlat/2)**2 + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(dlon/2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))
+
+    return R * c
+
 def configure_matplotlib_fonts():
     """matplotlib 한글 폰트 설정"""
     try:
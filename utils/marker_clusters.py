@@ -0,0 +1,83 @@
+import numpy as np
+
+# 카카오맵 레벨 1의 픽셀당 거리(m). 레벨이 1 오를 때마다 두 배가 된다 (레벨 3 ≈ 1m/px)
+LEVEL1_METERS_PER_PIXEL = 0.25
+MAX_MAP_LEVEL = 14
+KM_PER_DEGREE = 111.32  # 위도 1도(적도에서는 경도 1도)의 거리 (km)
+
+
+def _dense_ids(keys):
+    """정수 키를 0부터 시작하는 연속 번호로 바꿔 (번호 배열, 고유 키 오름차순)을 반환"""
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    is_new = np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1])) if len(keys) else np.empty(0, dtype=bool)
+    ids = np.empty(len(keys), dtype=np.int32)
+    ids[order] = np.cumsum(is_new) - 1
+    return ids, sorted_keys[is_new]
+
+
+class ShopClusterPyramid:
+    """카카오맵 레벨별 격자 군집 피라미드
+
+    가장 낮은 레벨(min_level)에서 grid_px 픽셀 크기의 격자 칸마다 매장을 묶고, 레벨이
+    오를 때마다 칸을 2×2씩 합쳐 상위 군집을 만든다. 칸 크기가 정확히 두 배씩 커지므로
+    각 군집은 바로 위 레벨의 군집 하나에 속해, 행별로는 가장 낮은 레벨의 군집 번호만
+    저장하고 상위 레벨은 부모 번호 배열로 따라간다. 군집 중심과 개수는 조회할 때
+    (필터된) 행만으로 bincount로 계산한다. 행 위치는 피라미드를 만든 좌표의 순서이다.
+    """
+
+    def __init__(self, latitudes, longitudes, min_level=4, grid_px=60):
+        self.latitudes = np.asarray(latitudes, dtype=np.float64)
+        self.longitudes = np.asarray(longitudes, dtype=np.float64)
+        self.levels = list(range(min_level, MAX_MAP_LEVEL + 1))
+
+        if len(self.latitudes):
+            # 서울 정도의 범위에서는 평균 위도 기준 등거리 투영으로 충분하다
+            x = (self.longitudes - self.longitudes.min()) * KM_PER_DEGREE * np.cos(np.radians(self.latitudes.mean()))
+            y = (self.latitudes - self.latitudes.min()) * KM_PER_DEGREE
+        else:
+            x = y = np.empty(0)
+        cell_km = grid_px * LEVEL1_METERS_PER_PIXEL * 2 ** (min_level - 1) / 1000
+        cell_x = (x // cell_km).astype(np.int64)
+        cell_y = (y // cell_km).astype(np.int64)
+
+        self._row_cluster, keys = _dense_ids((cell_x << 32) | cell_y)
+        self._n_clusters = [len(keys)]
+        self._parents = []
+        for _ in self.levels[1:]:
+            parent, keys = _dense_ids(((keys >> 33) << 32) | ((keys & 0xFFFFFFFF) >> 1))
+            self._parents.append(parent)
+            self._n_clusters.append(len(keys))
+
+    def __len__(self):
+        return len(self.latitudes)
+
+    def clusters(self, positions, max_features=None):
+        """행 위치들을 레벨별로 묶어 {레벨: {'lat', 'lng', 'count', 'row'}}를 반환
+
+        'row'는 매장이 하나뿐인 군집에서 그 매장의 positions 안 순번이고, 나머지는 -1이다.
+        군집 수가 max_features를 넘는 (낮은) 레벨은 결과에서 뺀다.
+        """
+        positions = np.asarray(positions, dtype=np.intp)
+        lats = self.latitudes[positions]
+        lngs = self.longitudes[positions]
+        order = np.arange(len(positions), dtype=np.float64)
+
+        result = {}
+        ids = self._row_cluster[positions]
+        for level, n_clusters, parent in zip(self.levels, self._n_clusters, [None] + self._parents):
+            if parent is not None:
+                ids = parent[ids]
+            counts = np.bincount(ids, minlength=n_clusters)
+            present = np.flatnonzero(counts)
+            if max_features is not None and len(present) > max_features:
+                continue
+            counts = counts[present]
+            rows = np.bincount(ids, weights=order, minlength=n_clusters)[present]
+            result[level] = {
+                'lat': np.bincount(ids, weights=lats, minlength=n_clusters)[present] / counts,
+                'lng': np.bincount(ids, weights=lngs, minlength=n_clusters)[present] / counts,
+                'count': counts,
+                'row': np.where(counts == 1, rows, -1).astype(np.int64),
+            }
+        return result
@@ -0,0 +1,371 @@
+"""매장 CSV 전처리 파이프라인 (Streamlit 없이 배치 작업/API에서도 사용)
+
+큰 파일은 헤더 다음부터 행 경계(따옴표 밖의 줄바꿈)에 맞춘 바이트 범위로 나눠
+프로세스 풀에서 각각 읽고 정리한 뒤 원래 순서대로 이어 붙인다. 결과는 한 번에 읽은 것과 같다.
+메모리보다 큰 파일은 청크 단위로 읽어 캐시 파일에 바로 쓰는 스트리밍 모드로 처리한다.
+앱에 필요한 컬럼만 남기고, full_address는 화면에 보여 줄 행에만 full_address()로 만든다.
+"""
+import io
+import math
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+import config
+from utils.shop_cache import compact_shop_dtypes, open_cache_writer, read_cached_shops, write_cached_shops
+
+ENCODINGS = ['utf-8', 'euc-kr', 'cp949', 'utf-8-sig']
+# 표본으로 판별할 때 시도하는 순서 (cp949는 euc-kr을 포함하므로 euc-kr 파일도 같은 결과로 읽힌다)
+_SNIFF_ENCODINGS = ['utf-8', 'cp949']
+_UTF8_BOM = b'\xef\xbb\xbf'
+
+# 원본 CSV 컬럼 → 앱에서 쓰는 컬럼
+COLUMN_NAMES = {
+    '이름': 'store_name',
+    '서울페이업종코드': 'industry_code',
+    '주소': 'address',
+    '상세주소': 'detail_address',
+    '위도': 'latitude',
+    '경도': 'longitude'
+}
+
+# 청크마다 타입 추론이 달라지지 않도록 문자열로 읽는 컬럼 (좌표는 나중에 숫자로 변환하므로 추론에 맡긴다)
+_TEXT_COLUMNS = ['이름', '서울페이업종코드', '주소', '상세주소']
+# 병렬 처리 범위를 나눌 때 따옴표 상태를 세며 한 번에 읽는 크기
+_QUOTE_SCAN_BYTES = 1024 * 1024
+
+SEOUL_DISTRICTS = [
+    '강남구', '강동구', '강북구', '강서구', '관악구', '광진구', '구로구', '금천구', '노원구',
+    '도봉구', '동대문구', '동작구', '마포구', '서대문구', '서초구', '성동구', '성북구', '송파구',
+    '양천구', '영등포구', '용산구', '은평구', '종로구', '중구', '중랑구'
+]
+
+# 긴 이름부터 시도하도록 정렬해, 주소에서 가장 먼저 나오는 자치구를 가장 긴 이름으로 찾는다
+_DISTRICT_PATTERN = re.compile('|'.join(sorted(SEOUL_DISTRICTS, key=len, reverse=True)))
+_DISTRICT_CATEGORIES = SEOUL_DISTRICTS + ['기타']
+# 서울 밖 시/도로 시작하는 주소 ('부산광역시 중구 ...')는 같은 이름의 구가 있어도 '기타'
+_OTHER_REGION_PATTERN = re.compile('^(부산|대구|인천|광주|대전|울산|세종|경기|강원|충청|충북|충남|전라|전북|전남|경상|경북|경남|제주)')
+
+
+class DataLoadError(Exception):
+    """매장 CSV를 읽거나 전처리할 수 없을 때 발생 (메시지는 사용자에게 그대로 보여 줄 수 있다)"""
+
+
+def _match_district(text):
+    match = _DISTRICT_PATTERN.search(text) if isinstance(text, str) else None
+    return _DISTRICT_CATEGORIES.index(match.group()) if match else -1
+
+def _match_head(head):
+    if isinstance(head, str) and _OTHER_REGION_PATTERN.match(head):
+        return _DISTRICT_CATEGORIES.index('기타')
+    return _match_district(head)
+
+def extract_seoul_district(addresses):
+    """주소 Series에서 서울 자치구를 추출 (없으면 '기타', 범주형)
+
+    '서울특별시 성동구 ...'처럼 앞의 두 토큰에 자치구가 오므로, 고유한 앞부분에만
+    정규식을 적용하고 결과를 전체 행에 펼친다. 앞부분에 없으면 전체 주소에서 찾는다.
+    서울 밖 시/도로 시작하는 주소는 '기타'이다.
+    """
+    arr = pa.array(addresses, type=pa.string(), from_pandas=True)
+    if isinstance(arr, pa.ChunkedArray):
+        arr = arr.combine_chunks()  # 큰 문자열 컬럼은 여러 조각으로 읽힌다
+    head = pc.binary_join(pc.list_slice(pc.utf8_split_whitespace(arr, max_splits=2), 0, 2), ' ')
+    head = pc.dictionary_encode(head)
+
+    head_codes = np.array([_match_head(text) for text in head.dictionary.to_pylist()] + [-1])
+    indices = head.indices.fill_null(len(head.dictionary)).to_numpy(zero_copy_only=False)
+    codes = head_codes[indices]
+
+    missing = np.flatnonzero(codes < 0)
+    if len(missing):
+        codes[missing] = [_match_district(text) for text in addresses.iloc[missing]]
+    codes[codes < 0] = _DISTRICT_CATEGORIES.index('기타')
+    return pd.Categorical.from_codes(codes, categories=_DISTRICT_CATEGORIES)
+
+
+def _sample_blocks(csv_path):
+    """파일 앞부분과 고르게 떨어진 블록들을 줄 경계에 맞춰 잘라 반환 (멀티바이트 문자가 잘리지 않게)"""
+    size = os.path.getsize(csv_path)
+    prefix_bytes = config.ENCODING_SNIFF_PREFIX_BYTES
+    block_bytes = config.ENCODING_SNIFF_BLOCK_BYTES
+    n_blocks = config.ENCODING_SNIFF_BLOCKS
+    with open(csv_path, 'rb') as f:
+        prefix = f.read(prefix_bytes)
+        blocks = [prefix if len(prefix) == size else prefix[:prefix.rfind(b'\n') + 1]]
+        if size > prefix_bytes + block_bytes:
+            for i in range(n_blocks):
+                f.seek(prefix_bytes + (size - prefix_bytes - block_bytes) * i // max(n_blocks - 1, 1))
+                block = f.read(block_bytes)
+                end = size if f.tell() == size else block.rfind(b'\n') + 1
+                blocks.append(block[block.find(b'\n') + 1:end])
+    return blocks
+
+
+def sniff_encoding(csv_path):
+    """파일 앞부분과 표본 블록만 디코딩해 인코딩을 고른다 (맞는 것이 없으면 None)
+
+    표본이 모두 UTF-8이면 'utf-8', 아니면 'cp949'를 시도한다. UTF-8 BOM이 있으면 UTF-8로만 본다
+    (pandas는 'utf-8'에서도 파일 맨 앞의 BOM을 건너뛰고, 'utf-8-sig'보다 빠른 C 디코더를 쓴다).
+    """
+    blocks = _sample_blocks(csv_path)
+    candidates = _SNIFF_ENCODINGS
+    if blocks[0].startswith(_UTF8_BOM):
+        candidates = ['utf-8']
+        blocks[0] = blocks[0][len(_UTF8_BOM):]
+    for encoding in candidates:
+        try:
+            for block in blocks:
+                block.decode(encoding)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return None
+
+
+_detected = {}  # (경로, 크기, mtime) → 인코딩
+_detected_lock = threading.Lock()
+
+
+def _file_key(csv_path):
+    stat = os.stat(csv_path)
+    return os.path.abspath(csv_path), stat.st_size, stat.st_mtime_ns
+
+
+def detect_encoding(csv_path):
+    """파일의 인코딩 (같은 파일이면 처음 판별한 결과를 재사용, 판별할 수 없으면 None)"""
+    key = _file_key(csv_path)
+    with _detected_lock:
+        if key in _detected:
+            return _detected[key]
+    encoding = sniff_encoding(csv_path)
+    remember_encoding(csv_path, encoding, key)
+    return encoding
+
+
+def remember_encoding(csv_path, encoding, key=None):
+    """실제로 읽는 데 성공한 인코딩을 파일 지문과 함께 기억"""
+    with _detected_lock:
+        _detected[key or _file_key(csv_path)] = encoding
+
+
+def full_address(df):
+    """주소 + 상세주소 (매장 수만큼 문자열이 생기므로 화면에 보여 줄 행에만 계산한다)"""
+    return (df['address'].fillna('').astype(str) + ' ' + df['detail_address'].fillna('').astype(str)).str.strip()
+
+
+def clean_shops(df):
+    """원본 컬럼의 매장 DataFrame을 앱 컬럼으로 바꾸고 좌표/자치구를 정리 (좌표가 없는 행은 제외)"""
+    df = df.rename(columns=COLUMN_NAMES)
+
+    df['latitude'] = pd.to_numeric(df['latitude'], errors='coerce')
+    df['longitude'] = pd.to_numeric(df['longitude'], errors='coerce')
+
+    df = df.dropna(subset=['latitude', 'longitude'])
+    df['district'] = extract_seoul_district(df['address'])
+    return df
+
+
+def _parse_range(csv_path, start, end, encoding, columns):
+    """CSV의 [start, end) 바이트(헤더 제외, 줄 경계)를 읽어 정리한 DataFrame을 반환"""
+    with open(csv_path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    usecols = [column for column in columns if column in COLUMN_NAMES]
+    if not data.strip():
+        return clean_shops(pd.DataFrame(columns=usecols, dtype=str))
+    df = pd.read_csv(io.BytesIO(data), encoding=encoding, header=None, names=columns, usecols=usecols,
+                     dtype=dict.fromkeys(_TEXT_COLUMNS, str), skipinitialspace=True, quoting=1)
+    return clean_shops(df)
+
+
+def _next_row_start(f, pos, quoted):
+    """f의 pos(따옴표 상태 quoted)부터 따옴표 밖의 첫 줄바꿈 다음 위치. 없으면 None"""
+    while True:
+        block = f.read(_QUOTE_SCAN_BYTES)
+        if not block:
+            return None
+        at = 0
+        while True:
+            newline = block.find(b'\n', at)
+            if newline < 0:
+                break
+            quoted ^= block.count(b'"', at, newline) % 2 == 1
+            at = newline + 1
+            if not quoted:
+                return pos + at
+        quoted ^= block.count(b'"', at) % 2 == 1
+        pos += len(block)
+
+
+def _line_ranges(csv_path, start, n_chunks):
+    """start부터 파일 끝까지를 행 경계에 맞춘 (시작, 끝) 바이트 범위 최대 n_chunks개로 나눈다
+
+    start부터 따옴표 개수의 홀짝을 세어 가며 따옴표 밖의 줄바꿈에서만 나누므로,
+    여러 줄에 걸친 따옴표 필드가 두 범위로 잘리지 않는다 ("" 이스케이프는 홀짝을 바꾸지 않는다).
+    """
+    size = os.path.getsize(csv_path)
+    bounds = [start]
+    with open(csv_path, 'rb') as f:
+        f.seek(start)
+        pos, quoted = start, False
+        for i in range(1, n_chunks):
+            target = start + (size - start) * i // n_chunks - 1
+            while pos < target:
+                block = f.read(min(_QUOTE_SCAN_BYTES, target - pos))
+                quoted ^= block.count(b'"') % 2 == 1
+                pos += len(block)
+            boundary = _next_row_start(f, pos, quoted)
+            if boundary is None or boundary >= size:
+                break
+            bounds.append(boundary)
+            f.seek(boundary)
+            pos, quoted = boundary, False
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _read_header(csv_path, encoding):
+    """CSV 헤더의 원래 컬럼 이름 (앞뒤 공백 포함). 필수 컬럼이 없으면 DataLoadError"""
+    header = pd.read_csv(csv_path, encoding=encoding, nrows=0, skipinitialspace=True, quoting=1).columns
+    missing_cols = [col for col in COLUMN_NAMES if col not in header.str.strip()]
+    if missing_cols:
+        raise DataLoadError(f"CSV 파일에 다음 필수 컬럼이 없습니다: {', '.join(missing_cols)}")
+    return header
+
+
+def _read_with_encoding(csv_path, encoding, workers, chunk_bytes):
+    columns = _read_header(csv_path, encoding).str.strip()
+
+    with open(csv_path, 'rb') as f:
+        f.readline()
+        start = f.tell()
+    size = os.path.getsize(csv_path)
+
+    if workers > 1 and size - start > chunk_bytes:
+        ranges = _line_ranges(csv_path, start, max(workers, math.ceil((size - start) / chunk_bytes)))
+        # Streamlit 서버처럼 스레드가 있는 프로세스에서 fork하지 않도록 spawn으로 작업 프로세스를 만든다
+        with ProcessPoolExecutor(max_workers=min(workers, len(ranges)),
+                                 mp_context=multiprocessing.get_context('spawn')) as pool:
+            frames = list(pool.map(_parse_range, *zip(*[
+                (csv_path, begin, end, encoding, list(columns)) for begin, end in ranges
+            ])))
+    else:
+        frames = [_parse_range(csv_path, start, size, encoding, list(columns))]
+    return pd.concat(frames, ignore_index=True)
+
+
+def read_shops_csv(csv_path, workers=None, chunk_bytes=None):
+    """매장 CSV를 읽어 전처리한 DataFrame을 반환 (캐시 사용 안 함)
+
+    workers가 1보다 크고 파일이 chunk_bytes보다 크면 프로세스 풀에서 나눠 처리한다
+    (기본값은 config). 읽을 수 없거나 필수 컬럼/유효한 좌표가 없으면 DataLoadError.
+    """
+    workers = workers or config.PREPROCESS_WORKERS or os.cpu_count() or 1
+    chunk_bytes = chunk_bytes or config.PREPROCESS_CHUNK_BYTES
+    df = _with_encodings(csv_path, lambda encoding: _read_with_encoding(csv_path, encoding, workers, chunk_bytes))
+    if df.empty:
+        raise DataLoadError("CSV 파일에 유효한 위도/경도 데이터가 없습니다.")
+    return compact_shop_dtypes(df)
+
+
+def _with_encodings(csv_path, read):
+    """read(인코딩)을 판별한 인코딩으로 한 번 실행 (표본에 없던 부분에서 디코딩 오류가 나면 나머지 후보로 다시 실행)"""
+    if not os.path.exists(csv_path):
+        raise DataLoadError(f"'{csv_path}' 파일을 찾을 수 없습니다.")
+    detected = detect_encoding(csv_path)
+    if detected is None:
+        raise DataLoadError("지원되는 인코딩으로 파일을 읽을 수 없습니다.")
+    for encoding in [detected] + [encoding for encoding in ENCODINGS if encoding != detected]:
+        try:
+            result = read(encoding)
+        except (UnicodeDecodeError, pd.errors.ParserError):
+            continue
+        if encoding != detected:
+            remember_encoding(csv_path, encoding)
+        return result
+    raise DataLoadError("지원되는 인코딩으로 파일을 읽을 수 없습니다.")
+
+
+def _stream_schema(header):
+    """스트리밍 캐시의 Arrow 스키마 (CSV의 필수 컬럼 순서 + district)"""
+    types = {
+        'store_name': pa.string(),
+        'industry_code': pa.dictionary(pa.int32(), pa.string()),
+        'address': pa.string(),
+        'detail_address': pa.string(),
+        'latitude': pa.float32(),
+        'longitude': pa.float32(),
+    }
+    names = [COLUMN_NAMES[name] for name in header.str.strip() if name in COLUMN_NAMES]
+    fields = [(name, types[name]) for name in names]
+    return pa.schema(fields + [('district', pa.dictionary(pa.int8(), pa.string()))])
+
+
+def _stream_with_encoding(csv_path, encoding, chunk_rows):
+    header = _read_header(csv_path, encoding)
+    raw = {name.strip(): name for name in header}
+    schema = _stream_schema(header)
+    reader = pd.read_csv(csv_path, encoding=encoding, usecols=[raw[column] for column in COLUMN_NAMES],
+                         dtype={raw[column]: str for column in _TEXT_COLUMNS},
+                         skipinitialspace=True, quoting=1, chunksize=chunk_rows)
+
+    # 업종은 청크마다 새 값이 나오므로 처음 나온 순서로 번호를 이어 붙인다 (캐시에는 사전 증분으로 기록)
+    industries = {}
+    rows = 0
+    with reader, open_cache_writer(csv_path, schema) as writer:
+        for chunk in reader:
+            chunk.columns = chunk.columns.str.strip()
+            chunk = clean_shops(chunk)
+            for value in chunk['industry_code'].dropna().unique():
+                industries.setdefault(value, len(industries))
+            chunk['industry_code'] = pd.Categorical(chunk['industry_code'], categories=list(industries))
+            chunk = chunk.astype({'latitude': 'float32', 'longitude': 'float32'})
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            rows += len(chunk)
+        if rows == 0:
+            raise DataLoadError("CSV 파일에 유효한 위도/경도 데이터가 없습니다.")
+
+
+def stream_shops_to_cache(csv_path, chunk_rows=None):
+    """CSV를 chunk_rows행씩 읽어 정리하고 바로 캐시 파일에 이어 쓴다 (메모리 사용량은 청크 크기만큼)
+
+    결과는 read_cached_shops로 메모리 매핑해 읽는다. 캐시를 쓸 수 없으면 DataLoadError.
+    """
+    chunk_rows = chunk_rows or config.PREPROCESS_STREAM_CHUNK_ROWS
+    try:
+        _with_encodings(csv_path, lambda encoding: _stream_with_encoding(csv_path, encoding, chunk_rows))
+    except OSError as e:
+        raise DataLoadError(f"전처리 결과를 캐시에 쓸 수 없습니다: {e}") from e
+
+
+def load_shops(csv_path, workers=None, streaming=None):
+    """전처리된 매장 데이터 (원본이 그대로면 캐시에서 읽고, 아니면 전처리 후 캐시에 저장)
+
+    streaming이 None이면 파일이 config.PREPROCESS_STREAM_MIN_BYTES 이상일 때 스트리밍으로
+    처리한다. 스트리밍은 전체 표를 메모리에 만들지 않고 캐시 파일을 메모리 매핑해 반환한다.
+    """
+    cached = read_cached_shops(csv_path)
+    if cached is not None:
+        return cached
+    if not os.path.exists(csv_path):
+        raise DataLoadError(f"'{csv_path}' 파일을 찾을 수 없습니다.")
+    if streaming is None:
+        streaming = os.path.getsize(csv_path) >= config.PREPROCESS_STREAM_MIN_BYTES
+
+    if streaming:
+        stream_shops_to_cache(csv_path)
+        cached = read_cached_shops(csv_path)
+        if cached is None:
+            raise DataLoadError("전처리 결과 캐시를 읽을 수 없습니다.")
+        return cached
+    df = read_shops_csv(csv_path, workers)
+    write_cached_shops(csv_path, df)
+    return df
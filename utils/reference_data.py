@@ -0,0 +1,111 @@
+import os
+import threading
+from dataclasses import dataclass
+from typing import Callable
+
+import pandas as pd
+
+import config
+
+
+class ReferenceDataError(ValueError):
+    """보조 데이터 파일의 형식이 예상과 다를 때 발생"""
+
+
+def _check(df, name, key):
+    if df.empty:
+        raise ReferenceDataError(f"{name}: 데이터 행이 없습니다")
+    if df[key].isna().any() or df[key].duplicated().any():
+        raise ReferenceDataError(f"{name}: '{key}' 값이 비어 있거나 중복됩니다")
+    return df.set_index(key)
+
+
+def _to_numbers(df, name, columns, dtype):
+    try:
+        return df.astype({column: dtype for column in columns})
+    except (TypeError, ValueError) as e:
+        raise ReferenceDataError(f"{name}: 숫자가 아닌 값이 있습니다 ({e})") from e
+
+
+def _read_district_population(path):
+    # 머리글 2줄 다음에 "합계" 행과 자치구별 행이 온다 (자치구, 성별, 인구)
+    df = pd.read_csv(path, skiprows=2, usecols=[0, 2], names=['district', 'population'],
+                     header=None, encoding='utf-8-sig')
+    df = df[df['district'] != '합계']
+    df = _to_numbers(df, '자치구 인구', ['population'], 'int64')
+    return _check(df, '자치구 인구', 'district')
+
+
+def _read_district_area(path):
+    # 머리글 3줄 다음에 "소계" 행과 자치구별 행이 온다 (시, 자치구, 면적 km², 구성비 %)
+    df = pd.read_csv(path, skiprows=3, usecols=[1, 2], names=['district', 'area_km2'],
+                     header=None, encoding='utf-8-sig')
+    df = df[df['district'] != '소계']
+    df = _to_numbers(df, '자치구 면적', ['area_km2'], 'float64')
+    return _check(df, '자치구 면적', 'district')
+
+
+def _read_seongdong_population(path):
+    df = pd.read_csv(path, encoding='utf-8-sig')
+    df.columns = df.columns.str.strip()
+    if '행정기관' not in df.columns or '총인구수' not in df.columns:
+        raise ReferenceDataError("성동구 인구: '행정기관', '총인구수' 컬럼이 필요합니다")
+    df['행정기관'] = df['행정기관'].astype(str).str.strip()
+    df = _to_numbers(df, '성동구 인구', df.columns.drop('행정기관'), 'int64')
+    return _check(df, '성동구 인구', '행정기관')
+
+
+@dataclass(frozen=True)
+class ReferenceDataset:
+    path_setting: str  # 파일 경로를 담은 config 상수 이름
+    reader: Callable[[str], pd.DataFrame]
+
+    @property
+    def path(self):
+        return getattr(config, self.path_setting)
+
+
+# 이름 → 보조 데이터. 모두 키(자치구/행정동) 인덱스와 숫자 컬럼으로 된 DataFrame을 만든다
+REFERENCE_DATASETS = {
+    'district_population': ReferenceDataset('POPULATION_DATA_PATH', _read_district_population),
+    'district_area': ReferenceDataset('AREA_DATA_PATH', _read_district_area),
+    'seongdong_population': ReferenceDataset('SEONGDONG_POPULATION_DATA_PATH', _read_seongdong_population),
+}
+
+_loaded = {}  # 이름 → ((경로, 크기, mtime), DataFrame)
+_lock = threading.Lock()
+
+
+def get_reference(name):
+    """보조 데이터를 프로세스당 한 번만 읽어 공유한다 (파일 크기/mtime이 바뀌면 다시 읽음)
+
+    반환된 DataFrame은 모든 호출자가 함께 쓰므로 수정하지 말고 필요하면 복사해서 쓴다.
+    파일이 없으면 FileNotFoundError, 형식이 다르면 ReferenceDataError가 발생한다.
+    """
+    dataset = REFERENCE_DATASETS[name]
+    path = dataset.path
+    stat = os.stat(path)
+    version = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+    with _lock:
+        cached = _loaded.get(name)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        frame = dataset.reader(path)
+        _loaded[name] = (version, frame)
+        return frame
+
+
+def district_population():
+    """자치구별 인구 (인덱스: district, 컬럼: population)"""
+    return get_reference('district_population')
+
+
+def district_area():
+    """자치구별 면적 (인덱스: district, 컬럼: area_km2)"""
+    return get_reference('district_area')
+
+
+def seongdong_population():
+    """성동구 행정동별 인구 통계 (인덱스: 행정기관, 컬럼: 총인구수 등 원본 숫자 컬럼)"""
+    return get_reference('seongdong_population')
@@ -1,9 +1,18 @@
+import os
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 import folium
+from folium.plugins import HeatMap
+
+import config
+from analysis.seongdong_analysis_core import dong_centroids, merge_dong_population
+from services.seongdong_enrichment import coords_path, load_shop_coords
+from utils.chart_cache import show_chart
+from utils.reference_data import seongdong_population
 
 # 한글 폰트 설정
 plt.rcParams['font.family'] = ['Malgun Gothic', 'DejaVu Sans']
@@ -33,128 +42,165 @@ DONG_MERGE_MAP = {
 }
 
 SEONGDONG_DATA_PATH = "data/shops_seongdong.csv"
-SEONGDONG_POPULATION_DATA_PATH = "data/seongdong_population.csv"
+SEONGDONG_POPULATION_DATA_PATH = config.SEONGDONG_POPULATION_DATA_PATH
+
+def _file_fingerprint(path):
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_size, stat.st_mtime_ns
+
+@st.cache_data(show_spinner=False)
+def _load_and_merge(shop_fingerprint, population_fingerprint, coords_fingerprint=None):
+    """가맹점/인구 데이터를 읽어 동 이름을 통합하고 동 단위로 합친다 (화면 출력 없음)"""
+    shop_df = pd.read_csv(shop_fingerprint[0])
+    shop_df.columns = shop_df.columns.str.strip()
+    pop_df = seongdong_population().reset_index()
+
+    # 좌표 파일(services.seongdong_enrichment로 생성)이 있으면 주소로 위도/경도를 붙인다
+    if coords_fingerprint is not None and 'address' in shop_df.columns:
+        shop_df = shop_df.join(load_shop_coords(shop_fingerprint[0]), on='address')
+
+    # 인구 데이터 동 매핑 및 집계
+    pop_df["행정기관"] = pop_df["행정기관"].map(DONG_MERGE_MAP).fillna(pop_df["행정기관"])
+    pop_df = pop_df.groupby("행정기관", as_index=False).sum(numeric_only=True)
+
+    if 'dong' not in shop_df.columns:
+        return shop_df, pop_df, pd.DataFrame()
+
+    # 두 데이터의 동 이름을 같은 범주형으로 맞춘다
+    shop_df['dong'] = shop_df['dong'].map(DONG_MERGE_MAP).fillna(shop_df['dong'])
+    dong_dtype = pd.CategoricalDtype(sorted(set(shop_df['dong'].dropna()) | set(pop_df['행정기관'])))
+    shop_df['dong'] = shop_df['dong'].astype(dong_dtype)
+    pop_df['행정기관'] = pop_df['행정기관'].astype(dong_dtype)
+
+    # 분석에는 동별 값만 쓰므로 매장 행 단위가 아니라 동 단위로 병합
+    return shop_df, pop_df, merge_dong_population(shop_df, pop_df)
 
 def load_and_merge_data():
-    """데이터 로드 및 병합"""
+    """데이터 로드 및 병합 (파일이 바뀌기 전까지는 캐시된 결과를 사용)
+
+    (가맹점, 동 통합 인구, 동별 매장수+인구) DataFrame을 반환한다. 가맹점의 'dong',
+    인구의 '행정기관', 병합 결과의 'dong'은 같은 범주형이다. 좌표 파일이 있으면
+    가맹점에 latitude, longitude 컬럼이 붙는다 (찾지 못한 주소는 NaN).
+    """
     try:
-        # 1. 데이터 로드
-        shop_df = pd.read_csv(SEONGDONG_DATA_PATH)
-        pop_df = pd.read_csv(SEONGDONG_POPULATION_DATA_PATH, encoding='utf-8-sig')
-        
-        # 컬럼명 정리
-        pop_df.columns = pop_df.columns.str.strip()
-        shop_df.columns = shop_df.columns.str.strip()
-        
-        # 디버깅용 출력
-        st.write("🔍 **로드된 데이터 정보**")
-        st.write(f"가맹점 데이터: {len(shop_df)}행, 컬럼: {list(shop_df.columns)}")
-        st.write(f"인구 데이터: {len(pop_df)}행, 컬럼: {list(pop_df.columns)}")
-        
-        # 2. 인구 데이터 동 매핑 및 집계
-        pop_df["행정기관"] = pop_df["행정기관"].map(DONG_MERGE_MAP).fillna(pop_df["행정기관"])
-        pop_df = pop_df.groupby("행정기관", as_index=False).sum(numeric_only=True)
-        
-        # 3. 가맹점 데이터 동 매핑
-        if 'dong' in shop_df.columns:
-            shop_df['dong'] = shop_df['dong'].map(DONG_MERGE_MAP).fillna(shop_df['dong'])
-        
-        # 4. 공통 동 확인
-        shop_dongs = set(shop_df['dong'].unique()) if 'dong' in shop_df.columns else set()
-        pop_dongs = set(pop_df['행정기관'].unique())
-        common_dongs = shop_dongs.intersection(pop_dongs)
-        
-        # 5. 데이터 병합
-        merged_df = pd.merge(shop_df, pop_df, left_on="dong", right_on="행정기관", how="left")
-        
-        return shop_df, pop_df, merged_df
-        
+        coords_file = coords_path(SEONGDONG_DATA_PATH)
+        return _load_and_merge(
+            _file_fingerprint(SEONGDONG_DATA_PATH),
+            _file_fingerprint(SEONGDONG_POPULATION_DATA_PATH),
+            _file_fingerprint(coords_file) if os.path.exists(coords_file) else None,
+        )
     except Exception as e:
         st.error(f"데이터 로드 중 오류: {e}")
         import traceback
         st.error(traceback.format_exc())
         return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
 
+def count_stores_by_dong(shop_df):
+    """동별 매장 수 (많은 순, 매장이 없는 동은 제외, 동 이름은 문자열)"""
+    counts = shop_df['dong'].value_counts()
+    counts = counts[counts > 0]
+    counts.index = counts.index.astype(str)
+    return counts
+
 def plot_bar(data, x, y, title, xlabel, ylabel, color="skyblue", rotate=45, height=6, top_n=None):
-    """막대그래프 그리기"""
+    """막대그래프 그리기 (같은 데이터/설정이면 캐시된 이미지를 다시 사용)"""
     if data.empty:
         st.warning("표시할 데이터가 없습니다.")
         return
         
-    plot_data = data.copy()
+    plot_data = data[[x, y]].copy()
+    # 범주형이면 seaborn이 정렬 순서 대신 범주 순서로 그리므로 문자열로 바꾼다
+    plot_data[x] = plot_data[x].astype(str)
     if top_n:
         plot_data = plot_data.nlargest(top_n, y)
     
-    fig, ax = plt.subplots(figsize=(12, height))
-    bars = sns.barplot(data=plot_data, x=x, y=y, ax=ax, palette="viridis")
-    ax.set_title(title, fontsize=14, fontweight='bold')
-    ax.set_xlabel(xlabel, fontsize=12)
-    ax.set_ylabel(ylabel, fontsize=12)
-    
-    # 값 표시
-    for bar in bars.patches:
-        height = bar.get_height()
-        ax.text(bar.get_x() + bar.get_width()/2., height,
-                f'{int(height):,}', ha='center', va='bottom', fontsize=10)
-    
-    plt.xticks(rotation=rotate)
-    plt.tight_layout()
-    st.pyplot(fig)
+    def draw():
+        fig, ax = plt.subplots(figsize=(12, height))
+        bars = sns.barplot(data=plot_data, x=x, y=y, ax=ax, palette="viridis")
+        ax.set_title(title, fontsize=14, fontweight='bold')
+        ax.set_xlabel(xlabel, fontsize=12)
+        ax.set_ylabel(ylabel, fontsize=12)
+        
+        # 값 표시
+        for bar in bars.patches:
+            bar_height = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width()/2., bar_height,
+                    f'{int(bar_height):,}', ha='center', va='bottom', fontsize=10)
+        
+        ax.tick_params(axis='x', labelrotation=rotate)
+        fig.tight_layout()
+        return fig
+
+    show_chart(plot_data, ('plot_bar', x, y, title, xlabel, ylabel, rotate, height), draw)
+
+# 좌표 파일이 없거나 좌표를 찾은 매장이 없는 동에 쓰는 대략적인 동별 좌표
+DONG_APPROX_COORDS = pd.DataFrame.from_dict({
+    '성수동1가': [37.5445, 127.0557],
+    '성수동2가': [37.5398, 127.0557],
+    '도선동': [37.5618, 127.0369],
+    '상왕십리': [37.5645, 127.0336],
+    '하왕십리': [37.5663, 127.0396],
+    '금호동1가': [37.5486, 127.0196],
+    '금호동2가': [37.5516, 127.0236],
+    '금호동4가': [37.5546, 127.0276],
+    '행당동': [37.5586, 127.0436],
+    '응봉동': [37.5486, 127.0436],
+    '마장동': [37.5636, 127.0469],
+    '사근동': [37.5726, 127.0399],
+    '옥수동': [37.5396, 127.0186],
+    '송정동': [37.5756, 127.0529],
+    '용답동': [37.5696, 127.0589],
+}, orient='index', columns=['latitude', 'longitude']).rename_axis('dong')
+
+def create_folium_map(merged_df, shop_df=None):
+    """Folium 지도 생성
 
-def create_folium_map(merged_df):
-    """Folium 지도 생성"""
+    shop_df에 좌표(latitude, longitude)가 있으면 매장 위치 히트맵을 그리고, 동 마커는
+    그 동 매장들의 평균 위치에 놓는다 (좌표가 없는 동은 대략적인 좌표 사용).
+    """
     # 성동구 중심 좌표
     center_lat, center_lon = 37.5636, 127.0369
     
     m = folium.Map(location=[center_lat, center_lon], zoom_start=13)
+
+    centroids = pd.DataFrame(columns=['latitude', 'longitude'])
+    if shop_df is not None and 'latitude' in shop_df.columns:
+        points = shop_df[['latitude', 'longitude']].dropna().to_numpy()
+        if len(points):
+            HeatMap(points.tolist(), name='가맹점 분포', radius=12, blur=15).add_to(m)
+        centroids = dong_centroids(shop_df)[['latitude', 'longitude']]
     
-    # 동별 매장수와 인구밀도 계산
-    dong_stats = merged_df.groupby('dong').agg({
-        'store_name': 'count',
-        '총인구수': 'first'
-    }).reset_index()
-    
-    dong_stats['인구대비매장밀도'] = dong_stats['store_name'] / dong_stats['총인구수'] * 10000
-    
-    # 대략적인 동별 좌표
-    dong_coords = {
-        '성수동1가': [37.5445, 127.0557],
-        '성수동2가': [37.5398, 127.0557], 
-        '도선동': [37.5618, 127.0369],
-        '상왕십리': [37.5645, 127.0336],
-        '하왕십리': [37.5663, 127.0396],
-        '금호동1가': [37.5486, 127.0196],
-        '금호동2가': [37.5516, 127.0236],
-        '금호동4가': [37.5546, 127.0276],
-        '행당동': [37.5586, 127.0436],
-        '응봉동': [37.5486, 127.0436],
-        '마장동': [37.5636, 127.0469],
-        '사근동': [37.5726, 127.0399],
-        '옥수동': [37.5396, 127.0186],
-        '송정동': [37.5756, 127.0529],
-        '용답동': [37.5696, 127.0589]
-    }
+    # 동별 매장수와 인구밀도 계산 (좌표를 정할 수 없거나 인구가 없는 동은 제외)
+    dong_stats = merged_df[['dong', '매장수', '총인구수']].copy()
+    dong_stats['dong'] = dong_stats['dong'].astype(str)
+    dong_stats = dong_stats.join(centroids.set_axis(centroids.index.astype(str)).combine_first(DONG_APPROX_COORDS), on='dong')
+    dong_stats = dong_stats.dropna(subset=['latitude', 'longitude', '총인구수'])
+    density = dong_stats['매장수'] / dong_stats['총인구수'] * 10000
     
-    # 마커 추가
-    for _, row in dong_stats.iterrows():
-        dong = row['dong']
-        if dong in dong_coords and not pd.isna(row['총인구수']):
-            coords = dong_coords[dong]
-            popup_text = f"""
-            <b>{dong}</b><br>
-            매장수: {row['store_name']}개<br>
-            총인구수: {row['총인구수']:,}명<br>
-            인구 1만명당 매장수: {row['인구대비매장밀도']:.2f}개
-            """
-            
-            folium.CircleMarker(
-                location=coords,
-                radius=min(row['인구대비매장밀도'] * 2, 20),
-                popup=folium.Popup(popup_text, max_width=200),
-                color='red',
-                fill=True,
-                fillColor='red',
-                fillOpacity=0.6
-            ).add_to(m)
+    # 마커를 GeoJSON 한 개로 만들어 추가 (반지름은 feature 속성으로 전달)
+    properties = pd.DataFrame({
+        'dong': dong_stats['dong'],
+        'stores': dong_stats['매장수'].map('{:,}개'.format),
+        'population': dong_stats['총인구수'].map('{:,.0f}명'.format),
+        'density': density.map('{:.2f}개'.format),
+        'radius': density.mul(2).clip(upper=20),
+    }).to_dict('records')
+    coordinates = dong_stats[['longitude', 'latitude']].to_numpy().tolist()
+    features = [
+        {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': point}, 'properties': props}
+        for point, props in zip(coordinates, properties)
+    ]
+    if features:
+        folium.GeoJson(
+            {'type': 'FeatureCollection', 'features': features},
+            name='동별 매장 밀도',
+            marker=folium.CircleMarker(color='red', fill=True, fill_color='red', fill_opacity=0.6),
+            style_function=lambda feature: {'radius': feature['properties']['radius']},
+            popup=folium.GeoJsonPopup(
+                fields=['dong', 'stores', 'population', 'density'],
+                aliases=['동', '매장수', '총인구수', '인구 1만명당 매장수'],
+                max_width=200,
+            ),
+        ).add_to(m)
     
-    return m
\ No newline at end of file
+    return m
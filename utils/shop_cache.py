@@ -0,0 +1,151 @@
+import contextlib
+import hashlib
+import json
+import os
+import threading
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+import config
+
+# 전처리 결과의 형태가 바뀌면 올려서 기존 캐시를 무효화한다
+CACHE_VERSION = 4
+
+
+def compact_shop_dtypes(df):
+    """캐시와 앱에서 공통으로 쓰는 타입으로 변환 (범주형 코드, float32 좌표)"""
+    return df.astype({
+        'district': 'category',
+        'industry_code': 'category',
+        'latitude': 'float32',
+        'longitude': 'float32',
+    }).reset_index(drop=True)
+
+
+def file_sha1(path, block_size=1 << 20):
+    """파일 내용의 SHA-1 해시"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _cache_paths(csv_path):
+    # 이름이 같은 다른 디렉터리의 CSV가 서로의 캐시를 덮어쓰지 않도록 절대 경로의 해시를 붙인다
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    path_hash = hashlib.sha1(os.path.abspath(csv_path).encode('utf-8')).hexdigest()[:8]
+    base = os.path.join(config.CACHE_DIR, f"{name}-{path_hash}.v{CACHE_VERSION}")
+    return base + '.feather', base + '.json'
+
+
+@contextlib.contextmanager
+def _replacing(path):
+    """path 대신 쓸 임시 경로를 주고, 블록이 예외 없이 끝나면 path로 교체 (실패하면 임시 파일 삭제)
+
+    쓰다가 중단돼도 반쯤 쓴 파일이 남지 않고, 기존 파일을 메모리 매핑 중인 프로세스도 안전하다.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _source_stat(csv_path):
+    stat = os.stat(csv_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _is_fresh(csv_path, meta_path):
+    """캐시 메타 정보가 원본 파일과 일치하는지 확인 (mtime이 바뀌었으면 해시로 재확인)"""
+    if not os.path.exists(meta_path):
+        return False
+    with open(meta_path, encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('source') != os.path.abspath(csv_path):
+        return False
+
+    current = _source_stat(csv_path)
+    if meta.get('size') != current['size']:
+        return False
+    if meta.get('mtime_ns') == current['mtime_ns']:
+        return True
+
+    # 내용은 그대로이고 mtime만 바뀐 경우(복사, touch 등)는 메타 정보만 갱신
+    if meta.get('sha1') != file_sha1(csv_path):
+        return False
+    meta.update(current)
+    _dump_meta(meta, meta_path)
+    return True
+
+
+def dataset_fingerprint(csv_path):
+    """원본 CSV 내용과 전처리 버전을 나타내는 문자열 (가능하면 캐시 메타 정보의 해시를 재사용)"""
+    _, meta_path = _cache_paths(csv_path)
+    try:
+        if _is_fresh(csv_path, meta_path):
+            with open(meta_path, encoding='utf-8') as f:
+                return f"{json.load(f)['sha1']}-v{CACHE_VERSION}"
+    except (OSError, ValueError, KeyError):
+        pass
+    return f"{file_sha1(csv_path)}-v{CACHE_VERSION}"
+
+
+def read_cached_shops(csv_path):
+    """유효한 캐시가 있으면 메모리 매핑으로 읽어 DataFrame을 반환, 없으면 None"""
+    data_path, meta_path = _cache_paths(csv_path)
+    try:
+        if not os.path.exists(data_path) or not _is_fresh(csv_path, meta_path):
+            return None
+        df = feather.read_table(data_path, memory_map=True).to_pandas()
+    except (OSError, ValueError):
+        return None
+    # 스트리밍으로 쓴 캐시는 업종이 처음 나온 순서이므로, 한 번에 쓴 캐시와 같게 정렬 순서로 맞춘다
+    if not df['industry_code'].cat.categories.is_monotonic_increasing:
+        df['industry_code'] = df['industry_code'].cat.reorder_categories(df['industry_code'].cat.categories.sort_values())
+    return df
+
+
+def _write_meta(csv_path, meta_path):
+    meta = {'version': CACHE_VERSION, 'source': os.path.abspath(csv_path), 'sha1': file_sha1(csv_path)}
+    meta.update(_source_stat(csv_path))
+    _dump_meta(meta, meta_path)
+
+
+def _dump_meta(meta, meta_path):
+    with _replacing(meta_path) as tmp_path, open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+
+
+def write_cached_shops(csv_path, df):
+    """전처리된 DataFrame을 원본 파일의 해시/mtime과 함께 캐시에 저장"""
+    data_path, meta_path = _cache_paths(csv_path)
+    try:
+        os.makedirs(config.CACHE_DIR, exist_ok=True)
+        # 메모리 매핑이 가능하도록 압축하지 않고 저장
+        with _replacing(data_path) as tmp_path:
+            feather.write_feather(df, tmp_path, compression='uncompressed')
+        _write_meta(csv_path, meta_path)
+    except OSError:
+        # 캐시 저장 실패는 앱 동작에 영향을 주지 않는다
+        pass
+
+
+@contextlib.contextmanager
+def open_cache_writer(csv_path, schema):
+    """배치 단위로 캐시를 쓰는 Arrow 파일 writer (블록이 예외 없이 끝나야 캐시로 등록)
+
+    임시 파일에 쓰고 끝나면 교체하므로, 중간에 실패해도 기존 캐시나 반쯤 쓴 파일이 남지 않는다.
+    사전형 컬럼은 배치마다 새 값만 사전 증분으로 기록한다. 쓰기 실패는 OSError로 전달된다.
+    """
+    data_path, meta_path = _cache_paths(csv_path)
+    os.makedirs(config.CACHE_DIR, exist_ok=True)
+    options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+    with _replacing(data_path) as tmp_path:
+        with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, schema, options=options) as writer:
+            yield writer
+    _write_meta(csv_path, meta_path)
@@ -0,0 +1,22 @@
+import numpy as np
+
+import config
+from utils.helpers import calculate_distances
+from utils.spatial_index import nearest_order
+
+
+def find_nearby_shops(spatial_index, filter_index, lat, lon, max_distance,
+                      search_query='', district='전체', industry_code='전체', limit=config.MAX_RESULTS):
+    """조건에 맞는 반경 내 매장을 가까운 순으로 최대 limit개 찾아 (행 위치, 거리 km)를 반환"""
+    rows = filter_index.query(
+        search_query,
+        None if district == '전체' else district,
+        None if industry_code == '전체' else industry_code,
+    )
+    if rows is None:
+        return spatial_index.query_nearest(lat, lon, max_distance, limit)
+
+    distances = calculate_distances(lat, lon, spatial_index.latitudes[rows], spatial_index.longitudes[rows])
+    inside = np.flatnonzero(distances <= max_distance)
+    order = inside[nearest_order(distances[inside], limit)]
+    return rows[order].astype(np.intp), distances[order]
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# 범주 번호로 보관하는 컬럼과 문자열 배열로 보관하는 컬럼
+CATEGORY_COLUMNS = ('district', 'industry_code')
+TEXT_COLUMNS = ('store_name', 'address', 'detail_address')
+COORD_COLUMNS = ('latitude', 'longitude')
+COLUMNS = ('store_name', 'industry_code', 'address', 'detail_address', 'latitude', 'longitude', 'district')
+
+
+def _pack_codes(values):
+    """범주형 Series를 (가장 작은 부호 없는 정수 번호 배열, 범주 Index)로 변환 (결측값은 범주 개수 번)"""
+    values = values.astype('category')
+    categories = values.cat.categories
+    codes = values.cat.codes.to_numpy()
+    packed = np.where(codes < 0, len(categories), codes).astype(np.min_scalar_type(len(categories)))
+    return packed, categories
+
+
+def _string_array(values):
+    """문자열 Series를 Arrow 문자열 배열로 변환 (pyarrow 기반 컬럼이면 복사 없이 버퍼를 공유)"""
+    arr = pa.array(values, from_pandas=True)
+    if isinstance(arr, pa.Array):
+        arr = pa.chunked_array([arr])
+    return arr.cast(pa.string())
+
+
+class ShopStore:
+    """전처리된 매장 데이터를 열별 배열로 작게 보관하는 읽기 전용 저장소
+
+    좌표는 float32 배열, 지역구/업종은 uint8/uint16 범주 번호, 매장명/주소는 Arrow
+    문자열 배열(데이터 버퍼 + 오프셋)로 들고 있고, pandas DataFrame은 frame()으로 필요한
+    행/컬럼만 그때그때 만든다. 행 위치는 원본 DataFrame의 iloc과 같고, frame()의 인덱스는
+    이 행 위치이므로 결과가 바뀌어도 같은 매장은 같은 인덱스(지도 매장 id)를 가진다.
+    """
+
+    __slots__ = ('latitude', 'longitude', '_codes', '_categories', '_text')
+
+    def __init__(self, latitude, longitude, codes, categories, text):
+        self.latitude = latitude
+        self.longitude = longitude
+        self._codes = codes
+        self._categories = categories
+        self._text = text
+
+    @classmethod
+    def from_frame(cls, df):
+        codes, categories = {}, {}
+        for column in CATEGORY_COLUMNS:
+            codes[column], categories[column] = _pack_codes(df[column])
+        return cls(
+            df['latitude'].to_numpy(dtype=np.float32),
+            df['longitude'].to_numpy(dtype=np.float32),
+            codes, categories,
+            {column: _string_array(df[column]) for column in TEXT_COLUMNS},
+        )
+
+    def __len__(self):
+        return len(self.latitude)
+
+    @property
+    def nbytes(self):
+        """보관 중인 배열의 전체 바이트 수"""
+        return (self.latitude.nbytes + self.longitude.nbytes
+                + sum(codes.nbytes for codes in self._codes.values())
+                + sum(arr.nbytes for arr in self._text.values()))
+
+    def categories(self, column):
+        """범주 컬럼의 범주 목록 (실제 매장이 없는 범주도 포함)"""
+        return self._categories[column]
+
+    def codes(self, column, positions=None):
+        """범주 컬럼의 번호 배열 (결측값은 len(categories(column)) 번)"""
+        codes = self._codes[column]
+        return codes if positions is None else codes[positions]
+
+    def column(self, column, positions=None):
+        """한 컬럼을 pandas Series로 (positions가 있으면 그 행만)"""
+        if column in CATEGORY_COLUMNS:
+            categories = self._categories[column]
+            codes = self.codes(column, positions).astype(np.int32)
+            codes[codes == len(categories)] = -1
+            return pd.Series(pd.Categorical.from_codes(codes, categories=categories), name=column)
+        if column in COORD_COLUMNS:
+            values = getattr(self, column)
+            return pd.Series(values if positions is None else values[positions], name=column)
+        arr = self._text[column]
+        if positions is not None:
+            arr = arr.take(pa.array(np.asarray(positions, dtype=np.int64)))
+        return arr.to_pandas().rename(column)
+
+    def frame(self, positions=None, columns=COLUMNS):
+        """선택한 행/컬럼의 DataFrame (positions가 None이면 전체 행, 인덱스는 행 위치)"""
+        df = pd.DataFrame({column: self.column(column, positions) for column in columns})
+        if positions is not None:
+            df.index = pd.Index(np.asarray(positions, dtype=np.int64))
+        return df
@@ -0,0 +1,78 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+from utils.helpers import calculate_distances
+
+EARTH_RADIUS_KM = 6371  # calculate_distance와 같은 지구 반지름 (km)
+
+
+def _to_unit_vectors(lats, lons):
+    """위도/경도(도)를 단위 구 위의 3차원 좌표로 변환"""
+    lat_rad = np.radians(np.asarray(lats, dtype=np.float64))
+    lon_rad = np.radians(np.asarray(lons, dtype=np.float64))
+    cos_lat = np.cos(lat_rad)
+    return np.column_stack((cos_lat * np.cos(lon_rad), cos_lat * np.sin(lon_rad), np.sin(lat_rad)))
+
+
+class ShopSpatialIndex:
+    """매장 좌표에 대한 KD-tree 공간 인덱스
+
+    좌표를 단위 구 위의 3차원 점으로 바꿔 저장한다. 구면 거리와 현(chord) 길이는
+    단조 관계이므로 반경 검색 결과가 하버사인 전체 스캔과 같다.
+    반환되는 위치는 인덱스를 만든 DataFrame의 행 위치(iloc)이다.
+    """
+
+    def __init__(self, latitudes, longitudes):
+        self.latitudes = np.asarray(latitudes, dtype=np.float64)
+        self.longitudes = np.asarray(longitudes, dtype=np.float64)
+        self._tree = cKDTree(_to_unit_vectors(self.latitudes, self.longitudes))
+
+    def __len__(self):
+        return len(self.latitudes)
+
+    def query_radius(self, lat, lon, radius_km):
+        """반경 radius_km 안의 매장 행 위치와 거리(km)를 반환 (행 위치 오름차순)"""
+        positions = self._tree.query_ball_point(_to_unit_vectors([lat], [lon])[0], _chord(radius_km), return_sorted=True)
+        return self._exact(lat, lon, radius_km, np.asarray(positions, dtype=np.intp))
+
+    def query_nearest(self, lat, lon, radius_km, k):
+        """반경 radius_km 안에서 가장 가까운 k개의 행 위치와 거리(km)를 가까운 순으로 반환"""
+        k = min(k, len(self))
+        if k == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        _, positions = self._tree.query(_to_unit_vectors([lat], [lon])[0], k=k, distance_upper_bound=_chord(radius_km))
+        positions = np.atleast_1d(positions)
+        positions = positions[positions < len(self)]  # 반경 밖은 len(self)로 채워진다
+        positions, distances = self._exact(lat, lon, radius_km, positions)
+        if len(distances) == k:
+            # 트리는 k번째 거리의 동률 중 아무거나 고르므로, 그 거리까지 다시 모아 행 위치가 빠른 쪽을 남긴다
+            positions, distances = self.query_radius(lat, lon, min(radius_km, distances.max()))
+        else:
+            by_position = np.argsort(positions)
+            positions, distances = positions[by_position], distances[by_position]
+        order = nearest_order(distances, k)
+        return positions[order], distances[order]
+
+    def _exact(self, lat, lon, radius_km, positions):
+        # 경계의 부동소수 오차는 정확한 하버사인 거리로 다시 걸러낸다
+        distances = calculate_distances(lat, lon, self.latitudes[positions], self.longitudes[positions])
+        inside = distances <= radius_km
+        return positions[inside], distances[inside]
+
+
+def _chord(radius_km):
+    """구면 거리(km)를 단위 구의 현 길이로 변환 (경계 포함을 위해 약간 여유를 둔다)"""
+    return 2 * np.sin(min(radius_km / (2 * EARTH_RADIUS_KM), np.pi / 2)) + 1e-9
+
+
+def nearest_order(distances, k):
+    """거리 배열에서 가까운 k개의 순서를 반환 (부분 선택 후 k개만 정렬)"""
+    distances = np.asarray(distances)
+    if len(distances) > k:
+        # k번째 거리와 같은 값이 경계에 여러 개 있으면 행 위치가 빠른 쪽을 남긴다
+        kth = np.partition(distances, k - 1)[k - 1]
+        candidates = np.flatnonzero(distances <= kth)
+    else:
+        candidates = np.arange(len(distances))
+    order = candidates[np.argsort(distances[candidates], kind='stable')]
+    return order[:k]